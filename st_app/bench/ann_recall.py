@@ -0,0 +1,100 @@
+"""
+근사 인덱스(IVF-Flat / HNSW / IVF-PQ) recall@k vs 지연시간 리포트
+flat(정확 검색) 결과를 정답으로 두고 nprobe / efSearch 별로 비교
+
+    python -m st_app.bench.ann_recall -n 20000 --dim 256 -k 10
+    python -m st_app.bench.ann_recall --index-path st_app/db/faiss_index   # 실제 인덱스 벡터 사용
+"""
+from argparse import ArgumentParser
+import os
+import time
+
+import faiss
+import numpy as np
+
+from st_app.rag.embedder import INDEX_FILE, index_data_path
+from st_app.rag.index_factory import apply_search_params, base_index, create_index, index_config_from_env, train_index
+
+SWEEPS = {
+    "flat": [None],
+    "ivf_flat": [1, 4, 16, 64],
+    "hnsw": [16, 32, 64, 128],
+    "ivf_pq": [1, 4, 16, 64],
+}
+
+
+def create_parser() -> ArgumentParser:
+    parser = ArgumentParser()
+    parser.add_argument('-n', '--num_vectors', type=int, default=20000, help="합성 벡터 수")
+    parser.add_argument('--dim', type=int, default=256, help="합성 벡터 차원")
+    parser.add_argument('-q', '--num_queries', type=int, default=200, help="쿼리 수")
+    parser.add_argument('-k', type=int, default=10, help="recall@k의 k")
+    parser.add_argument('--index-path', type=str, default=None,
+                        help="기존 flat 인덱스 디렉토리 (지정 시 해당 벡터로 측정)")
+    return parser
+
+
+def synthetic_vectors(n: int, dim: int, n_clusters: int = 100, seed: int = 0) -> np.ndarray:
+    """리뷰 임베딩처럼 군집 구조가 있는 정규화된 합성 벡터"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype("float32")
+    labels = rng.integers(0, n_clusters, n)
+    x = centers[labels] + 1.0 * rng.standard_normal((n, dim)).astype("float32")
+    faiss.normalize_L2(x)
+    return x
+
+
+def load_index_vectors(index_path: str) -> np.ndarray:
+    index = faiss.read_index(os.path.join(index_data_path(index_path), INDEX_FILE))
+    base = base_index(index)
+    x = base.reconstruct_n(0, base.ntotal)
+    return np.ascontiguousarray(x, dtype="float32")
+
+
+def measure(index: faiss.Index, queries: np.ndarray, k: int, truth: np.ndarray):
+    """(recall@k, 쿼리당 평균 ms) - 실서비스처럼 쿼리를 하나씩 검색"""
+    found = np.empty((len(queries), k), dtype="int64")
+    t0 = time.perf_counter()
+    for i in range(len(queries)):
+        _, found[i] = index.search(queries[i:i + 1], k)
+    latency_ms = (time.perf_counter() - t0) * 1000 / len(queries)
+    hits = sum(len(set(found[i]) & set(truth[i])) for i in range(len(queries)))
+    return hits / truth.size, latency_ms
+
+
+if __name__ == "__main__":
+    args = create_parser().parse_args()
+    if args.index_path:
+        data = load_index_vectors(args.index_path)
+    else:
+        data = synthetic_vectors(args.num_vectors + args.num_queries, args.dim)
+    queries, corpus = data[:args.num_queries], data[args.num_queries:]
+    ids = np.arange(len(corpus), dtype="int64")
+    print(f"corpus={len(corpus)} dim={corpus.shape[1]} queries={len(queries)} k={args.k}\n")
+
+    flat = create_index(corpus.shape[1], len(corpus), index_config_from_env("flat"))
+    flat.add_with_ids(corpus, ids)
+    _, truth = flat.search(queries, args.k)
+
+    print("| index | param | recall@k | ms/query | size MB | build s |")
+    print("|---|---|---|---|---|---|")
+    for index_type, sweep in SWEEPS.items():
+        config = index_config_from_env(index_type)
+        t0 = time.perf_counter()
+        index = create_index(corpus.shape[1], len(corpus), config)
+        train_index(index, corpus, config["train_size"])
+        index.add_with_ids(corpus, ids)
+        build_s = time.perf_counter() - t0
+        size_mb = len(faiss.serialize_index(index)) / 1e6
+
+        for param in sweep:
+            if index_type == "hnsw":
+                apply_search_params(index, ef_search=param)
+                label = f"efSearch={param}"
+            elif param is not None:
+                apply_search_params(index, nprobe=param)
+                label = f"nprobe={param}"
+            else:
+                label = "-"
+            recall, latency_ms = measure(index, queries, args.k, truth)
+            print(f"| {index_type} | {label} | {recall:.3f} | {latency_ms:.3f} | {size_mb:.1f} | {build_s:.1f} |")
@@ -0,0 +1,44 @@
+"""
+임베딩 파이프라인 오프라인 벤치마크
+FakeEmbeddings로 원격 API 지연을 흉내내어 단일 호출 vs 배치/동시 호출 비교
+
+    python -m st_app.bench.embedding_bench -n 2000 --batch-size 64 --workers 4
+"""
+from argparse import ArgumentParser
+import time
+
+import numpy as np
+
+from st_app.rag.batch_embedder import BatchEmbedder
+from st_app.rag.fake_embedder import FakeEmbeddings
+
+
+def create_parser() -> ArgumentParser:
+    parser = ArgumentParser()
+    parser.add_argument('-n', '--num_texts', type=int, default=2000, help="임베딩할 텍스트 수")
+    parser.add_argument('--dim', type=int, default=256, help="가짜 임베딩 차원")
+    parser.add_argument('--batch-size', type=int, default=64, help="배치 크기")
+    parser.add_argument('--workers', type=int, default=4, help="동시 요청 수")
+    parser.add_argument('--latency', type=float, default=0.05, help="요청당 고정 지연(초)")
+    parser.add_argument('--per-text-latency', type=float, default=0.001, help="텍스트당 추가 지연(초)")
+    return parser
+
+
+if __name__ == "__main__":
+    args = create_parser().parse_args()
+    texts = [f"롯데월드 리뷰 {i} - 주말엔 사람이 많아요" for i in range(args.num_texts)]
+    fake = FakeEmbeddings(dim=args.dim, latency=args.latency, per_text_latency=args.per_text_latency)
+
+    t0 = time.perf_counter()
+    baseline = np.array(fake.embed_documents(texts), dtype="float32")
+    single_s = time.perf_counter() - t0
+
+    engine = BatchEmbedder(fake, batch_size=args.batch_size, max_workers=args.workers)
+    t0 = time.perf_counter()
+    batched = engine.embed(texts)
+    batched_s = time.perf_counter() - t0
+
+    assert np.array_equal(baseline, batched), "배치 결과가 단일 호출 결과와 다릅니다"
+    print(f"texts={args.num_texts} batch_size={args.batch_size} workers={args.workers}")
+    print(f"single call : {single_s:.2f}s")
+    print(f"batched     : {batched_s:.2f}s  (x{single_s / batched_s:.1f})")
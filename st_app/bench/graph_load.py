@@ -0,0 +1,148 @@
+"""
+그래프 동시 세션 처리량 부하 테스트 (오프라인)
+fake 임베딩 + MockLLM에 원격 API 지연을 주고, 같은 질문 세트를
+  - sync    : compiled.invoke 순차 실행
+  - threads : compiled.invoke를 요청당 스레드로 실행
+  - async   : 하나의 이벤트 루프에서 compiled.ainvoke 동시 실행
+으로 처리해 처리량(req/s)과 지연시간 비교
+
+    python -m st_app.bench.graph_load -n 200 --concurrency 50 --llm-latency 0.3 --embed-latency 0.05
+"""
+from argparse import ArgumentParser
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import numpy as np
+
+QUESTIONS = [
+    "롯데월드 주말 후기 어때?",
+    "아트란티스 리뷰 요약해줘",
+    "카카오맵 5점 리뷰 보여줘",
+    "롯데월드 티켓 가격 알려줘",
+    "운영시간이 어떻게 돼?",
+    "안녕하세요",
+]
+
+
+def create_parser() -> ArgumentParser:
+    parser = ArgumentParser()
+    parser.add_argument('-n', '--num_requests', type=int, default=200, help="요청(세션 턴) 수")
+    parser.add_argument('--concurrency', type=int, default=50, help="동시 세션 수")
+    parser.add_argument('--llm-latency', type=float, default=0.3, help="LLM 호출당 지연(초)")
+    parser.add_argument('--embed-latency', type=float, default=0.05, help="임베딩 호출당 지연(초)")
+    parser.add_argument('--num-reviews', type=int, default=5000, help="인덱스에 넣을 합성 리뷰 수")
+    parser.add_argument('--dim', type=int, default=256, help="가짜 임베딩 차원")
+    parser.add_argument('--skip-sync', action='store_true', help="순차 실행 측정 생략 (오래 걸릴 때)")
+    return parser
+
+
+def configure_env(args, index_dir: str) -> None:
+    """네트워크 없이 그래프 전체가 돌도록 설정 (router 모듈 import 전에 호출)"""
+    os.environ.update({
+        "LLM_MOCK": "1",
+        "LLM_MOCK_LATENCY": str(args.llm_latency),
+        "RAG_EMBED_BACKEND": "fake",
+        "RAG_FAKE_EMBED_DIM": str(args.dim),
+        "RAG_FAKE_EMBED_LATENCY": str(args.embed_latency),
+        "RAG_EMBED_CACHE": "0",
+        "RAG_QUERY_CACHE_SIZE": "0",   # 매 요청 임베딩 호출
+        "RAG_ANSWER_CACHE": "0",       # 매 요청 검색 + LLM 호출
+        "RAG_FAISS_DIR": index_dir,
+    })
+
+
+def build_index(num_reviews: int, index_dir: str) -> None:
+    from langchain.schema import Document
+    from st_app.rag.embedder import build_faiss_index
+
+    platforms = ["kakaomap", "myrealtrip", "tripdotcom"]
+    rng = np.random.default_rng(0)
+    docs = [
+        Document(
+            page_content=f"롯데월드 리뷰 {i}: 주말엔 사람이 많지만 {['아트란티스', '자이로드롭', '퍼레이드'][i % 3]} 최고",
+            metadata={"platform": platforms[i % 3], "date": f"2025-{i % 12 + 1:02d}-01",
+                      "rating": int(rng.integers(1, 6))},
+        )
+        for i in range(num_reviews)
+    ]
+    build_faiss_index(docs, index_dir)
+
+
+def make_states(n: int) -> List[dict]:
+    from st_app.utils.state import create_initial_state
+
+    states = []
+    for i in range(n):
+        state = create_initial_state()
+        state["user_input"] = f"{QUESTIONS[i % len(QUESTIONS)]} #{i}"  # 질문마다 다른 임베딩
+        states.append(state)
+    return states
+
+
+def report(name: str, elapsed: float, latencies: List[float]) -> None:
+    lat = np.array(latencies) * 1000
+    print(f"{name:8s}: {len(lat) / elapsed:7.1f} req/s  "
+          f"p50={np.percentile(lat, 50):7.1f}ms  p95={np.percentile(lat, 95):7.1f}ms  total={elapsed:.2f}s")
+
+
+def timed(fn: Callable, state: dict, latencies: List[float]):
+    t0 = time.perf_counter()
+    result = fn(state)
+    latencies.append(time.perf_counter() - t0)
+    return result
+
+
+def run_sync(compiled, states: List[dict]) -> None:
+    latencies: List[float] = []
+    t0 = time.perf_counter()
+    for state in states:
+        timed(compiled.invoke, state, latencies)
+    report("sync", time.perf_counter() - t0, latencies)
+
+
+def run_threads(compiled, states: List[dict], concurrency: int) -> None:
+    latencies: List[float] = []
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda s: timed(compiled.invoke, s, latencies), states))
+    report("threads", time.perf_counter() - t0, latencies)
+
+
+async def run_async(compiled, states: List[dict], concurrency: int) -> None:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(state):
+        async with semaphore:
+            t0 = time.perf_counter()
+            result = await compiled.ainvoke(state)
+            latencies.append(time.perf_counter() - t0)
+            return result
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(one(s) for s in states))
+    report("async", time.perf_counter() - t0, latencies)
+    errors = [r["error"] for r in results if r.get("error")]
+    if errors:
+        print(f"  errors: {len(errors)} (e.g. {errors[0]})")
+
+
+if __name__ == "__main__":
+    args = create_parser().parse_args()
+    with tempfile.TemporaryDirectory() as index_dir:
+        configure_env(args, index_dir)
+        build_index(args.num_reviews, index_dir)
+
+        from st_app.graph.router import compiled
+
+        print(f"requests={args.num_requests} concurrency={args.concurrency} "
+              f"llm_latency={args.llm_latency}s embed_latency={args.embed_latency}s")
+        compiled.invoke(make_states(1)[0])  # 인덱스 로드/워밍업
+        if not args.skip_sync:
+            run_sync(compiled, make_states(args.num_requests))
+        run_threads(compiled, make_states(args.num_requests), args.concurrency)
+        asyncio.run(run_async(compiled, make_states(args.num_requests), args.concurrency))
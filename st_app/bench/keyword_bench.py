@@ -0,0 +1,60 @@
+"""
+주제 감지 키워드 매칭 벤치마크
+카탈로그(주제 이름) 크기별로 기존 방식(이름마다 `in` 검사) vs Aho–Corasick 매처 비교
+
+    python -m st_app.bench.keyword_bench --sizes 10 100 1000 5000
+"""
+from argparse import ArgumentParser
+import random
+import time
+
+from st_app.utils.subject_catalog import build_subject_matcher
+
+SYLLABLES = "가나다라마바사아자차카타파하롯데월드공원타워호수랜드"
+
+
+def create_parser() -> ArgumentParser:
+    parser = ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000], help="카탈로그 주제 수")
+    parser.add_argument('-q', '--num_queries', type=int, default=2000, help="쿼리 수")
+    return parser
+
+
+def synthetic_subjects(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    names = {"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 6))) + f" {i}호점" for i in range(n)}
+    return [{"name": name, "category": "관광지"} for name in sorted(names)]
+
+
+def naive_detect(subjects, text: str):
+    """기존 구현: 주제마다 이름/단어 부분 문자열 검사"""
+    t = text.lower()
+    for subject in subjects:
+        name = subject['name'].lower()
+        if name in t or any(word in t for word in name.split()):
+            return subject
+    return None
+
+
+if __name__ == "__main__":
+    args = create_parser().parse_args()
+    for n in args.sizes:
+        subjects = synthetic_subjects(n)
+        rng = random.Random(1)
+        queries = [f"{rng.choice(subjects)['name']} 운영시간 알려줘" if i % 2 else "주말에 가기 좋은 곳 추천해줘"
+                   for i in range(args.num_queries)]
+
+        t0 = time.perf_counter()
+        matcher = build_subject_matcher(subjects)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        for q in queries:
+            naive_detect(subjects, q)
+        naive_us = (time.perf_counter() - t0) / len(queries) * 1e6
+
+        t0 = time.perf_counter()
+        for q in queries:
+            matcher.find_all(q)
+        ac_us = (time.perf_counter() - t0) / len(queries) * 1e6
+        print(f"subjects={n:6d}  naive={naive_us:9.1f}us/query  aho-corasick={ac_us:6.1f}us/query  (build {build_ms:.0f}ms)")
@@ -0,0 +1,51 @@
+"""
+MMR 재정렬 속도 비교: st_app.rag.mmr (NumPy) vs LangChain maximal_marginal_relevance
+
+    python -m st_app.bench.mmr_bench --fetch-k 50 -k 5 --dim 4096
+"""
+from argparse import ArgumentParser
+import time
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores.utils import maximal_marginal_relevance as lc_mmr
+
+from st_app.rag.mmr import maximal_marginal_relevance
+
+SWEEPS = [10, 20, 50, 100]
+
+
+def create_parser() -> ArgumentParser:
+    parser = ArgumentParser()
+    parser.add_argument('--fetch-k', type=int, default=None, help="후보 수 (생략 시 10/20/50/100 모두 측정)")
+    parser.add_argument('-k', type=int, default=5, help="선택할 문서 수")
+    parser.add_argument('--dim', type=int, default=4096, help="벡터 차원 (solar-embedding-1-large: 4096)")
+    parser.add_argument('--lambda-mult', type=float, default=0.5)
+    parser.add_argument('--repeat', type=int, default=200, help="측정 반복 횟수")
+    return parser
+
+
+def timed_ms(fn, repeat: int) -> float:
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) * 1000 / repeat
+
+
+if __name__ == "__main__":
+    args = create_parser().parse_args()
+    rng = np.random.default_rng(0)
+    print("| fetch_k | numpy ms | langchain ms | same order |")
+    print("|---|---|---|---|")
+    for fetch_k in [args.fetch_k] if args.fetch_k else SWEEPS:
+        vectors = rng.standard_normal((fetch_k, args.dim)).astype("float32")
+        query = rng.standard_normal((1, args.dim)).astype("float32")
+        faiss.normalize_L2(vectors)
+        faiss.normalize_L2(query)
+
+        ours = maximal_marginal_relevance(query[0], vectors, k=args.k, lambda_mult=args.lambda_mult)
+        theirs = lc_mmr(query[0], vectors, lambda_mult=args.lambda_mult, k=args.k)
+        ours_ms = timed_ms(lambda: maximal_marginal_relevance(query[0], vectors, args.k, args.lambda_mult), args.repeat)
+        lc_ms = timed_ms(lambda: lc_mmr(query[0], vectors, lambda_mult=args.lambda_mult, k=args.k), args.repeat)
+        print(f"| {fetch_k} | {ours_ms:.3f} | {lc_ms:.3f} | {ours.tolist() == list(theirs)} |")
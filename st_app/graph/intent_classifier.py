@@ -0,0 +1,188 @@
+"""
+로컬 의도 분류기 (router의 LLM 호출 대체)
+scikit-learn 글자 n-gram TF-IDF(char_wb, 희소 행렬) + 로지스틱 회귀
+예측은 학습된 가중치로 numpy에서 직접 계산 (1ms 미만, 약 0.1ms)
+
+학습 데이터:
+  - 라우터 키워드 목록으로 만든 시드 문장
+  - LLM이 결정한 라우팅 로그 (ROUTER_LOG_PATH, jsonl: {"text": ..., "intent": ...})
+    의도별로 최근 ROUTER_LOG_MAX_PER_INTENT개만 사용 (로그가 계속 커져도 학습 시간/메모리 일정)
+
+확신도(최대 확률)가 ROUTER_CONFIDENCE 미만이면 router가 LLM으로 폴백하고,
+ROUTER_LOG_PATH가 설정되어 있으면 그 결정이 로그에 쌓여 다음 학습에 사용됨
+
+환경변수:
+  ROUTER_MODE                local(분류기 + LLM 폴백, 기본) | llm(항상 LLM)
+  ROUTER_CONFIDENCE          분류기 결과를 그대로 쓸 최소 확률 (기본 0.7)
+  ROUTER_LOG_PATH            라우팅 로그 경로 - 설정한 경우에만 기록 (사용자 질문 원문이 저장됨, 기본 기록 안 함)
+                             예) st_app/db/routing_log.jsonl (.gitignore에 등록됨)
+  ROUTER_LOG_MAX_PER_INTENT  학습에 쓸 의도별 최근 로그 수 (기본 2000)
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+INTENTS = ("chat", "subject_info", "rag_review")
+DEFAULT_LOG_MAX_PER_INTENT = 2000
+
+# 키워드 기반 라우팅 목록 (폴백 라우팅과 시드 학습 데이터에 공용)
+REVIEW_KEYWORDS = ["후기", "리뷰", "평가", "추천", "어때", "만족", "재밌", "별로", "좋아", "나빠", "요약"]
+INFO_KEYWORDS = ["위치", "주소", "가격", "요금", "티켓", "운영시간", "시간", "어트랙션", "시설", "교통"]
+
+_CHAT_SEEDS = [
+    "안녕", "안녕하세요", "하이", "반가워", "고마워", "감사합니다", "뭐해", "넌 누구야", "이름이 뭐야",
+    "오늘 날씨 어때요", "심심해", "도와줘", "무엇을 할 수 있어", "잘 가", "ㅎㅎ", "ㅋㅋㅋ", "hello", "hi", "thanks",
+]
+_REVIEW_TEMPLATES = ["롯데월드 {} 알려줘", "{} 보여줘", "아트란티스 {}", "주말 방문 {} 궁금해"]
+_INFO_TEMPLATES = ["롯데월드 {} 알려줘", "{} 어떻게 돼", "{} 정보", "아이랑 가려는데 {} 궁금해"]
+_REVIEW_SEEDS = ["사람들이 뭐라고 해", "혼잡한가요", "대기줄 길어요", "가볼 만해", "장단점 알려줘"]
+_INFO_SEEDS = ["몇 시에 열어", "어디에 있어", "얼마야", "주차 가능해", "지하철로 어떻게 가"]
+
+def seed_examples() -> List[Tuple[str, str]]:
+    """키워드 목록으로 만든 시드 학습 데이터 [(문장, 의도)]"""
+    examples = [(t, "chat") for t in _CHAT_SEEDS]
+    for intent, keywords, templates, seeds in (
+        ("rag_review", REVIEW_KEYWORDS, _REVIEW_TEMPLATES, _REVIEW_SEEDS),
+        ("subject_info", INFO_KEYWORDS, _INFO_TEMPLATES, _INFO_SEEDS),
+    ):
+        examples.extend((kw, intent) for kw in keywords)
+        examples.extend((tpl.format(kw), intent) for kw in keywords for tpl in templates)
+        examples.extend((s, intent) for s in seeds)
+    return examples
+
+
+def log_path() -> Optional[str]:
+    """라우팅 로그 경로 (ROUTER_LOG_PATH를 설정하지 않으면 None -> 기록/학습에 사용 안 함)"""
+    return os.getenv("ROUTER_LOG_PATH") or None
+
+
+def load_routing_log(path: Optional[str] = None, max_per_intent: Optional[int] = None) -> List[Tuple[str, str]]:
+    """
+    LLM 라우팅 결정 로그 (없으면 빈 리스트, 깨진 줄은 건너뜀)
+    의도별로 최근 max_per_intent개만 반환 (기본 ROUTER_LOG_MAX_PER_INTENT)
+    """
+    path = path or log_path()
+    if not path or not os.path.exists(path):
+        return []
+    if max_per_intent is None:
+        max_per_intent = int(os.getenv("ROUTER_LOG_MAX_PER_INTENT", DEFAULT_LOG_MAX_PER_INTENT))
+    recent: Dict[str, Deque[Tuple[int, str]]] = {intent: deque(maxlen=max_per_intent) for intent in INTENTS}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("intent") in INTENTS and record.get("text"):
+                recent[record["intent"]].append((line_no, record["text"]))
+    # 파일에 기록된 순서대로
+    entries = sorted((line_no, text, intent) for intent, items in recent.items() for line_no, text in items)
+    return [(text, intent) for _, text, intent in entries]
+
+
+_LOG_LOCK = threading.Lock()
+
+
+def log_routing_decision(text: str, intent: str, path: Optional[str] = None) -> None:
+    """LLM이 결정한 라우팅을 학습 데이터로 기록 (ROUTER_LOG_PATH가 없으면 생략)"""
+    path = path or log_path()
+    if not path or intent not in INTENTS:
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with _LOG_LOCK, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"text": text, "intent": intent}, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"Routing log write failed: {e}")
+
+
+class IntentClassifier:
+    """
+    TF-IDF(단어 경계 글자 1~3-gram, sublinear tf) + 로지스틱 회귀 - 띄어쓰기/어미 변화에 강함
+    학습은 scikit-learn, 예측은 학습된 idf/가중치로 numpy에서 직접 계산 (sklearn transform/검증 비용 생략)
+    """
+
+    def __init__(self, C: float = 20.0, max_iter: int = 1000):
+        self.vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(1, 3), sublinear_tf=True)
+        self.model = LogisticRegression(C=C, max_iter=max_iter)
+        self._columns = np.zeros(0, dtype="int64")   # INTENTS 순서 -> model.classes_ 열 번호
+        self._analyzer: Optional[Callable[[str], List[str]]] = None
+        self._vocab: Dict[str, int] = {}
+        self._idf = np.zeros(0)
+        self._weights = np.zeros((0, 0))   # (어휘, 클래스)
+        self._bias = np.zeros(0)
+
+    def fit(self, examples: Sequence[Tuple[str, str]]) -> "IntentClassifier":
+        texts = [t for t, _ in examples]
+        labels = [intent for _, intent in examples]
+        self.model.fit(self.vectorizer.fit_transform(texts), labels)
+        classes = list(self.model.classes_)
+        self._columns = np.array([classes.index(intent) if intent in classes else -1 for intent in INTENTS])
+
+        # 예측용 캐시 (sklearn과 같은 식: l2 정규화한 (1 + log tf) * idf -> softmax(x @ coef.T + b))
+        self._analyzer = self.vectorizer.build_analyzer()
+        self._vocab = self.vectorizer.vocabulary_
+        self._idf = self.vectorizer.idf_
+        coef, intercept = self.model.coef_, self.model.intercept_
+        if coef.shape[0] == 1:   # 이진 분류: sigmoid(z) == softmax([0, z])
+            coef = np.vstack([np.zeros_like(coef), coef])
+            intercept = np.concatenate([[0.0], intercept])
+        self._weights = np.ascontiguousarray(coef.T)
+        self._bias = intercept
+        return self
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        """INTENTS 순서의 확률 (학습 데이터에 없던 의도는 0)"""
+        counts: Dict[int, int] = {}
+        for feat in self._analyzer(text):
+            col = self._vocab.get(feat)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        logits = self._bias
+        if counts:
+            cols = np.fromiter(counts.keys(), dtype="int64", count=len(counts))
+            values = (1.0 + np.log(np.fromiter(counts.values(), dtype="float64", count=len(counts)))) * self._idf[cols]
+            values /= np.linalg.norm(values)
+            logits = values @ self._weights[cols] + self._bias
+        z = np.exp(logits - logits.max())
+        proba = z / z.sum()
+        return np.where(self._columns >= 0, proba[self._columns], 0.0)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """(의도, 확률)"""
+        proba = self.predict_proba(text)
+        best = int(np.argmax(proba))
+        return INTENTS[best], float(proba[best])
+
+
+def train_intent_classifier(extra: Iterable[Tuple[str, str]] = ()) -> IntentClassifier:
+    """시드 데이터 + 라우팅 로그(의도별 최근 N개) (+ extra)로 학습"""
+    return IntentClassifier().fit(seed_examples() + load_routing_log() + list(extra))
+
+
+# --------- 프로세스 전역 분류기 (첫 사용 시 1회 학습) ---------
+_CLASSIFIER: Optional[IntentClassifier] = None
+_CLASSIFIER_LOCK = threading.Lock()
+
+
+def get_intent_classifier() -> IntentClassifier:
+    global _CLASSIFIER
+    with _CLASSIFIER_LOCK:
+        if _CLASSIFIER is None:
+            _CLASSIFIER = train_intent_classifier()
+        return _CLASSIFIER
+
+
+def router_mode() -> str:
+    return os.getenv("ROUTER_MODE", "local").lower()
+
+
+def confidence_threshold() -> float:
+    return float(os.getenv("ROUTER_CONFIDENCE", 0.7))
@@ -1,20 +1,32 @@
 
 from __future__ import annotations
 from typing import Dict, Any, List, Optional, Tuple
+from datetime import date, timedelta
+import json
 import os
+import re
+import threading
+import time
 
-from langchain.schema import Document  # 문서 타입 힌트용
+import numpy as np
 
 # 공용 레이어
-from st_app.rag.embedder import load_faiss_index
+from st_app.rag.embedder import load_faiss_index, read_manifest
+from st_app.rag.answer_cache import get_answer_cache
+from st_app.rag.search_hits import SearchHits
+from st_app.rag.reranker import get_reranker
+from st_app.rag.context_packer import context_budget_from_env, pack_context
 from st_app.rag.prompt import get_rag_review_prompt
 
 # 상태/헬퍼
-from st_app.utils.state import State
-from st_app.rag.llm import get_upstage_llm
+from st_app.utils.state import State, count_llm_call
+from st_app.rag.llm import astream_llm_text, get_upstage_llm, stream_llm_text
+from st_app.utils.aio import run_blocking
 
 # --------- 모듈 전역 캐시 ---------
 _VS = None         # FAISS vector store
+_VERSION_CHECKED_AT = 0.0  # 디스크 manifest version 마지막 확인 시각
+_VS_LOCK = threading.Lock()  # 로드/교체는 한 번에 하나만 (비동기 노드/추측 검색이 워커 스레드에서 동시에 호출)
 
 
 def _faiss_dir() -> str:
@@ -24,16 +36,174 @@ def _faiss_dir() -> str:
     return os.getenv("RAG_FAISS_DIR", "st_app/db/faiss_index")
 
 
+def _use_mmap() -> bool:
+    """
+    인덱스를 읽기 전용 memory-map으로 열지 여부: 환경변수 RAG_FAISS_MMAP (기본 1)
+    여러 Streamlit/uvicorn 워커가 OS 페이지 캐시의 인덱스 한 사본을 공유함
+    """
+    return os.getenv("RAG_FAISS_MMAP", "1") == "1"
+
+
+def _use_hybrid() -> bool:
+    """
+    BM25 + 벡터 하이브리드 검색 사용 여부: 환경변수 RAG_HYBRID (기본 1)
+    놀이기구 이름처럼 정확한 용어가 들어간 질문의 검색 품질 보완
+    """
+    return os.getenv("RAG_HYBRID", "1") == "1"
+
+
+def _mmr_lambda() -> Optional[float]:
+    """
+    MMR 재정렬 사용 시 lambda: 환경변수 RAG_MMR=1 일 때 RAG_MMR_LAMBDA (기본 0.7)
+    비슷한 리뷰만 모이지 않도록 관련도와 다양성을 함께 고려
+    """
+    if os.getenv("RAG_MMR", "0") != "1":
+        return None
+    return float(os.getenv("RAG_MMR_LAMBDA", 0.7))
+
+
+def _rerank(question: str, hits: SearchHits) -> Tuple[SearchHits, Optional[Dict[str, Any]]]:
+    """
+    cross-encoder 재정렬 (RAG_RERANK=1일 때만) -> (재정렬된 결과, 지연시간 등 통계)
+    모델을 쓸 수 없으면 기존 순서 유지
+    """
+    reranker = get_reranker()
+    if reranker is None:
+        return hits, None
+    try:
+        return reranker.rerank(question, hits)
+    except Exception as e:
+        print(f"[Rerank Error] {e}")
+        return hits, {"model": reranker.model_name, "error": str(e)}
+
+
+def _search(vs, question: str, k: int, filter: Optional[Dict[str, Any]] = None) -> SearchHits:
+    """
+    검색 결과(SearchHits) - 하이브리드 검색은 RRF 순서를 유지
+    임계값/신뢰도 로직은 hits.similarity(코사인 유사도)를 사용
+    """
+    if not _use_hybrid():
+        return vs.search_hits(question, k=k, filter=filter)
+    return vs.hybrid_search_hits(question, k=k, fetch_k=2 * k, filter=filter)
+
+
+async def _asearch(vs, question: str, k: int, filter: Optional[Dict[str, Any]] = None) -> SearchHits:
+    """_search의 비동기 버전"""
+    if not _use_hybrid():
+        return await vs.asearch_hits(question, k=k, filter=filter)
+    return await vs.ahybrid_search_hits(question, k=k, fetch_k=2 * k, filter=filter)
+
+
+def _retrieve(vs, question: str, filters: Dict[str, Any]) -> Tuple[SearchHits, Dict[str, Any]]:
+    """검색 (조건에 맞는 리뷰가 없으면 조건 없이 다시 검색) -> (결과, 실제 사용한 필터)"""
+    hits = _search(vs, question, k=10, filter=filters or None)
+    if filters and not hits:
+        filters = {}
+        hits = _search(vs, question, k=10)
+    return hits, filters
+
+
+async def _aretrieve(vs, question: str, filters: Dict[str, Any]) -> Tuple[SearchHits, Dict[str, Any]]:
+    """_retrieve의 비동기 버전"""
+    hits = await _asearch(vs, question, k=10, filter=filters or None)
+    if filters and not hits:
+        filters = {}
+        hits = await _asearch(vs, question, k=10)
+    return hits, filters
+
+
+def speculative_retrieve(question: str) -> Dict[str, Any]:
+    """
+    라우팅(LLM)과 병렬로 미리 수행하는 임베딩 + 검색
+    router가 rag_review로 정하면 state.speculative_retrieval로 넘겨 노드가 검색을 건너뜀
+    """
+    vs = _ensure_vs()
+    hits, filters = _retrieve(vs, question, _detect_filters(question))
+    return {"question": question, "version": vs.version, "hits": hits, "filters": filters}
+
+
+async def aspeculative_retrieve(question: str) -> Dict[str, Any]:
+    """speculative_retrieve의 비동기 버전"""
+    vs = await run_blocking(_ensure_vs)
+    hits, filters = await _aretrieve(vs, question, _detect_filters(question))
+    return {"question": question, "version": vs.version, "hits": hits, "filters": filters}
+
+
+def _take_speculation(state: State, question: str, vs) -> Optional[Dict[str, Any]]:
+    """같은 질문/인덱스 버전으로 미리 검색한 결과가 있으면 꺼내 사용 (state에서는 제거)"""
+    spec = state.get("speculative_retrieval")
+    state["speculative_retrieval"] = None
+    if spec and spec["question"] == question and spec["version"] == vs.version:
+        return spec
+    return None
+
+
 def _ensure_vs():
     """
     FAISS index 로딩(1회)
+    디스크의 인덱스가 다시 만들어지면(manifest version 변경) 다시 로드
+    (확인은 RAG_INDEX_VERSION_CHECK_SEC 초(기본 10)에 한 번, 다시 로드에 실패하면 기존 인덱스 유지)
     """
-    global _VS
-    if _VS is None:
-        _VS = load_faiss_index(_faiss_dir())
-        if _VS is None:
+    global _VS, _VERSION_CHECKED_AT
+    check_sec = float(os.getenv("RAG_INDEX_VERSION_CHECK_SEC", 10))
+    vs = _VS
+    if vs is not None and time.time() - _VERSION_CHECKED_AT < check_sec:
+        return vs
+    with _VS_LOCK:
+        now = time.time()
+        if _VS is not None and now - _VERSION_CHECKED_AT < check_sec:
+            return _VS   # 기다리는 동안 다른 스레드가 확인/로드함
+        _VERSION_CHECKED_AT = now
+        if _VS is not None:
+            disk_version = read_manifest(_faiss_dir()).get("version")
+            if disk_version is None or disk_version == _VS.manifest_version:
+                return _VS
+            print(f"FAISS index changed on disk (v{_VS.manifest_version} -> v{disk_version}). Reloading...")
+        vs = load_faiss_index(_faiss_dir(), mmap=_use_mmap())
+        if vs is None:
+            if _VS is not None:
+                print("FAISS index reload failed. Keeping the loaded index")
+                return _VS
             raise RuntimeError("FAISS 인덱스를 로드할 수 없습니다.")
-    return _VS
+        _VS = vs
+        return _VS
+
+
+# 질문에서 메타데이터 필터를 뽑기 위한 규칙
+_PLATFORM_KEYWORDS = {
+    "kakaomap": ["카카오맵", "카카오", "kakao"],
+    "myrealtrip": ["마이리얼트립", "마리트", "myrealtrip"],
+    "tripdotcom": ["트립닷컴", "trip.com", "tripdotcom"],
+}
+_RATING_RE = re.compile(r"(?<![\d.])([1-5])\s*점")
+_RECENT_RE = re.compile(r"최근\s*(\d+)\s*(년|개월|달|주|일)")
+_UNIT_DAYS = {"년": 365, "개월": 30, "달": 30, "주": 7, "일": 1}
+
+
+def _detect_filters(question: str, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    질문에서 플랫폼/평점/기간 조건 추출
+    예) "최근 1년 1점 리뷰" -> {"rating": [1], "date": {"min": "YYYY-MM-DD"}}
+        "카카오맵 후기만"   -> {"platform": ["kakaomap"]}
+    """
+    q = question.lower()
+    filters: Dict[str, Any] = {}
+
+    platforms = [p for p, words in _PLATFORM_KEYWORDS.items() if any(w in q for w in words)]
+    if platforms:
+        filters["platform"] = platforms
+
+    ratings = sorted({int(m) for m in _RATING_RE.findall(q)})
+    if ratings:
+        filters["rating"] = ratings
+
+    recent = _RECENT_RE.search(q)
+    if recent:
+        days = int(recent.group(1)) * _UNIT_DAYS[recent.group(2)]
+        start = (today or date.today()) - timedelta(days=days)
+        filters["date"] = {"min": start.isoformat()}
+
+    return filters
 
 
 def _short_src(md: Dict[str, Any]) -> str:
@@ -52,62 +222,210 @@ def _short_src(md: Dict[str, Any]) -> str:
         return "review|unknown"
 
 
-def _format_context(docs_with_scores: List[Tuple[Document, float]]) -> str:
+def _format_context(hits: SearchHits) -> str:
     """
     모델에 제공할 컨텍스트 문자열 생성
     - 각 청크와 메타를 함께 전달 (모델이 출력에서 근거 인용을 구성하기 쉬움)
     - 유사도 점수도 포함
     """
-    if not docs_with_scores:
+    if not hits:
         return ""
     parts = []
-    for i, (doc, score) in enumerate(docs_with_scores):
+    for hit in hits:
+        md = {"rating": hit.rating, "date": hit.date, "platform": hit.platform}
         parts.append(
-            f"{doc.page_content}\n"
-            f"(source: {_short_src(doc.metadata)}, similarity: {score:.3f})"
+            f"{hit.content}\n"
+            f"(source: {_short_src(md)}, similarity: {hit.similarity or 0.0:.3f})"
         )
     return "\n\n".join(parts)
 
 
-def _to_document_hits(docs_with_scores: List[Tuple[Document, float]]) -> List[Dict[str, Any]]:
+def _pack_context(hits: SearchHits, budget: Optional[int] = None) -> Tuple[str, SearchHits, int]:
+    """
+    토큰 예산 안에서 컨텍스트 구성 -> (컨텍스트, 실제로 들어간 결과, 사용한 토큰 수)
+    점수 순으로 채우며 긴 리뷰는 문장 단위로 잘라 넣음
+    """
+    blocks = []
+    for hit in hits:
+        md = {"rating": hit.rating, "date": hit.date, "platform": hit.platform}
+        blocks.append((hit.content, f"(source: {_short_src(md)}, similarity: {hit.similarity or 0.0:.3f})"))
+    positions, context, tokens = pack_context(blocks, budget)
+    return context, hits.take(np.array(positions, dtype="int64")), tokens
+
+
+def _to_document_hits(hits: SearchHits) -> List[Dict[str, Any]]:
     """
     상태에 저장할 RAG 결과(진단/출처용)
     """
-    results: List[Dict[str, Any]] = []
-    for doc, score in docs_with_scores:
-        try:
-            md = doc.metadata or {}
-            results.append({
-                "chunk": doc.page_content,
-                "date": md.get("date", ""),
-                "rating": md.get("rating"),
-                "platform": md.get("platform", "unknown"),
-                "place": md.get("place", "롯데월드"),
-                "source_row": md.get("source_row"),
-                "chunk_index": md.get("chunk_index"),
-                "score": float(score)  # 유사도 점수 추가
-            })
-        except Exception as e:
-            print(f"Error processing document hit: {e}, metadata: {doc.metadata}")
-            # 에러가 있어도 기본 정보는 포함
-            results.append({
-                "chunk": doc.page_content,
-                "date": "",
-                "rating": None,
-                "platform": "unknown",
-                "place": "롯데월드",
-                "source_row": None,
-                "chunk_index": None,
-                "score": float(score)
-            })
-    return results
-
-
-def _filter_by_threshold(docs_with_scores: List[Tuple[Document, float]], threshold: float = 0.6) -> List[Tuple[Document, float]]:
-    """
-    유사도 임계값으로 필터링
-    """
-    return [(doc, score) for doc, score in docs_with_scores if score >= threshold]
+    return [
+        {
+            "chunk": hit.content,
+            "date": hit.date or "",
+            "rating": hit.rating,
+            "platform": hit.platform or "unknown",
+            "place": hit.place or "롯데월드",
+            "source_row": hit.row,
+            "chunk_index": hit.row,
+            "score": hit.similarity or 0.0  # 유사도 점수 추가
+        }
+        for hit in hits
+    ]
+
+
+def _filter_by_threshold(hits: SearchHits, threshold: float = 0.6) -> SearchHits:
+    """
+    유사도 임계값으로 필터링 (순서 유지)
+    """
+    return hits.take(np.nan_to_num(hits.similarity, nan=0.0) >= threshold)
+
+
+def _apply_cached_answer(state: State, question: str, payload: Dict[str, Any], similarity: float) -> State:
+    """답변 캐시 결과를 상태에 반영 (검색/LLM 호출 생략)"""
+    state["result"] = payload["result"]
+    state["retrieved_reviews"] = [dict(r) for r in payload["retrieved_reviews"]]
+    state["rag_context"] = payload["rag_context"]
+    state["context_tokens"] = payload["context_tokens"]
+    state["context_token_budget"] = payload["context_token_budget"]
+    state["search_quality"] = {
+        **payload["search_quality"],
+        "answer_cache": {"hit": True, "similarity": round(similarity, 4)},
+    }
+    state["current_node"] = "rag_review"
+    state["error"] = None
+
+    conversation_history = state.get("conversation_history", [])
+    conversation_history.append({"user": question, "assistant": payload["answer"]})
+    state["conversation_history"] = conversation_history
+    return state
+
+
+_NO_REVIEWS = "관련된 리뷰를 찾을 수 없어요. 다른 질문을 해보시겠어요?"
+
+
+def _no_reviews(state: State) -> State:
+    state["result"] = _NO_REVIEWS
+    state["current_node"] = "rag_review"
+    state["retrieved_reviews"] = []
+    return state
+
+
+def _prepare_prompt(state: State, vs, question: str, hits: SearchHits, filters: Dict[str, Any],
+                    answer_cache, speculative: bool = False) -> Optional[str]:
+    """
+    검색 결과 후처리(중복 제거/MMR/재정렬/임계값/토큰 예산) 후 근거와 검색 품질을 state에 기록하고
+    LLM 프롬프트 반환 (쓸 수 있는 리뷰가 없으면 안내 문구를 기록하고 None)
+    """
+    # 근사 중복 리뷰(구축 시 클러스터링)는 클러스터당 하나만 사용
+    hits = hits.collapse_duplicates()
+    mmr_lambda = _mmr_lambda()
+    if mmr_lambda is not None:
+        hits = vs.mmr_rerank(question, hits, lambda_mult=mmr_lambda)
+    hits, rerank_stats = _rerank(question, hits)
+    
+    if not hits:
+        _no_reviews(state)
+        return None
+
+    # 4) 유사도 임계값으로 필터링 (선택사항)
+    # 너무 관련성이 낮은 문서는 제외
+    filtered_docs = _filter_by_threshold(hits, threshold=0.4)
+    
+    # 필터링 후에도 최소 3개는 유지
+    if len(filtered_docs) < 3 and len(hits) >= 3:
+        filtered_docs = hits.take(slice(0, 3))
+    elif not filtered_docs and hits:
+        filtered_docs = hits.take(slice(0, 1))  # 최소 1개는 유지
+    
+    # 최종적으로 상위 5개만 사용
+    final_docs = filtered_docs.take(slice(0, 5))
+
+    # 5) 컨텍스트/근거 메타 구성
+    #    (토큰 예산 RAG_CONTEXT_TOKENS 안에서 점수 순으로 채움)
+    budget = context_budget_from_env()
+    context, final_docs, context_tokens = _pack_context(final_docs, budget)
+    if not final_docs:
+        _no_reviews(state)
+        return None
+    state["retrieved_reviews"] = _to_document_hits(final_docs)
+    state["rag_context"] = context
+    state["context_tokens"] = context_tokens
+    state["context_token_budget"] = budget
+
+    # 6) 검색 품질 정보 추가
+    similarity = np.nan_to_num(final_docs.similarity, nan=0.0)
+    state["search_quality"] = {
+        "total_found": len(hits),
+        "filtered_count": len(filtered_docs),
+        "used_count": len(final_docs),
+        "avg_similarity": float(similarity.mean()),
+        "max_similarity": float(similarity.max()),
+        "min_similarity": float(similarity.min()),
+        "filter": filters,
+        "hybrid": _use_hybrid(),
+        "mmr_lambda": mmr_lambda,
+        "rerank": rerank_stats,
+        "query_cache": vs.query_cache_stats(),
+        "answer_cache": {"hit": False, **answer_cache.stats()} if answer_cache is not None else None,
+        "speculative": speculative,
+    }
+
+    # 7) 프롬프트 생성
+    return get_rag_review_prompt(context=context, question=question)
+
+
+def _apply_answer(state: State, vs, question: str, answer: str, answer_cache,
+                  query_vec: Optional[np.ndarray], cache_key: str) -> State:
+    """LLM 답변에 신뢰도 표시를 붙여 저장하고 답변 캐시/대화 기록 갱신"""
+    # 8) 검색 품질에 따른 신뢰도 표시 추가 (선택사항)
+    avg_score = state["search_quality"]["avg_similarity"]
+    confidence_note = ""
+    if avg_score < 0.5:
+        confidence_note = "\n\n💡 *검색된 리뷰와의 관련성이 다소 낮을 수 있습니다. 더 구체적인 질문을 해보시겠어요?*"
+    elif avg_score > 0.7:
+        confidence_note = "\n\n✨ *매우 관련성이 높은 리뷰들을 찾았습니다!*"
+
+    # 9) 응답 저장 및 현재 노드 표시
+    state["result"] = answer + confidence_note
+    state["current_node"] = "rag_review"
+    state["error"] = None
+    if answer_cache is not None:
+        answer_cache.put(query_vec, {
+            "answer": answer,
+            "result": state["result"],
+            "retrieved_reviews": state["retrieved_reviews"],
+            "rag_context": state["rag_context"],
+            "context_tokens": state["context_tokens"],
+            "context_token_budget": state["context_token_budget"],
+            "search_quality": state["search_quality"],
+        }, vs.version, cache_key)
+    
+    # 대화 기록 업데이트
+    conversation_history = state.get("conversation_history", [])
+    conversation_history.append({
+        "user": question,
+        "assistant": answer
+    })
+    state["conversation_history"] = conversation_history
+    
+    return state
+
+
+def _apply_error(state: State, e: Exception) -> State:
+    # 에러시 사용자에게도 짧게 안내하고, 에러 저장
+    err_msg = f"리뷰 검색 중 오류가 발생했어요: {str(e)}"
+    state["result"] = err_msg
+    state["error"] = str(e)
+    state["current_node"] = "rag_review"
+    
+    # 대화 기록 업데이트
+    conversation_history = state.get("conversation_history", [])
+    conversation_history.append({
+        "user": state.get("user_input", ""),
+        "assistant": err_msg
+    })
+    state["conversation_history"] = conversation_history
+    
+    return state
 
 
 def rag_review_node(state: State) -> State:
@@ -136,87 +454,80 @@ def rag_review_node(state: State) -> State:
         # 2) FAISS 벡터 저장소 준비
         vs = _ensure_vs()
 
-        # 3) 검색 수행 - similarity_search_with_score 사용하여 점수도 함께 가져오기
-        docs_with_scores: List[Tuple[Document, float]] = vs.similarity_search_with_score(question, k=10)
-        
-        if not docs_with_scores:
-            state["result"] = "관련된 리뷰를 찾을 수 없어요. 다른 질문을 해보시겠어요?"
+        # 3) 검색 수행 - (하이브리드) 검색으로 유사도 점수도 함께 가져오기
+        #    질문에 플랫폼/평점/기간 조건이 있으면 FAISS 검색 안에서 필터링
+        filters = _detect_filters(question)
+        spec = _take_speculation(state, question, vs)  # 라우팅과 병렬로 미리 검색한 결과
+
+        #    의미가 같은 이전 질문(같은 인덱스 버전/필터)의 답변이 있으면 그대로 사용
+        answer_cache = get_answer_cache()
+        cache_key = json.dumps(filters, sort_keys=True, ensure_ascii=False)
+        query_vec = None
+        if answer_cache is not None:
+            query_vec = vs.embed_query(question)
+            cached = answer_cache.get(query_vec, vs.version, cache_key)
+            if cached is not None:
+                return _apply_cached_answer(state, question, *cached)
+
+        if spec is not None:
+            hits, filters = spec["hits"], spec["filters"]
+        else:
+            hits, filters = _retrieve(vs, question, filters)
+
+        prompt_text = _prepare_prompt(state, vs, question, hits, filters, answer_cache, spec is not None)
+        if prompt_text is None:
+            return state
+
+        llm = get_upstage_llm(temperature=0.2)
+        count_llm_call(state)
+        answer: str = stream_llm_text(llm, prompt_text)
+        return _apply_answer(state, vs, question, answer, answer_cache, query_vec, cache_key)
+
+    except Exception as e:
+        return _apply_error(state, e)
+
+
+async def arag_review_node(state: State) -> State:
+    """
+    rag_review_node의 비동기 버전 (compiled.ainvoke / astream에서 사용)
+    임베딩/LLM 호출은 await, 인덱스 로드·FAISS 검색·재정렬은 스레드 풀에서 실행해
+    하나의 이벤트 루프에서 여러 세션을 동시에 처리
+    """
+    try:
+        question = state.get("user_input", "").strip()
+        if not question:
+            state["result"] = "질문이 비어 있어요. 어떤 점이 궁금한가요?"
             state["current_node"] = "rag_review"
-            state["retrieved_reviews"] = []
             return state
 
-        # 4) 유사도 임계값으로 필터링 (선택사항)
-        # 너무 관련성이 낮은 문서는 제외
-        filtered_docs = _filter_by_threshold(docs_with_scores, threshold=0.4)
-        
-        # 필터링 후에도 최소 3개는 유지
-        if len(filtered_docs) < 3 and len(docs_with_scores) >= 3:
-            filtered_docs = docs_with_scores[:3]
-        elif not filtered_docs and docs_with_scores:
-            filtered_docs = docs_with_scores[:1]  # 최소 1개는 유지
-        
-        # 최종적으로 상위 5개만 사용
-        final_docs = filtered_docs[:5]
-
-        # 5) 컨텍스트/근거 메타 구성
-        context = _format_context(final_docs)
-        state["retrieved_reviews"] = _to_document_hits(final_docs)
-        state["rag_context"] = context
-
-        # 6) 검색 품질 정보 추가
-        avg_score = sum(score for _, score in final_docs) / len(final_docs)
-        max_score = max(score for _, score in final_docs)
-        min_score = min(score for _, score in final_docs)
-        state["search_quality"] = {
-            "total_found": len(docs_with_scores),
-            "filtered_count": len(filtered_docs),
-            "used_count": len(final_docs),
-            "avg_similarity": avg_score,
-            "max_similarity": max_score,
-            "min_similarity": min_score
-        }
+        state["review_query"] = question
+        vs = await run_blocking(_ensure_vs)
+        filters = _detect_filters(question)
+        spec = _take_speculation(state, question, vs)
+
+        answer_cache = get_answer_cache()
+        cache_key = json.dumps(filters, sort_keys=True, ensure_ascii=False)
+        query_vec = None
+        if answer_cache is not None:
+            query_vec = await vs.aembed_query(question)
+            cached = answer_cache.get(query_vec, vs.version, cache_key)
+            if cached is not None:
+                return _apply_cached_answer(state, question, *cached)
+
+        if spec is not None:
+            hits, filters = spec["hits"], spec["filters"]
+        else:
+            hits, filters = await _aretrieve(vs, question, filters)
+
+        prompt_text = await run_blocking(_prepare_prompt, state, vs, question, hits, filters, answer_cache,
+                                          spec is not None)
+        if prompt_text is None:
+            return state
 
-        # 7) 프롬프트 생성 및 LLM 호출
         llm = get_upstage_llm(temperature=0.2)
-        prompt_text = get_rag_review_prompt(context=context, question=question)
-        result = llm.invoke(prompt_text)
-        answer: str = result.content
-
-        # 8) 검색 품질에 따른 신뢰도 표시 추가 (선택사항)
-        confidence_note = ""
-        if avg_score < 0.5:
-            confidence_note = "\n\n💡 *검색된 리뷰와의 관련성이 다소 낮을 수 있습니다. 더 구체적인 질문을 해보시겠어요?*"
-        elif avg_score > 0.7:
-            confidence_note = "\n\n✨ *매우 관련성이 높은 리뷰들을 찾았습니다!*"
-
-        # 9) 응답 저장 및 현재 노드 표시
-        state["result"] = answer + confidence_note
-        state["current_node"] = "rag_review"
-        state["error"] = None
-        
-        # 대화 기록 업데이트
-        conversation_history = state.get("conversation_history", [])
-        conversation_history.append({
-            "user": question,
-            "assistant": answer
-        })
-        state["conversation_history"] = conversation_history
-        
-        return state
+        count_llm_call(state)
+        answer: str = await astream_llm_text(llm, prompt_text)
+        return _apply_answer(state, vs, question, answer, answer_cache, query_vec, cache_key)
 
     except Exception as e:
-        # 에러시 사용자에게도 짧게 안내하고, 에러 저장
-        err_msg = f"리뷰 검색 중 오류가 발생했어요: {str(e)}"
-        state["result"] = err_msg
-        state["error"] = str(e)
-        state["current_node"] = "rag_review"
-        
-        # 대화 기록 업데이트
-        conversation_history = state.get("conversation_history", [])
-        conversation_history.append({
-            "user": state.get("user_input", ""),
-            "assistant": err_msg
-        })
-        state["conversation_history"] = conversation_history
-        
-        return state
\ No newline at end of file
+        return _apply_error(state, e)
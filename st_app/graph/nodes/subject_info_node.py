@@ -1,38 +1,37 @@
-import json
+import os
 import re
 from typing import Dict, Any, List, Optional
-from st_app.utils.state import State
-from st_app.rag.llm import get_upstage_llm
-import os
+from st_app.utils.state import State, count_llm_call
+from st_app.rag.llm import astream_llm_text, emit_text, get_upstage_llm, stream_llm_text
+from st_app.utils.keyword_matcher import KeywordMatcher
+from st_app.utils.subject_catalog import (
+    CATEGORY_KEYWORDS, SubjectCatalog, build_subject_matcher, get_subject_catalog,
+)
 from st_app.rag.prompt import get_subject_info_prompt
 
 class SubjectInfoProcessor:
-    """리뷰 대상 정보 처리를 위한 클래스"""
+    """리뷰 대상 정보 처리를 위한 클래스 (데이터는 프로세스 공용 카탈로그 사용)"""
     
-    def __init__(self):
+    def __init__(self, catalog: Optional[SubjectCatalog] = None):
+        self.catalog = catalog or get_subject_catalog()
         self.subject_data = self.load_subject_data()
+        self._matcher: Optional[KeywordMatcher] = None
     
     def load_subject_data(self) -> List[Dict]:
-        """subjects.json 파일 로드"""
-        try:
-            # 현재 파일의 위치를 기준으로 상대 경로 계산
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            file_path = os.path.join(current_dir, "..", "..", "db", "subject_information", "subjects.json")
-            
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # JSON이 단일 객체인 경우 리스트로 변환
-                    return [data] if isinstance(data, dict) else data
-            else:
-                print(f"Warning: {file_path} 파일을 찾을 수 없습니다.")
-                return []
-        except Exception as e:
-            print(f"Error loading subject data: {e}")
-            return []
+        """subjects.json 데이터 (카탈로그에 이미 로드된 목록 - 디스크를 읽지 않음)"""
+        return self.catalog.subjects
+    
+    def _uses_catalog(self) -> bool:
+        return self.subject_data is self.catalog.subjects
     
     def find_subject_by_name(self, subject_name: str) -> Optional[Dict]:
         """이름으로 주제 정보 검색"""
+        # 정확한 이름/별칭 매칭 (색인 조회)
+        if self._uses_catalog():
+            subject = self.catalog.find(subject_name)
+            if subject:
+                return subject
+        
         subject_name_lower = subject_name.lower()
         
         for subject in self.subject_data:
@@ -48,29 +47,35 @@ class SubjectInfoProcessor:
     
     def find_subject_by_category(self, category: str) -> List[Dict]:
         """카테고리로 주제 정보 검색"""
+        if self._uses_catalog():
+            return self.catalog.by_category.get(category, [])
         return [subject for subject in self.subject_data if subject['category'] == category]
     
+    @property
+    def matcher(self) -> KeywordMatcher:
+        """이름/별칭/카테고리 키워드 매처 (카탈로그 데이터면 카탈로그의 매처, 아니면 처음 사용할 때 1회 컴파일)"""
+        if self._matcher is None:
+            self._matcher = self.catalog.matcher if self._uses_catalog() else build_subject_matcher(self.subject_data)
+        return self._matcher
+    
     def detect_category_and_subject(self, user_input: str) -> tuple[str, Optional[Dict]]:
-        """사용자 입력에서 카테고리와 주제 감지"""
-        user_input_lower = user_input.lower()
+        """
+        사용자 입력에서 카테고리와 주제 감지 (입력을 한 번만 훑음)
+        우선순위: 이름/별칭 > 이름의 단어 > 카테고리 키워드 (같은 종류면 긴 일치, 앞쪽 일치 우선)
+        """
+        matches = self.matcher.find_all(user_input)
         
-        # 1. 먼저 JSON 데이터에서 직접 이름 검색
-        subject_names = [subject['name'] for subject in self.subject_data]
-        for name in subject_names:
-            if name.lower() in user_input_lower or any(word in user_input_lower for word in name.lower().split()):
-                found_subject = self.find_subject_by_name(name)
-                return found_subject['category'] if found_subject else "general", found_subject
+        # 1. 먼저 JSON 데이터의 이름/별칭 검색
+        subject_matches = [m for m in matches if m.value[0] != "category"]
+        if subject_matches:
+            best = min(subject_matches, key=lambda m: (_MATCH_RANK[m.value[0]], -len(m.keyword), m.start))
+            found_subject = best.value[1]
+            return found_subject['category'], found_subject
         
         # 2. 카테고리별 키워드 검색
-        category_keywords = {
-            "테마파크": ["테마파크", "놀이공원", "롯데월드", "어트랙션", "놀이기구", "어드벤처", "매직아일랜드"],
-            "관광지": ["관광지", "여행지", "명소"],
-            "레스토랑": ["레스토랑", "맛집", "음식점"],
-            "호텔": ["호텔", "숙박", "리조트"]
-        }
-        
-        for category, keywords in category_keywords.items():
-            if any(keyword.lower() in user_input_lower for keyword in keywords):
+        matched_categories = {m.value[1] for m in matches}
+        for category in CATEGORY_KEYWORDS:
+            if category in matched_categories:
                 subjects = self.find_subject_by_category(category)
                 return category, subjects[0] if subjects else None
         
@@ -78,29 +83,96 @@ class SubjectInfoProcessor:
     
     def extract_subject_name(self, user_input: str) -> str:
         """사용자 입력에서 주제명 추출"""
-        patterns = [
-            r'(.+?)에 대해',
-            r'(.+?)에 대한',
-            r'(.+?) 정보',
-            r'(.+?) 알려',
-            r'(.+?)는',
-            r'(.+?)이',
-            r'(.+?) 설명',
-            r'(.+?) 소개'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, user_input)
-            if match:
-                return match.group(1).strip()
+        # 패턴 목록 순서대로 시도하는 것과 같은 결과 (교대 패턴은 같은 시작 위치에서 앞의 패턴부터 시도)
+        match = _SUBJECT_NAME_RE.search(user_input)
+        if match:
+            return next(g for g in match.groups() if g is not None).strip()
         
         # 패턴이 매치되지 않으면 불용어 제거
-        stopwords = ['에', '대해', '대한', '정보', '알려', '설명', '소개', '무엇', '어떤', '줘', '주세요']
         words = user_input.split()
-        filtered_words = [word for word in words if not any(stop in word for stop in stopwords)]
+        filtered_words = [word for word in words if not _STOPWORD_RE.search(word)]
         
         return ' '.join(filtered_words) if filtered_words else user_input
 
+
+_MATCH_RANK = {"name": 0, "word": 1}
+
+# extract_subject_name 패턴 (한 번 컴파일)
+_SUBJECT_NAME_PATTERNS = [
+    r'(.+?)에 대해',
+    r'(.+?)에 대한',
+    r'(.+?) 정보',
+    r'(.+?) 알려',
+    r'(.+?)는',
+    r'(.+?)이',
+    r'(.+?) 설명',
+    r'(.+?) 소개'
+]
+_SUBJECT_NAME_RE = re.compile("|".join(_SUBJECT_NAME_PATTERNS))
+_STOPWORDS = ['에', '대해', '대한', '정보', '알려', '설명', '소개', '무엇', '어떤', '줘', '주세요']
+_STOPWORD_RE = re.compile("|".join(map(re.escape, _STOPWORDS)))
+
+
+def _location_lines(subject_data: Dict) -> List[str]:
+    if 'location' in subject_data:
+        return [f"**위치**: {subject_data['location']}"]
+    return []
+
+def _transport_lines(subject_data: Dict) -> List[str]:
+    """교통편 정보"""
+    if 'transportation' not in subject_data:
+        return []
+    lines = [f"\n**교통편**"]
+    transport = subject_data['transportation']
+    if 'subway' in transport:
+        lines.append(f"🚇 **지하철**: {transport['subway']}")
+    if 'bus' in transport:
+        lines.append(f"🚌 **버스**: {transport['bus']}")
+    if 'parking' in transport:
+        lines.append(f"🅿️ **주차**: {transport['parking']}")
+    return lines
+
+def _hours_lines(subject_data: Dict) -> List[str]:
+    """운영시간 + 휴무일"""
+    lines = []
+    if 'opening_hours' in subject_data:
+        lines.append(f"\n**운영시간**\n{subject_data['opening_hours']}")
+    if 'closed_days' in subject_data:
+        lines.append(f"\n**휴무일**: {subject_data['closed_days']}")
+    return lines
+
+def _ticket_lines(subject_data: Dict) -> List[str]:
+    """티켓 정보"""
+    if 'ticket_info' not in subject_data:
+        return []
+    lines = [f"\n**티켓 정보**"]
+    ticket_info = subject_data['ticket_info']
+    for ticket_type, prices in ticket_info.items():
+        if isinstance(prices, dict):
+            price_list = []
+            for age_group, price in prices.items():
+                if age_group == 'adult':
+                    price_list.append(f"성인: {price}")
+                elif age_group == 'teen':
+                    price_list.append(f"청소년: {price}")
+                elif age_group == 'child':
+                    price_list.append(f"어린이: {price}")
+            lines.append(f"  🎫 **{ticket_type}**: {', '.join(price_list)}")
+        elif isinstance(prices, str):
+            lines.append(f"  💰 **{ticket_type}**: {prices}")
+    return lines
+
+def _facility_lines(subject_data: Dict) -> List[str]:
+    """시설 정보"""
+    if not subject_data.get('facilities'):
+        return []
+    lines = [f"\n**시설 안내**"]
+    facilities = subject_data['facilities']
+    for facility_type, facility_list in facilities.items():
+        if isinstance(facility_list, list):
+            lines.append(f"  🏢 **{facility_type}**: {', '.join(facility_list)}")
+    return lines
+
 def format_subject_info(subject_data: Dict) -> str:
     """주제 데이터를 포맷된 문자열로 변환 - 새로운 JSON 구조 반영"""
     
@@ -109,20 +181,10 @@ def format_subject_info(subject_data: Dict) -> str:
     # 기본 정보
     info_parts.append(f"## 📍 {subject_data['name']}")
     info_parts.append(f"**카테고리**: {subject_data['category']}")
-    
-    if 'location' in subject_data:
-        info_parts.append(f"**위치**: {subject_data['location']}")
+    info_parts.extend(_location_lines(subject_data))
     
     # 교통편 정보
-    if 'transportation' in subject_data:
-        info_parts.append(f"\n**교통편**")
-        transport = subject_data['transportation']
-        if 'subway' in transport:
-            info_parts.append(f"🚇 **지하철**: {transport['subway']}")
-        if 'bus' in transport:
-            info_parts.append(f"🚌 **버스**: {transport['bus']}")
-        if 'parking' in transport:
-            info_parts.append(f"🅿️ **주차**: {transport['parking']}")
+    info_parts.extend(_transport_lines(subject_data))
     
     # 설명
     if 'description' in subject_data:
@@ -132,31 +194,11 @@ def format_subject_info(subject_data: Dict) -> str:
     if 'opening_date' in subject_data:
         info_parts.append(f"\n**개장일**: {subject_data['opening_date']}")
     
-    # 운영시간
-    if 'opening_hours' in subject_data:
-        info_parts.append(f"\n**운영시간**\n{subject_data['opening_hours']}")
-    
-    # 휴무일
-    if 'closed_days' in subject_data:
-        info_parts.append(f"\n**휴무일**: {subject_data['closed_days']}")
+    # 운영시간, 휴무일
+    info_parts.extend(_hours_lines(subject_data))
     
     # 티켓 정보
-    if 'ticket_info' in subject_data:
-        info_parts.append(f"\n**티켓 정보**")
-        ticket_info = subject_data['ticket_info']
-        for ticket_type, prices in ticket_info.items():
-            if isinstance(prices, dict):
-                price_list = []
-                for age_group, price in prices.items():
-                    if age_group == 'adult':
-                        price_list.append(f"성인: {price}")
-                    elif age_group == 'teen':
-                        price_list.append(f"청소년: {price}")
-                    elif age_group == 'child':
-                        price_list.append(f"어린이: {price}")
-                info_parts.append(f"  🎫 **{ticket_type}**: {', '.join(price_list)}")
-            elif isinstance(prices, str):
-                info_parts.append(f"  💰 **{ticket_type}**: {prices}")
+    info_parts.extend(_ticket_lines(subject_data))
     
     # 어트랙션 정보
     if 'attractions' in subject_data and subject_data['attractions']:
@@ -174,13 +216,7 @@ def format_subject_info(subject_data: Dict) -> str:
                 info_parts.append(f"  • {', '.join(area_info)}")
     
     # 시설 정보
-    if 'facilities' in subject_data and subject_data['facilities']:
-        info_parts.append(f"\n**시설 안내**")
-        
-        facilities = subject_data['facilities']
-        for facility_type, facility_list in facilities.items():
-            if isinstance(facility_list, list):
-                info_parts.append(f"  🏢 **{facility_type}**: {', '.join(facility_list)}")
+    info_parts.extend(_facility_lines(subject_data))
     
     # 방문 팁
     if 'visitor_tips' in subject_data and subject_data['visitor_tips']:
@@ -194,83 +230,175 @@ def format_subject_info(subject_data: Dict) -> str:
     
     return "\n".join(info_parts)
 
-def subject_info_node(state: State) -> State:
-    """JSON 데이터를 활용한 리뷰 대상 정보 제공 노드"""
-    
-    processor = SubjectInfoProcessor()
-    user_input = state['user_input']
-    
-    # 카테고리와 주제 감지
-    category, found_subject = processor.detect_category_and_subject(user_input)
-    extracted_subject = processor.extract_subject_name(user_input)
-    
-    try:
-        if found_subject:
-            # JSON 데이터에서 찾은 정보가 있는 경우
+def formatted_subject_info(catalog: SubjectCatalog, subject_data: Dict) -> str:
+    """format_subject_info 결과 (카탈로그에 주제별로 캐시)"""
+    return catalog.memo("formatted", subject_data, lambda: format_subject_info(subject_data))
+
+# ── 템플릿 답변 (LLM 없이) ──────────────────────────────────────────────────────
+# 가격/운영시간/교통/시설/위치처럼 레코드의 한 섹션으로 답이 끝나는 질문은
+# 해당 섹션을 그대로 답변으로 사용 (토큰 0, 수 ms)
+# 추천/비교 같은 열린 질문이거나 슬롯을 못 찾으면 기존대로 LLM 호출
+# SUBJECT_INFO_TEMPLATE=0 이면 항상 LLM 사용
+# 슬롯 키워드는 장소 전체 정보를 묻는 명사만 사용
+# ("얼마", "할인", "몇 시"는 "퍼레이드 몇 시에 해?", "주차 얼마야?"처럼 다른 대상에도 붙어서 제외)
+_SLOT_KEYWORDS = {
+    "ticket": ["티켓", "가격", "요금", "입장료", "이용권"],
+    "hours": ["운영시간", "운영 시간", "영업시간", "개장시간", "폐장", "문 열", "문 닫", "휴무", "쉬는 날"],
+    "transport": ["교통", "지하철", "버스", "주차", "가는 길", "가는 방법", "어떻게 가", "오시는 길"],
+    "facilities": ["시설", "편의", "화장실", "물품보관", "보관함", "유모차", "수유실"],
+    "location": ["위치", "주소", "어디에 있", "어디 있", "어디야"],
+}
+_SLOT_LINES = {
+    "ticket": _ticket_lines,
+    "hours": _hours_lines,
+    "transport": _transport_lines,
+    "facilities": _facility_lines,
+    "location": _location_lines,
+}
+_OPEN_ENDED_KEYWORDS = ["추천", "비교", "차이", "왜", "코스", "일정", "계획", "팁", "좋을까", "할까", "괜찮", "어때", "뭐가 좋"]
+_SLOT_MATCHER = KeywordMatcher(
+    [(kw, slot) for slot, keywords in _SLOT_KEYWORDS.items() for kw in keywords]
+    + [(kw, "open") for kw in _OPEN_ENDED_KEYWORDS]
+)
+
+
+def detect_slots(user_input: str) -> List[str]:
+    """질문이 묻는 레코드 섹션 (열린 질문이면 빈 목록 -> LLM)"""
+    slots = _SLOT_MATCHER.values(user_input)
+    if "open" in slots:
+        return []
+    return [slot for slot in _SLOT_KEYWORDS if slot in slots]   # 섹션 순서 고정 (캐시 키 안정)
+
+
+def render_template_answer(subject_data: Dict, slots: List[str]) -> Optional[str]:
+    """슬롯에 해당하는 섹션으로 답변 구성 (레코드에 해당 섹션이 하나도 없으면 None)"""
+    lines = [line for slot in slots for line in _SLOT_LINES[slot](subject_data)]
+    if not lines:
+        return None
+    lines[0] = lines[0].lstrip("\n")
+    answer = [f"## 📍 {subject_data['name']}", *lines]
+    if 'official_website' in subject_data:
+        answer.append(f"\n자세한 내용은 공식 웹사이트에서 확인해 주세요: {subject_data['official_website']}")
+    return "\n".join(answer)
+
+
+def _template_answer(processor: SubjectInfoProcessor, user_input: str,
+                     found_subject: Optional[Dict[str, Any]]) -> Optional[str]:
+    """템플릿으로 답할 수 있으면 답변, 아니면 None (카탈로그 데이터면 슬롯 조합별로 캐시)"""
+    if not found_subject or os.getenv("SUBJECT_INFO_TEMPLATE", "1") != "1":
+        return None
+    slots = detect_slots(user_input)
+    if not slots:
+        return None
+    if not processor._uses_catalog():
+        return render_template_answer(found_subject, slots)
+    return processor.catalog.memo(f"template:{','.join(slots)}", found_subject,
+                                  lambda: render_template_answer(found_subject, slots))
+
+
+def _subject_info_template(state: State, answer: str, category: Optional[str],
+                           found_subject: Dict[str, Any], extracted_subject: str) -> State:
+    emit_text(answer)
+    return {**_subject_info_response(state, answer, category, found_subject, extracted_subject),
+            "data_source": "template"}
+
+
+def _subject_info_prompt(processor: SubjectInfoProcessor, user_input: str,
+                         found_subject: Optional[Dict[str, Any]], extracted_subject: str) -> str:
+    """JSON 데이터에서 찾은 정보(없으면 일반 안내)로 LLM 프롬프트 구성"""
+    system_prompt = get_subject_info_prompt()
+    if found_subject:
+        # JSON 데이터에서 찾은 정보가 있는 경우
+        if processor._uses_catalog():
+            formatted_info = formatted_subject_info(processor.catalog, found_subject)
+        else:
             formatted_info = format_subject_info(found_subject)
-            
-            # prompt.py의 프롬프트 사용
-            llm = get_upstage_llm(temperature=0.2)
-            system_prompt = get_subject_info_prompt()
-            user_prompt = f"""
+        user_prompt = f"""
 다음은 '{found_subject['name']}'에 대한 정보입니다:
 
 {formatted_info}
 
 사용자 질문: {user_input}
 """
-            
-            # 시스템 프롬프트와 사용자 프롬프트를 결합
-            full_prompt = f"{system_prompt}\n\n{user_prompt}"
-            result = llm.invoke(full_prompt)
-            
-            response = {
-                **state,
-                "result": result.content,
-                "current_node": "subject_info",
-                "detected_category": category,
-                "extracted_subject": extracted_subject,
-                "found_subject_name": found_subject['name'],
-                "info_type": "subject_information",
-                "data_source": "json_database"
-            }
-            
-        else:
-            # JSON 데이터에서 찾지 못한 경우 일반적인 정보 제공
-            llm = get_upstage_llm(temperature=0.2)
-            system_prompt = get_subject_info_prompt()
-            user_prompt = f"""
+    else:
+        # JSON 데이터에서 찾지 못한 경우 일반적인 정보 제공
+        user_prompt = f"""
 '{extracted_subject}'에 대한 정보를 요청받았지만, 저희 데이터베이스에서 해당 정보를 찾을 수 없습니다.
 
 사용자 요청: {user_input}
 
 현재 제공 가능한 정보는 롯데월드에 대한 기본 정보입니다.
 """
-            
-            full_prompt = f"{system_prompt}\n\n{user_prompt}"
-            result = llm.invoke(full_prompt)
-            
-            response = {
-                **state,
-                "result": result.content,
-                "current_node": "subject_info",
-                "detected_category": category,
-                "extracted_subject": extracted_subject,
-                "found_subject_name": None,
-                "info_type": "general_information",
-                "data_source": "llm_general"
-            }
-        
-        return response
-        
+    # 시스템 프롬프트와 사용자 프롬프트를 결합
+    return f"{system_prompt}\n\n{user_prompt}"
+
+
+def _subject_info_response(state: State, answer: str, category: Optional[str],
+                           found_subject: Optional[Dict[str, Any]], extracted_subject: str) -> State:
+    return {
+        **state,
+        "result": answer,
+        "current_node": "subject_info",
+        "detected_category": category,
+        "extracted_subject": extracted_subject,
+        "found_subject_name": found_subject['name'] if found_subject else None,
+        "info_type": "subject_information" if found_subject else "general_information",
+        "data_source": "json_database" if found_subject else "llm_general"
+    }
+
+
+def _subject_info_error(state: State, e: Exception, category: Optional[str], extracted_subject: str) -> State:
+    return {
+        **state,
+        "result": f"죄송합니다. {extracted_subject}에 대한 정보를 가져오는 중 오류가 발생했습니다. 다시 시도해 주세요.",
+        "current_node": "subject_info",
+        "error": str(e),
+        "detected_category": category,
+        "extracted_subject": extracted_subject
+    }
+
+
+def subject_info_node(state: State) -> State:
+    """JSON 데이터를 활용한 리뷰 대상 정보 제공 노드"""
+    
+    processor = SubjectInfoProcessor()
+    user_input = state['user_input']
+    
+    # 카테고리와 주제 감지
+    category, found_subject = processor.detect_category_and_subject(user_input)
+    extracted_subject = processor.extract_subject_name(user_input)
+    
+    # 사실 질문은 레코드 섹션으로 바로 답변
+    answer = _template_answer(processor, user_input, found_subject)
+    if answer is not None:
+        return _subject_info_template(state, answer, category, found_subject, extracted_subject)
+    
+    try:
+        llm = get_upstage_llm(temperature=0.2)
+        count_llm_call(state)
+        answer = stream_llm_text(llm, _subject_info_prompt(processor, user_input, found_subject, extracted_subject))
+        return _subject_info_response(state, answer, category, found_subject, extracted_subject)
     except Exception as e:
         # 오류 처리
-        error_response = {
-            **state,
-            "result": f"죄송합니다. {extracted_subject}에 대한 정보를 가져오는 중 오류가 발생했습니다. 다시 시도해 주세요.",
-            "current_node": "subject_info",
-            "error": str(e),
-            "detected_category": category,
-            "extracted_subject": extracted_subject
-        }
-        return error_response
\ No newline at end of file
+        return _subject_info_error(state, e, category, extracted_subject)
+
+
+async def asubject_info_node(state: State) -> State:
+    """subject_info_node의 비동기 버전 (카탈로그는 메모리에 있으므로 바로 실행)"""
+    processor = SubjectInfoProcessor()
+    user_input = state['user_input']
+    
+    category, found_subject = processor.detect_category_and_subject(user_input)
+    extracted_subject = processor.extract_subject_name(user_input)
+    
+    answer = _template_answer(processor, user_input, found_subject)
+    if answer is not None:
+        return _subject_info_template(state, answer, category, found_subject, extracted_subject)
+    
+    try:
+        llm = get_upstage_llm(temperature=0.2)
+        count_llm_call(state)
+        answer = await astream_llm_text(llm, _subject_info_prompt(processor, user_input, found_subject, extracted_subject))
+        return _subject_info_response(state, answer, category, found_subject, extracted_subject)
+    except Exception as e:
+        return _subject_info_error(state, e, category, extracted_subject)
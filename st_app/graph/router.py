@@ -1,51 +1,226 @@
+import asyncio
 import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
 from st_app.utils.state import State
 from st_app.rag.llm import get_upstage_llm
 from st_app.rag.prompt import get_intent_classification_prompt
-from st_app.graph.nodes.chat_node import chat_node
-from st_app.graph.nodes.subject_info_node import subject_info_node
-from st_app.graph.nodes.rag_review_node import rag_review_node
+from st_app.graph.intent_classifier import (
+    INFO_KEYWORDS, INTENTS, REVIEW_KEYWORDS, confidence_threshold, get_intent_classifier, log_routing_decision,
+    router_mode,
+)
+from st_app.graph.nodes.chat_node import achat_node, chat_node
+from st_app.graph.nodes.subject_info_node import asubject_info_node, subject_info_node
+from st_app.graph.nodes.rag_review_node import (
+    arag_review_node, aspeculative_retrieve, rag_review_node, speculative_retrieve,
+)
+from st_app.utils.aio import get_worker_pool
+from st_app.utils.keyword_matcher import KeywordMatcher
 
-def direct_router(state: State) -> str:
-    """LLM 기반 라우팅 함수"""
-    text = (state.get("user_input") or "").strip()
-    
-    if not text:
-        return "chat"
-    
+# 폴백 라우팅 키워드 매처 (리뷰 키워드가 하나라도 있으면 rag_review 우선)
+_ROUTE_MATCHER = KeywordMatcher(
+    [(k, "rag_review") for k in REVIEW_KEYWORDS] + [(k, "subject_info") for k in INFO_KEYWORDS]
+)
+
+def _keyword_route(text: str) -> str:
+    """키워드 기반 폴백 라우팅 (입력을 한 번만 훑음)"""
+    intents = _ROUTE_MATCHER.values(text)
+    if "rag_review" in intents:
+        return "rag_review"
+    if "subject_info" in intents:
+        return "subject_info"
+    return "chat"
+
+def _parse_intent(content: str) -> Optional[str]:
+    """LLM 응답(JSON)에서 intent 추출 (파싱 실패/알 수 없는 라벨이면 None -> 폴백)"""
+    try:
+        result = json.loads(content)
+        intent = result.get("intent", "chat")
+        return intent if intent in INTENTS else None
+    except:
+        return None
+
+def _predict_local(text: str) -> Optional[Tuple[str, float]]:
+    """로컬 분류기 (의도, 확률) - ROUTER_MODE=llm이면 None"""
+    if not text or router_mode() != "local":
+        return None
+    return get_intent_classifier().predict(text)
+
+def _needs_llm(text: str, local: Optional[Tuple[str, float]]) -> bool:
+    return bool(text) and (local is None or local[1] < confidence_threshold())
+
+def _llm_route(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """LLM 기반 라우팅 -> (의도, 에러)"""
     try:
-        # LLM 기반 라우팅 시도
         llm = get_upstage_llm(temperature=0.1)
         prompt = get_intent_classification_prompt(text)
         response = llm.invoke([{"role": "user", "content": prompt}])
-        
-        # JSON 파싱 시도
-        try:
-            import json
-            result = json.loads(response.content)
-            intent = result.get("intent", "chat")
-            return intent
-        except:
-            # JSON 파싱 실패 시 키워드 기반 폴백
-            pass
+        return _parse_intent(response.content), None
     except Exception as e:
-        print(f"LLM 라우팅 실패, 키워드 기반으로 폴백: {e}")
-    
-    # 키워드 기반 폴백 라우팅
-    t = text.lower()
-    if any(k in t for k in ["후기","리뷰","평가","추천","어때","만족","재밌","별로","좋아","나빠","요약"]):
-        return "rag_review"
-    if any(k in t for k in ["위치","주소","가격","요금","티켓","운영시간","시간","어트랙션","시설","교통"]):
-        return "subject_info"
-    return "chat"
+        print(f"LLM 라우팅 실패, 폴백: {e}")
+        return None, str(e)
+
+async def _allm_route(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """_llm_route의 비동기 버전 (llm.ainvoke)"""
+    try:
+        llm = get_upstage_llm(temperature=0.1)
+        prompt = get_intent_classification_prompt(text)
+        response = await llm.ainvoke([{"role": "user", "content": prompt}])
+        return _parse_intent(response.content), None
+    except Exception as e:
+        print(f"LLM 라우팅 실패, 폴백: {e}")
+        return None, str(e)
+
+def _apply_route(state: State, text: str, t0: float, local: Optional[Tuple[str, float]],
+                 llm_intent: Optional[str], llm_called: bool, error: Optional[str]) -> State:
+    """
+    라우팅 결정과 지표를 state에 기록 (LLM 결과 > 로컬 분류기 > 키워드 순으로 사용)
+    LLM이 결정한 라우팅은 분류기 학습 로그에 남김
+    """
+    if llm_intent is not None:
+        intent, source = llm_intent, "llm"
+        log_routing_decision(text, llm_intent)
+    elif local is not None:
+        intent, source = local[0], "classifier"
+    else:
+        intent, source = _keyword_route(text), "keyword"
+
+    state["routing_decision"] = intent
+    state["routing_source"] = source
+    state["routing_confidence"] = round(local[1], 4) if local is not None else None
+    state["routing_latency_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+    state["llm_calls"] = 1 if llm_called else 0   # 턴 시작: 이후 노드가 자기 호출을 더함
+    state["router_error"] = error
+    print(f"Router - {intent} ({source}, {state['routing_latency_ms']}ms)")
+    return state
+
+# ── 추측 실행(speculative retrieval) ───────────────────────────────────────────
+# 라우팅에 LLM 호출이 필요할 때(로컬 분류기 확신 부족) 그 응답을 기다리는 동안
+# 질문 임베딩 + FAISS 검색을 미리 시작하고, rag_review로 결정되면 결과를 넘기고 아니면 버림
+# (ROUTER_SPECULATE=0이면 비활성)
+_SPEC_STATS = {"started": 0, "used": 0, "wasted": 0, "wasted_ms": 0.0}
+_SPEC_LOCK = threading.Lock()
+
+def _speculation_enabled() -> bool:
+    return os.getenv("ROUTER_SPECULATE", "1") == "1"
 
+def _count_speculation(key: str, amount: float = 1) -> None:
+    with _SPEC_LOCK:
+        _SPEC_STATS[key] += amount
+
+def _on_wasted_done(started: float):
+    """버린 추측 작업이 끝나거나 취소된 시점까지의 시간을 낭비로 집계"""
+    def callback(_future) -> None:
+        _count_speculation("wasted_ms", (time.perf_counter() - started) * 1000)
+    return callback
+
+def _start_speculation(text: str):
+    if not _speculation_enabled():
+        return None
+    _count_speculation("started")
+    return time.perf_counter(), get_worker_pool().submit(speculative_retrieve, text)
+
+def _astart_speculation(text: str):
+    if not _speculation_enabled():
+        return None
+    _count_speculation("started")
+    return time.perf_counter(), asyncio.create_task(aspeculative_retrieve(text))
+
+def _discard_speculation(speculation) -> None:
+    started, future = speculation
+    _count_speculation("wasted")
+    future.cancel()   # 아직 시작 전이면 취소, 실행 중이면 끝날 때까지 시간 집계
+    future.add_done_callback(_on_wasted_done(started))
+
+def _settle_speculation(state: State, speculation) -> State:
+    """rag_review면 미리 검색한 결과를 state로 넘기고, 아니면 버림"""
+    state["speculative_retrieval"] = None
+    if speculation is None:
+        return state
+    if state["routing_decision"] != "rag_review":
+        _discard_speculation(speculation)
+        return state
+    try:
+        state["speculative_retrieval"] = speculation[1].result()
+        _count_speculation("used")
+    except Exception as e:
+        print(f"Speculative retrieval failed: {e}")   # 노드가 다시 검색
+    return state
+
+async def _asettle_speculation(state: State, speculation) -> State:
+    """_settle_speculation의 비동기 버전"""
+    state["speculative_retrieval"] = None
+    if speculation is None:
+        return state
+    if state["routing_decision"] != "rag_review":
+        _discard_speculation(speculation)
+        return state
+    try:
+        state["speculative_retrieval"] = await speculation[1]
+        _count_speculation("used")
+    except Exception as e:
+        print(f"Speculative retrieval failed: {e}")
+    return state
+
+def speculation_stats() -> Dict[str, float]:
+    """추측 검색 통계 (wasted: 버린 횟수, wasted_ms: 버린 작업에 쓴 시간)"""
+    with _SPEC_LOCK:
+        stats = dict(_SPEC_STATS)
+    stats["wasted_ms"] = round(stats["wasted_ms"], 2)
+    stats["waste_rate"] = round(stats["wasted"] / stats["started"], 4) if stats["started"] else 0.0
+    return stats
+
+def _route(state: State, speculate: bool) -> State:
+    """분류기 -> (확신이 낮으면) LLM 순으로 라우팅, speculate면 LLM을 기다리는 동안 리뷰 검색을 미리 수행"""
+    t0 = time.perf_counter()
+    text = (state.get("user_input") or "").strip()
+    local = _predict_local(text)
+    use_llm = _needs_llm(text, local)
+    speculation = _start_speculation(text) if use_llm and speculate else None
+    llm_intent, error = _llm_route(text) if use_llm else (None, None)
+    state = _apply_route(state, text, t0, local, llm_intent, use_llm, error)
+    return _settle_speculation(state, speculation)
+
+def route_node(state: State) -> State:
+    """
+    라우터 노드: 로컬 분류기로 의도를 정하고, 확신이 낮을 때만 LLM 호출
+    (LLM을 기다리는 동안 리뷰 검색을 미리 수행)
+    state.routing_decision / routing_source / routing_latency_ms / llm_calls 기록
+    """
+    return _route(state, speculate=True)
+
+async def aroute_node(state: State) -> State:
+    """route_node의 비동기 버전"""
+    t0 = time.perf_counter()
+    text = (state.get("user_input") or "").strip()
+    local = _predict_local(text)
+    use_llm = _needs_llm(text, local)
+    speculation = _astart_speculation(text) if use_llm else None
+    llm_intent, error = (await _allm_route(text)) if use_llm else (None, None)
+    state = _apply_route(state, text, t0, local, llm_intent, use_llm, error)
+    return await _asettle_speculation(state, speculation)
+
+def direct_router(state: State) -> str:
+    """라우팅 결정만 반환 (호환용 - 결과를 쓰지 않으므로 추측 검색 없이 분류기/LLM만 사용)"""
+    return _route(dict(state), speculate=False)["routing_decision"]
+
+def _next_node(state: State) -> str:
+    return state["routing_decision"]
+
+# 노드는 동기·비동기 구현을 함께 등록
+# (compiled.invoke/stream은 동기 함수, compiled.ainvoke/astream은 async 함수를 사용)
 graph = StateGraph(State)
-graph.add_node("chat", chat_node)
-graph.add_node("subject_info", subject_info_node)
-graph.add_node("rag_review", rag_review_node)
+graph.add_node("router", RunnableLambda(route_node, aroute_node))
+graph.add_node("chat", RunnableLambda(chat_node, achat_node))
+graph.add_node("subject_info", RunnableLambda(subject_info_node, asubject_info_node))
+graph.add_node("rag_review", RunnableLambda(rag_review_node, arag_review_node))
 
-graph.add_conditional_edges(START, direct_router, {
+graph.add_edge(START, "router")
+graph.add_conditional_edges("router", _next_node, {
     "chat": "chat",
     "subject_info": "subject_info",
     "rag_review": "rag_review",
@@ -54,4 +229,33 @@ graph.add_edge("chat", END)
 graph.add_edge("subject_info", END)
 graph.add_edge("rag_review", END)
 
-compiled = graph.compile()
\ No newline at end of file
+compiled = graph.compile()
+
+def stream_graph(state: State) -> Iterator[Tuple[str, Any]]:
+    """
+    그래프를 스트리밍 모드로 실행
+    ("token", 문자열): 노드에서 LLM이 생성하는 토큰 (도착하는 대로)
+    ("state", State):  실행이 끝난 뒤 최종 상태 (마지막에 1번)
+    """
+    final_state: Dict[str, Any] = dict(state)
+    for mode, payload in compiled.stream(state, stream_mode=["custom", "values"]):
+        if mode == "custom":
+            token = payload.get("token") if isinstance(payload, dict) else None
+            if token:
+                yield "token", token
+        else:
+            final_state = payload
+    yield "state", final_state
+
+
+async def astream_graph(state: State) -> AsyncIterator[Tuple[str, Any]]:
+    """stream_graph의 비동기 버전 (async 노드 사용)"""
+    final_state: Dict[str, Any] = dict(state)
+    async for mode, payload in compiled.astream(state, stream_mode=["custom", "values"]):
+        if mode == "custom":
+            token = payload.get("token") if isinstance(payload, dict) else None
+            if token:
+                yield "token", token
+        else:
+            final_state = payload
+    yield "state", final_state
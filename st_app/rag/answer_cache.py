@@ -0,0 +1,126 @@
+"""
+의미 기반 답변 캐시 (rag_review_node)
+이전 질문 임베딩과의 코사인 유사도가 임계값 이상이면 검색/LLM 생성 없이 저장된 답변을 반환
+
+- 같은 인덱스 버전(manifest version)에서 만든 답변만 사용 -> 인덱스를 다시 만들면 전체 무효화
+- 질문에서 뽑은 필터(플랫폼/평점/기간)가 같아야 재사용
+- 최대 항목 수(LRU) + TTL 제거
+
+환경변수:
+  RAG_ANSWER_CACHE            0이면 비활성 (기본 1)
+  RAG_ANSWER_CACHE_SIZE       최대 항목 수 (기본 512)
+  RAG_ANSWER_CACHE_TTL        유효시간(초) (기본 3600)
+  RAG_ANSWER_CACHE_THRESHOLD  재사용할 최소 코사인 유사도 (기본 0.95)
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+    질문 임베딩 행렬(max_size x d)을 미리 잡아 두고 한 번의 행렬-벡터 곱으로 최근접 질문 탐색
+    """
+
+    def __init__(self, max_size: int = 512, ttl: float = 3600.0, threshold: float = 0.95):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self.version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._vectors: Optional[np.ndarray] = None          # (max_size, d)
+        self._valid = np.zeros(max_size, dtype=bool)
+        self._stored_at = np.zeros(max_size, dtype="float64")
+        self._last_used = np.zeros(max_size, dtype="float64")
+        self._keys: list = [None] * max_size                 # 필터 등 정확히 일치해야 하는 키
+        self._payloads: list = [None] * max_size
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(self._valid.sum())
+
+    def _check_version(self, version: str) -> None:
+        """인덱스 버전이 바뀌면 전체 무효화 (lock 안에서 호출)"""
+        if version != self.version:
+            self._valid[:] = False
+            self._payloads = [None] * self.max_size
+            self.version = version
+
+    def get(self, query_vec: np.ndarray, version: str, key: str = "") -> Optional[Tuple[Dict[str, Any], float]]:
+        """(저장된 payload, 유사도) 또는 None"""
+        now = time.time()
+        with self._lock:
+            self._check_version(version)
+            if self._vectors is None or not self._valid.any():
+                self.misses += 1
+                return None
+            self._valid &= (now - self._stored_at) <= self.ttl   # 만료 항목 제거
+            sims = self._vectors @ np.asarray(query_vec, dtype="float32").reshape(-1)
+            sims[~self._valid] = -np.inf
+            for slot in np.argsort(-sims)[:8]:   # key가 다른 항목은 건너뛰며 가까운 순으로 확인
+                if sims[slot] < self.threshold:
+                    break
+                if self._keys[slot] == key:
+                    self._last_used[slot] = now
+                    self.hits += 1
+                    return self._payloads[slot], float(sims[slot])
+            self.misses += 1
+            return None
+
+    def put(self, query_vec: np.ndarray, payload: Dict[str, Any], version: str, key: str = "") -> None:
+        if self.max_size <= 0:
+            return
+        vec = np.asarray(query_vec, dtype="float32").reshape(-1)
+        now = time.time()
+        with self._lock:
+            self._check_version(version)
+            if self._vectors is None or self._vectors.shape[1] != len(vec):
+                self._vectors = np.zeros((self.max_size, len(vec)), dtype="float32")
+                self._valid[:] = False
+            free = np.nonzero(~self._valid)[0]
+            slot = int(free[0]) if len(free) else int(np.argmin(self._last_used))  # 가득 차면 LRU 교체
+            self._vectors[slot] = vec
+            self._valid[slot] = True
+            self._stored_at[slot] = now
+            self._last_used[slot] = now
+            self._keys[slot] = key
+            self._payloads[slot] = payload
+
+    def clear(self) -> None:
+        with self._lock:
+            self._valid[:] = False
+            self._payloads = [None] * self.max_size
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self),
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# --------- 프로세스 전역 캐시 ---------
+_ANSWER_CACHE: Optional[SemanticAnswerCache] = None
+_ANSWER_CACHE_LOCK = threading.Lock()
+
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """RAG_ANSWER_CACHE=0이면 None"""
+    global _ANSWER_CACHE
+    if os.getenv("RAG_ANSWER_CACHE", "1") != "1":
+        return None
+    with _ANSWER_CACHE_LOCK:
+        if _ANSWER_CACHE is None:
+            _ANSWER_CACHE = SemanticAnswerCache(
+                max_size=int(os.getenv("RAG_ANSWER_CACHE_SIZE", 512)),
+                ttl=float(os.getenv("RAG_ANSWER_CACHE_TTL", 3600)),
+                threshold=float(os.getenv("RAG_ANSWER_CACHE_THRESHOLD", 0.95)),
+            )
+        return _ANSWER_CACHE
@@ -0,0 +1,90 @@
+"""
+배치 임베딩 엔진
+대량의 텍스트를 일정 크기의 배치로 나누고, 제한된 개수의 동시 요청으로 임베딩 생성
+(배치 단위 재시도 + 지수 백오프)
+"""
+from __future__ import annotations
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 1.0  # 초
+
+
+def _env_int(name: str, default: int) -> int:
+    """정수 환경변수 읽기 (잘못된 값이면 기본값)"""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class BatchEmbedder:
+    """
+    embed_documents를 제공하는 임베더(UpstageEmbeddings, FakeEmbeddings 등)를 감싸
+    배치 분할 / 동시 요청 / 재시도를 수행하는 래퍼
+    """
+
+    def __init__(
+        self,
+        embedder,
+        batch_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        self.embedder = embedder
+        self.batch_size = max(1, batch_size or _env_int("UPSTAGE_EMBED_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+        self.max_workers = max(1, max_workers or _env_int("UPSTAGE_EMBED_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+        self.max_retries = max(0, max_retries if max_retries is not None
+                               else _env_int("UPSTAGE_EMBED_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+        self.backoff = backoff
+
+    def _embed_batch(self, batch_no: int, batch: List[str]) -> List[List[float]]:
+        """배치 하나 임베딩 (실패 시 지수 백오프로 재시도)"""
+        attempt = 0
+        while True:
+            try:
+                vecs = self.embedder.embed_documents(batch)
+                if len(vecs) != len(batch):
+                    raise ValueError(f"임베딩 개수 불일치: 입력 {len(batch)}개, 결과 {len(vecs)}개")
+                return vecs
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    print(f"[Batch {batch_no}] 임베딩 실패 (재시도 {attempt}회 초과): {e}")
+                    raise
+                delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.1)
+                print(f"[Batch {batch_no}] 임베딩 실패, {delay:.1f}초 후 재시도: {e}")
+                time.sleep(delay)
+                attempt += 1
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """텍스트 리스트 -> np.ndarray(float32), 입력 순서 유지"""
+        if not texts:
+            return np.zeros((0, 0), dtype="float32")
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+        if len(batches) == 1 or self.max_workers == 1:
+            results = [self._embed_batch(i, b) for i, b in enumerate(batches)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+                # map은 입력 순서대로 결과를 돌려주므로 배치 순서가 보존됨
+                results = list(pool.map(self._embed_batch, range(len(batches)), batches))
+
+        vecs = [v for batch_vecs in results for v in batch_vecs]
+        return np.array(vecs, dtype="float32")
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """쿼리 임베딩 - 임베더의 embed_query(쿼리용 모델)를 텍스트별로 호출하되 max_workers개까지 동시에 보냄"""
+        if len(texts) <= 1 or self.max_workers == 1:
+            return [self.embedder.embed_query(t) for t in texts]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(texts))) as pool:
+            return list(pool.map(self.embedder.embed_query, texts))
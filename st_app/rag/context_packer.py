@@ -0,0 +1,139 @@
+"""
+토큰 예산 기반 컨텍스트 구성
+검색된 리뷰를 점수 순으로 예산이 찰 때까지 넣고, 긴 리뷰는 문장 단위로 잘라 넣음
+(프롬프트 길이 -> LLM 지연시간/비용 상한)
+
+환경변수:
+  RAG_CONTEXT_TOKENS   컨텍스트 토큰 예산 (기본 1200, 0이면 제한 없음)
+  RAG_TOKENIZER        토큰 수 계산용 HuggingFace 토크나이저 (기본 klue/bert-base)
+                       로드할 수 없으면 글자 수 기반 추정으로 대체
+                       요청 경로에서는 로컬 캐시만 사용하고, 다운로드는 앱 시작 시 warm_up_tokenizer에서 함
+"""
+from __future__ import annotations
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+DEFAULT_CONTEXT_TOKENS = 1200
+DEFAULT_TOKENIZER = "klue/bert-base"
+MIN_REVIEW_TOKENS = 24      # 이보다 적게 남으면 잘라 넣지 않음
+SEPARATOR = "\n\n"
+
+_SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]*\s*|\n+")
+_HANGUL_RE = re.compile(r"[가-힣]")
+_WORD_RE = re.compile(r"[A-Za-z0-9]+|[^\sA-Za-z0-9가-힣]")
+
+_TOKENIZER = None
+_TOKENIZER_LOADED = False
+_TOKENIZER_LOCK = threading.Lock()
+
+
+def context_budget_from_env() -> int:
+    return int(os.getenv("RAG_CONTEXT_TOKENS", DEFAULT_CONTEXT_TOKENS))
+
+
+def _load_tokenizer(local_files_only: bool):
+    name = os.getenv("RAG_TOKENIZER", DEFAULT_TOKENIZER)
+    try:
+        from transformers import AutoTokenizer
+
+        return AutoTokenizer.from_pretrained(name, local_files_only=local_files_only)
+    except Exception as e:
+        print(f"Tokenizer {name} unavailable, using character-based estimate: {e}")
+        return None
+
+
+def get_tokenizer():
+    """토크나이저 1회 로드 - 로컬 캐시에서만 (네트워크 대기 없음, 없으면 None -> 추정치 사용)"""
+    global _TOKENIZER, _TOKENIZER_LOADED
+    with _TOKENIZER_LOCK:
+        if not _TOKENIZER_LOADED:
+            _TOKENIZER_LOADED = True
+            _TOKENIZER = _load_tokenizer(local_files_only=True)
+        return _TOKENIZER
+
+
+def warm_up_tokenizer() -> bool:
+    """
+    앱 시작 시 호출: 로컬에 없으면 내려받아 로드 (로드됐으면 True)
+    요청 처리 중에 모델 다운로드로 막히지 않도록 함
+    """
+    global _TOKENIZER, _TOKENIZER_LOADED
+    with _TOKENIZER_LOCK:
+        if _TOKENIZER is None:
+            _TOKENIZER = _load_tokenizer(local_files_only=False)
+            _TOKENIZER_LOADED = True
+            count_tokens.cache_clear()   # 추정치로 계산해 둔 값 폐기
+        return _TOKENIZER is not None
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 보수적으로 추정 (한글 1글자 ≈ 1토큰, 영문/숫자 단어와 기호 1토큰)"""
+    return len(_HANGUL_RE.findall(text)) + len(_WORD_RE.findall(text))
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return estimate_tokens(text)
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_RE.findall(text) if s.strip()]
+
+
+def fit_text(text: str, budget: int) -> str:
+    """
+    budget 토큰 안에 들어가도록 앞 문장부터 채움
+    첫 문장만으로도 넘치면 글자 단위로 잘라 "…"를 붙임
+    """
+    if count_tokens(text) <= budget:
+        return text
+    kept, used = [], 0
+    for sentence in split_sentences(text):
+        n = count_tokens(sentence)
+        if used + n > budget - 1:  # "…" 자리
+            break
+        kept.append(sentence)
+        used += n
+    if kept:
+        return "".join(kept).strip() + " …"
+
+    lo, hi = 0, len(text)  # 예산 안에 드는 가장 긴 접두사 (이분 탐색)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid]) + 1 <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo].rstrip() + " …" if lo else ""
+
+
+def pack_context(blocks: Sequence[Tuple[str, str]], budget: Optional[int] = None) -> Tuple[List[int], str, int]:
+    """
+    blocks: 점수 순 (본문, 출처 줄) 리스트
+    반환: (사용한 block 위치, 컨텍스트 문자열, 사용한 토큰 수)
+    budget이 0 이하/None이면 전체를 그대로 사용
+    """
+    parts: List[str] = []
+    used_positions: List[int] = []
+    used = 0
+    sep_tokens = count_tokens(SEPARATOR) if blocks else 0
+    for pos, (body, source) in enumerate(blocks):
+        overhead = count_tokens(source) + (sep_tokens if parts else 0)
+        if budget and budget > 0:
+            remaining = budget - used - overhead
+            if remaining < min(MIN_REVIEW_TOKENS, count_tokens(body)):
+                continue  # 다음(더 짧을 수 있는) 리뷰로
+            body = fit_text(body, remaining)
+            if not body:
+                continue
+        block = f"{body}\n{source}"
+        used += count_tokens(block) + (sep_tokens if parts else 0)
+        parts.append(block)
+        used_positions.append(pos)
+    return used_positions, SEPARATOR.join(parts), used
@@ -2,113 +2,508 @@
 FAISS 인덱스 생성 및 임베딩 관련 기능
 """
 import os
+import ast
+import asyncio
 import json
-"""
-FAISS 인덱스 생성 및 임베딩 관련 기능
-"""
-import os
-import json
+import shutil
+import time
+import hashlib
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 import faiss
 from langchain.schema import Document
 
+from st_app.rag.batch_embedder import BatchEmbedder
+from st_app.rag.embedding_backends import (
+    EmbedderMismatchError, check_embedder_dimension, check_embedder_spec, embed_backend_from_env,
+    embedder_spec, get_fake_embeddings, get_local_embeddings,
+)
+from st_app.rag.embedding_cache import embed_with_cache, get_embedding_cache, normalize_text
+from st_app.rag.query_cache import QueryEmbeddingCache, get_query_cache
+from st_app.rag.sparse_index import BM25_DIR, BM25Index, reciprocal_rank_fusion
+from st_app.rag.search_hits import SearchHits
+from st_app.rag.mmr import maximal_marginal_relevance
+from st_app.rag.near_dup import cluster_near_duplicates, dedup_enabled, threshold_from_env
+from st_app.rag.metadata_store import (META_DIR, ColumnarMetadata, has_columnar_metadata, migrate_meta_json,
+                                       read_meta_json)
+from st_app.rag.index_factory import (
+    apply_search_params,
+    apply_search_params_from_env,
+    create_index,
+    describe_index,
+    index_config_from_env,
+    search_params_with_selector,
+    search_with_selector,
+    supports_remove,
+    train_index,
+)
+from st_app.utils.aio import run_blocking
+
+INDEX_FILE = "index.faiss"
+META_FILE = "meta.json"  # 구버전 메타데이터 (로드 시 메모리에서 변환, 디스크 변환은 갱신/CLI 단계에서)
+MANIFEST_FILE = "manifest.json"
+DATA_DIR_PREFIX = "data-"  # 버전별 데이터 디렉터리 (manifest의 data_dir이 현재 버전을 가리킴)
+
+
+def _embed_model_name(embedder=None) -> str:
+    """임베딩 캐시 키에 쓰일 모델명"""
+    if embedder is not None and not type(embedder).__name__.startswith("Upstage"):
+        return getattr(embedder, "model", None) or type(embedder).__name__
+    return os.getenv("UPSTAGE_EMBED_MODEL", "solar-embedding-1-large")
+
+
+def _get_upstage_embeddings():
+    """Upstage 임베딩 클라이언트 생성 (API 키/모델명은 환경변수에서)"""
+    from langchain_upstage import UpstageEmbeddings
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    api_key = os.getenv("UPSTAGE_API_KEY")
+    if not api_key:
+        raise ValueError("UPSTAGE_API_KEY가 설정되지 않았습니다.")
+
+    # ✅ 최신 모델명 (환경변수로 오버라이드 가능)
+    model_name = _embed_model_name()
+    return UpstageEmbeddings(model=model_name, api_key=api_key)
+
+
+def _get_embeddings():
+    """RAG_EMBED_BACKEND(upstage | local | fake)에 맞는 임베더"""
+    backend = embed_backend_from_env()
+    if backend == "local":
+        return get_local_embeddings()
+    if backend == "fake":
+        return get_fake_embeddings()
+    return _get_upstage_embeddings()
+
+def embed_query_texts(texts: List[str], embedder) -> List[List[float]]:
+    """
+    여러 쿼리를 쿼리용 모델로 임베딩
+    공개 API embed_query를 쿼리별로 호출하고, BatchEmbedder로 동시에 보내 왕복 지연을 겹침
+    """
+    if not texts:
+        return []
+    return BatchEmbedder(embedder).embed_queries(texts)
+
+
+async def aembed_query_texts(texts: List[str], embedder) -> List[List[float]]:
+    """
+    embed_query_texts의 비동기 버전
+    - aembed_query가 있는 임베더(Upstage, fake 등): 쿼리별 요청을 동시에 보냄 (이벤트 루프를 막지 않음)
+    - 그 외 임베더(local): 공용 스레드 풀에서 embed_query_texts 실행
+    """
+    if not texts:
+        return []
+    if hasattr(embedder, "aembed_query"):
+        return list(await asyncio.gather(*(embedder.aembed_query(t) for t in texts)))
+    return await run_blocking(embed_query_texts, texts, embedder)
+
+def doc_id(doc: Document) -> int:
+    """
+    리뷰 식별용 64bit 정수 ID (FAISS 외부 ID로 사용)
+    플랫폼/날짜/평점/정규화된 본문이 같으면 같은 ID
+    """
+    md = doc.metadata or {}
+    key = "|".join([
+        str(md.get("platform") or ""),
+        str(md.get("date") or ""),
+        str(md.get("rating")),
+        normalize_text(doc.page_content),
+    ])
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little") & 0x7FFFFFFFFFFFFFFF
+
+
+def _to_json_value(value):
+    """numpy 스칼라/NaN을 JSON 저장 가능한 값으로 변환"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    return value
+
+
+def _doc_to_meta(doc: Document, id_: int) -> Dict[str, Any]:
+    """Document -> meta.json 항목"""
+    return {
+        "id": id_,
+        "content": doc.page_content,  # 리뷰 내용 포함
+        "platform": doc.metadata.get('platform', ''),
+        "subject": doc.metadata.get('subject', ''),
+        "place": doc.metadata.get('place', ''),
+        "date": doc.metadata.get('date', ''),
+        "rating": _to_json_value(doc.metadata.get('rating')),
+        "url": doc.metadata.get('url', ''),
+        "tokens": " ".join(doc.metadata.get('tokens') or []),  # BM25용 토큰 (공백 구분)
+        "dup_cluster": doc.metadata.get('dup_cluster', -1),  # 근사 중복 클러스터 (없으면 -1)
+    }
+
+
 class FAISSVectorStore:
     """FAISS 인덱스를 래핑한 벡터 스토어 클래스"""
     
-    def __init__(self, index: faiss.Index, metadata: List[Dict[str, Any]], embedder=None):
+    def __init__(self, index: faiss.Index, metadata, embedder=None,
+                 index_path: Optional[str] = None, read_only: bool = False,
+                 query_cache: Optional[QueryEmbeddingCache] = None, bm25: Optional[BM25Index] = None,
+                 version: int = 0):
         self.index = index
+        self.manifest_version = version  # 로드한 인덱스의 manifest version
+        self._generation = -1            # 로드 이후 메모리에서 변경된 횟수
+        self.read_only = read_only  # mmap으로 로드된 인덱스는 수정 불가
+        # 쿼리 임베딩 캐시 (기본: 프로세스 전역 캐시 -> 인덱스를 다시 로드해도 유지)
+        self.query_cache = query_cache if query_cache is not None else get_query_cache()
+        self._filter_cache: Dict[str, Tuple[Optional[faiss.SearchParameters], int, np.ndarray]] = {}
+        self.bm25 = bm25  # 없으면 hybrid 검색 시 메타데이터로 생성
+        # List[Dict](meta.json 형식)도 받아서 컬럼형으로 변환
+        if not isinstance(metadata, ColumnarMetadata):
+            metadata = ColumnarMetadata.from_records(metadata)
         self.metadata = metadata
         self.embedder = embedder
+        self.index_path = index_path
+        self._rebuild_id_map()
+    
+    def _rebuild_id_map(self) -> None:
+        """FAISS 외부 ID -> 메타데이터 행 번호 매핑용 정렬 배열 (ID가 없는 구버전 인덱스는 행 번호 그대로)"""
+        self._generation += 1
+        ids = np.asarray(self.metadata.ids)
+        if len(ids) and ids[0] < 0:
+            self._sorted_ids = None
+            self._sort_order = None
+        else:
+            self._sort_order = np.argsort(ids, kind="stable")
+            self._sorted_ids = ids[self._sort_order]
+        self._filter_cache = {}
+    
+    @property
+    def version(self) -> str:
+        """검색 결과가 바뀌는 시점마다 달라지는 인덱스 버전 (답변 캐시 무효화용)"""
+        if self._generation == 0:
+            return str(self.manifest_version)
+        return f"{self.manifest_version}+{self._generation}"
+    
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise ValueError("읽기 전용(mmap)으로 로드된 인덱스는 수정할 수 없습니다. mmap=False로 로드하세요.")
+        if not self.has_ids:
+            raise ValueError("ID가 없는 구버전 인덱스입니다. create_faiss_index()로 재생성하세요.")
+    
+    @property
+    def has_ids(self) -> bool:
+        """리뷰 ID 기반 인덱스인지 (False면 증분 갱신 불가한 구버전)"""
+        return self._sorted_ids is not None
+    
+    def _rows_for_labels(self, labels) -> np.ndarray:
+        """FAISS 검색 결과 라벨 배열 -> 메타데이터 행 번호 배열 (없으면 -1)"""
+        labels = np.asarray(labels, dtype="int64")
+        if self._sorted_ids is None:
+            return np.where((labels >= 0) & (labels < len(self.metadata)), labels, -1)
+        if len(self._sorted_ids) == 0:
+            return np.full(labels.shape, -1, dtype="int64")
+        pos = np.minimum(np.searchsorted(self._sorted_ids, labels), len(self._sorted_ids) - 1)
+        found = self._sorted_ids[pos] == labels
+        return np.where(found, self._sort_order[pos], -1)
+    
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+        """근사 인덱스 검색 파라미터 조정 (IVF nprobe / HNSW efSearch)"""
+        apply_search_params(self.index, nprobe=nprobe, ef_search=ef_search)
     
     def _get_embedder(self):
         """임베딩 함수 lazy loading"""
         if self.embedder is None:
-            from langchain_upstage import UpstageEmbeddings
-            from dotenv import load_dotenv
-            
-            load_dotenv()
-            api_key = os.getenv("UPSTAGE_API_KEY")
-            if not api_key:
-                raise ValueError("UPSTAGE_API_KEY가 설정되지 않았습니다.")
-            
-            model_name = os.getenv("UPSTAGE_EMBED_MODEL", "solar-embedding-1-large")
-            self.embedder = UpstageEmbeddings(model=model_name, api_key=api_key)
+            embedder = _get_embeddings()
+            check_embedder_dimension(embedder, self.index.d)
+            self.embedder = embedder
         
         return self.embedder
     
+    def embed_query(self, query: str) -> np.ndarray:
+        """정규화된 쿼리 임베딩 (d,) - 쿼리 임베딩 캐시 사용"""
+        return self._embed_query(query)[0]
+    
     def _embed_query(self, query: str) -> np.ndarray:
-        """쿼리 임베딩"""
+        """쿼리 임베딩 (캐시에 있으면 원격 호출 생략)"""
+        return self._embed_queries([query])
+    
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        여러 쿼리 임베딩 -> (len(queries), d) 정규화된 행렬
+        캐시에 없는 쿼리만 모아 한 번에 임베딩
+        """
         embedder = self._get_embedder()
-        embedding = embedder.embed_query(query)
-        embedding_array = np.array([embedding], dtype='float32')
-        faiss.normalize_L2(embedding_array)  # 코사인 유사도를 위한 정규화
-        return embedding_array
+        model = _embed_model_name(embedder)
+        vectors: List[Optional[np.ndarray]] = [self.query_cache.get(q, model, self.index.d) for q in queries]
+        missing = [i for i, vec in enumerate(vectors) if vec is None]
+        
+        if missing:
+            embedding_array = np.array(embed_query_texts([queries[i] for i in missing], embedder), dtype='float32')
+            faiss.normalize_L2(embedding_array)  # 코사인 유사도를 위한 정규화
+            for i, vec in zip(missing, embedding_array):
+                vectors[i] = self.query_cache.put(queries[i], model, vec)
+        return np.vstack(vectors)
     
-    def similarity_search(self, query: str, k: int = 5) -> List[Document]:
+    async def aembed_query(self, query: str) -> np.ndarray:
+        """embed_query의 비동기 버전 (캐시에 없을 때만 비동기 임베딩 호출)"""
+        return (await self._aembed_query(query))[0]
+    
+    async def _aembed_query(self, query: str) -> np.ndarray:
+        embedder = self._get_embedder()
+        model = _embed_model_name(embedder)
+        cached = self.query_cache.get(query, model, self.index.d)
+        if cached is not None:
+            return cached[None, :]
+        embedding_array = np.array(await aembed_query_texts([query], embedder), dtype='float32')
+        faiss.normalize_L2(embedding_array)
+        return self.query_cache.put(query, model, embedding_array[0])[None, :]
+    
+    def query_cache_stats(self) -> Dict[str, float]:
+        """쿼리 임베딩 캐시 hit/miss 통계"""
+        return self.query_cache.stats()
+    
+    def _filter_params(self, filter: Dict[str, Any]) -> Tuple[Optional[faiss.SearchParameters], int, np.ndarray]:
+        """
+        메타데이터 필터 -> (IDSelector가 담긴 SearchParameters, 조건을 만족하는 문서 수, 행 마스크)
+        같은 필터는 캐시해 재사용 (조건이 없으면 params=None)
+        """
+        key = json.dumps(filter, sort_keys=True, ensure_ascii=False, default=str)
+        cached = self._filter_cache.get(key)
+        if cached is None:
+            mask = self.metadata.filter_mask(filter)
+            n_allowed = int(mask.sum())
+            if n_allowed == len(mask):
+                cached = (None, n_allowed, mask)
+            else:
+                ids = np.asarray(self.metadata.ids)[mask] if self.has_ids else np.nonzero(mask)[0]
+                cached = (search_params_with_selector(self.index, ids), n_allowed, mask)
+            if len(self._filter_cache) >= 128:
+                self._filter_cache.pop(next(iter(self._filter_cache)))
+            self._filter_cache[key] = cached
+        return cached
+    
+    def similarity_search(self, query: str, k: int = 5, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
         """유사도 검색 (점수 없이)"""
-        docs_with_scores = self.similarity_search_with_score(query, k)
+        docs_with_scores = self.similarity_search_with_score(query, k, filter=filter)
         return [doc for doc, _ in docs_with_scores]
     
-    def similarity_search_with_score(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
-        """유사도 검색 (점수 포함)"""
-        # 쿼리 임베딩
-        query_embedding = self._embed_query(query)
+    def similarity_search_with_score(self, query: str, k: int = 5,
+                                     filter: Optional[Dict[str, Any]] = None) -> List[Tuple[Document, float]]:
+        """
+        유사도 검색 (점수 포함)
+        filter: 메타데이터 조건 (예: {"platform": "kakaomap", "rating": 1,
+                "date": {"min": "2024-07-01"}}) - FAISS 검색 내부에서 IDSelector로 적용되어
+                조건을 만족하는 문서 중 상위 k개를 반환
+        """
+        return self.search_hits(query, k, filter=filter).to_pairs()
+    
+    def search_hits(self, query: str, k: int = 5, filter: Optional[Dict[str, Any]] = None) -> SearchHits:
+        """
+        유사도 검색 -> SearchHits (Document를 만들지 않는 배열 기반 결과)
+        FAISS IndexFlatIP는 내적을 반환하므로, 정규화된 벡터에서는 점수가 코사인 유사도
+        """
+        scores, rows = self._dense_search(self._embed_query(query), k, filter)
+        return SearchHits(self.metadata, rows, scores)
+    
+    async def asearch_hits(self, query: str, k: int = 5, filter: Optional[Dict[str, Any]] = None) -> SearchHits:
+        """search_hits의 비동기 버전 (임베딩은 await, FAISS 검색은 스레드 풀에서 실행)"""
+        query_embedding = await self._aembed_query(query)
+        scores, rows = await run_blocking(self._dense_search, query_embedding, k, filter)
+        return SearchHits(self.metadata, rows, scores)
+    
+    def batch_similarity_search_with_score(self, queries: List[str], k: int = 5,
+                                           filter: Optional[Dict[str, Any]] = None) -> List[List[Tuple[Document, float]]]:
+        """
+        여러 쿼리를 한 번에 검색 (오프라인 평가, 쿼리 확장용)
+        임베딩은 한 요청으로, FAISS 검색은 쌓은 쿼리 행렬에 대해 한 번만 수행
+        반환: 쿼리 순서대로 [(Document, 점수)] 리스트
+        """
+        if not queries:
+            return []
+        scores, rows = self._dense_search_batch(self._embed_queries(queries), k, filter)
+        return [SearchHits(self.metadata, r[r >= 0], s[r >= 0]).to_pairs() for s, r in zip(scores, rows)]
+    
+    def _dense_search(self, query_embedding: np.ndarray, k: int,
+                      filter: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """FAISS 검색 -> (점수, 메타데이터 행 번호) - 유효한 결과만"""
+        scores, rows = self._dense_search_batch(query_embedding, k, filter)
+        valid = rows[0] >= 0  # 유효한 인덱스 확인
+        return scores[0][valid], rows[0][valid]
+    
+    def _dense_search_batch(self, query_embeddings: np.ndarray, k: int,
+                            filter: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """쿼리 행렬 FAISS 검색 -> (점수, 메타데이터 행 번호) 모두 (n, k), 결과 없는 칸은 -1"""
+        params = None
+        if filter:
+            params, n_allowed, _ = self._filter_params(filter)
+            if n_allowed == 0:
+                empty = np.full((len(query_embeddings), k), -1, dtype='int64')
+                return empty.astype('float32'), empty
         
-        # FAISS 검색
-        scores, indices = self.index.search(query_embedding, k)
+        if params is None:
+            scores, indices = self.index.search(query_embeddings, k)
+        else:
+            scores, indices = search_with_selector(self.index, query_embeddings, k, params, n_allowed)
         
-        # 결과 변환
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx >= 0 and idx < len(self.metadata):  # 유효한 인덱스 확인
-                meta = self.metadata[idx]
-                
-                # Document 생성
-                doc = Document(
-                    page_content=meta.get('content', ''),
-                    metadata={
-                        "platform": meta.get('platform', ''),
-                        "subject": meta.get('subject', ''),
-                        "place": meta.get('place', ''),
-                        "date": meta.get('date', ''),
-                        "rating": meta.get('rating'),
-                        "url": meta.get('url', ''),
-                        "source_row": idx,  # 원본 인덱스
-                        "chunk_index": idx
-                    }
-                )
-                
-                # FAISS IndexFlatIP는 내적을 반환하므로, 정규화된 벡터에서는 코사인 유사도
-                similarity_score = float(score)
-                results.append((doc, similarity_score))
+        rows = self._rows_for_labels(indices.ravel()).reshape(indices.shape)
+        return scores, rows
+    
+    def _reconstruct_rows(self, rows: np.ndarray) -> Optional[np.ndarray]:
+        """메타데이터 행들의 저장된 벡터 복원 (인덱스가 지원하지 않으면 None)"""
+        labels = np.asarray(self.metadata.ids)[rows] if self.has_ids else np.asarray(rows)
+        try:
+            return self.index.reconstruct_batch(np.ascontiguousarray(labels, dtype='int64')).astype('float32')
+        except RuntimeError:
+            return None
+    
+    def mmr_rerank(self, query: str, hits: SearchHits, k: Optional[int] = None,
+                   lambda_mult: float = 0.5) -> SearchHits:
+        """
+        검색 결과를 MMR 순서로 재정렬해 상위 k개 반환 (k 생략 시 전체 순서만 변경)
+        후보 벡터는 인덱스에서 복원 (PQ 인덱스는 근사 벡터), 복원할 수 없으면 기존 순서 유지
+        """
+        k = len(hits) if k is None else k
+        if len(hits) <= 1:
+            return hits.take(slice(0, k))
+        vectors = self._reconstruct_rows(hits.rows)
+        if vectors is None:
+            return hits.take(slice(0, k))
+        order = maximal_marginal_relevance(self._embed_query(query)[0], vectors, k=k, lambda_mult=lambda_mult)
+        return hits.take(order)
+    
+    def max_marginal_relevance_search_hits(self, query: str, k: int = 5, fetch_k: int = 20,
+                                           lambda_mult: float = 0.5,
+                                           filter: Optional[Dict[str, Any]] = None) -> SearchHits:
+        """상위 fetch_k개 후보에서 MMR로 다양성을 고려해 k개 선택"""
+        return self.mmr_rerank(query, self.search_hits(query, fetch_k, filter=filter), k=k, lambda_mult=lambda_mult)
+    
+    def max_marginal_relevance_search(self, query: str, k: int = 5, fetch_k: int = 20,
+                                      lambda_mult: float = 0.5,
+                                      filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """MMR 검색 (LangChain VectorStore와 같은 이름/인자)"""
+        return self.max_marginal_relevance_search_hits(
+            query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, filter=filter
+        ).to_documents()
+    
+    def _get_bm25(self) -> BM25Index:
+        """BM25 역색인 lazy loading (저장된 것이 없으면 메타데이터로 생성)"""
+        if self.bm25 is None or self.bm25.n_docs != len(self.metadata):
+            self.bm25 = BM25Index.from_metadata(self.metadata)
+        return self.bm25
+    
+    def hybrid_search_with_score(self, query: str, k: int = 5, fetch_k: int = 20, rrf_k: int = 60,
+                                 filter: Optional[Dict[str, Any]] = None) -> List[Tuple[Document, float]]:
+        """
+        BM25 + 벡터 하이브리드 검색 -> [(Document, RRF 점수)]
+        코사인 유사도/BM25 점수는 metadata의 similarity / bm25_score에 기록
+        """
+        return self.hybrid_search_hits(query, k, fetch_k=fetch_k, rrf_k=rrf_k, filter=filter).to_pairs()
+    
+    def hybrid_search_hits(self, query: str, k: int = 5, fetch_k: int = 20, rrf_k: int = 60,
+                           filter: Optional[Dict[str, Any]] = None) -> SearchHits:
+        """
+        BM25 + 벡터 하이브리드 검색
+        - 각각 상위 fetch_k개를 구한 뒤 Reciprocal Rank Fusion으로 합쳐 상위 k개 반환
+        - scores는 RRF 점수, similarity/bm25는 각 검색의 점수
+          (BM25로만 찾은 문서의 유사도는 저장된 벡터로 계산, 불가하면 NaN)
+        """
+        return self._hybrid_search(query, self._embed_query(query), k, fetch_k, rrf_k, filter)
+    
+    async def ahybrid_search_hits(self, query: str, k: int = 5, fetch_k: int = 20, rrf_k: int = 60,
+                                  filter: Optional[Dict[str, Any]] = None) -> SearchHits:
+        """hybrid_search_hits의 비동기 버전 (임베딩은 await, FAISS/BM25 검색은 스레드 풀에서 실행)"""
+        query_embedding = await self._aembed_query(query)
+        return await run_blocking(self._hybrid_search, query, query_embedding, k, fetch_k, rrf_k, filter)
+    
+    def _hybrid_search(self, query: str, query_embedding: np.ndarray, k: int, fetch_k: int, rrf_k: int,
+                       filter: Optional[Dict[str, Any]] = None) -> SearchHits:
+        dense_scores, dense_rows = self._dense_search(query_embedding, fetch_k, filter)
+        
+        mask = self._filter_params(filter)[2] if filter else None
+        sparse_scores, sparse_rows = self._get_bm25().search(query, fetch_k, mask=mask)
         
-        return results
+        fused = reciprocal_rank_fusion([dense_rows.tolist(), sparse_rows.tolist()], rrf_k=rrf_k)[:k]
+        if not fused:
+            return SearchHits.empty(self.metadata)
+        rows = np.array([row for row, _ in fused], dtype='int64')
+        rrf_scores = np.array([score for _, score in fused], dtype='float32')
+        
+        similarity = np.full(len(rows), np.nan, dtype='float32')
+        _, dense_idx, fused_idx = np.intersect1d(dense_rows, rows, return_indices=True)
+        similarity[fused_idx] = dense_scores[dense_idx]
+        bm25 = np.full(len(rows), np.nan, dtype='float32')
+        _, sparse_idx, fused_idx = np.intersect1d(sparse_rows, rows, return_indices=True)
+        bm25[fused_idx] = sparse_scores[sparse_idx]
+        
+        missing = np.nonzero(np.isnan(similarity))[0]
+        if len(missing):
+            vecs = self._reconstruct_rows(rows[missing])
+            if vecs is not None:
+                similarity[missing] = vecs @ query_embedding[0]
+        
+        return SearchHits(self.metadata, rows, rrf_scores, similarity=similarity, bm25=bm25)
     
-    def add_documents(self, documents: List[Document]) -> None:
-        """문서 추가 (선택적 기능)"""
-        # 새 문서들의 텍스트 추출
-        texts = [doc.page_content for doc in documents]
+    def add_documents(self, documents: List[Document], persist: bool = False) -> None:
+        """
+        문서 추가
+        - 이미 인덱싱된 문서(같은 ID)는 건너뜀
+        - persist=True 이면 인덱스/메타데이터를 디스크에 저장 (index_path 필요)
+        """
+        self._check_writable()
+
+        docs, ids = _unique_documents(documents)
+        is_new = self._rows_for_labels(ids) < 0
+        new_docs = [doc for doc, new in zip(docs, is_new) if new]
+        new_ids = [id_ for id_, new in zip(ids, is_new) if new]
         
-        # 임베딩 생성
-        embeddings = create_embeddings(texts)
+        if new_docs:
+            # 임베딩 생성 (캐시에 있는 문서는 API 호출 생략)
+            texts = [doc.page_content for doc in new_docs]
+            embeddings = create_embeddings(texts, embedder=self._get_embedder())
+            faiss.normalize_L2(embeddings)
+            
+            # 인덱스/메타데이터에 추가
+            self.index.add_with_ids(embeddings, np.array(new_ids, dtype='int64'))
+            self.metadata = self.metadata.extend([_doc_to_meta(doc, id_) for doc, id_ in zip(new_docs, new_ids)])
+            self._rebuild_id_map()
+            self.bm25 = None
         
-        # 인덱스에 추가
-        self.index.add(embeddings.astype('float32'))
+        if persist:
+            self.save()
+    
+    def remove_ids(self, ids: List[int], persist: bool = False) -> int:
+        """ID로 문서 삭제, 삭제된 개수 반환"""
+        self._check_writable()
+
+        targets = np.unique(np.asarray(ids, dtype='int64'))
+        targets = targets[self._rows_for_labels(targets) >= 0]
+        if len(targets):
+            self.index.remove_ids(targets)
+            keep = ~np.isin(np.asarray(self.metadata.ids), targets)
+            self.metadata = self.metadata.take(np.nonzero(keep)[0])
+            self._rebuild_id_map()
+            self.bm25 = None
         
-        # 메타데이터 추가
-        for doc in documents:
-            meta = {
-                "content": doc.page_content,
-                "platform": doc.metadata.get('platform', ''),
-                "subject": doc.metadata.get('subject', ''),
-                "place": doc.metadata.get('place', ''),
-                "date": doc.metadata.get('date', ''),
-                "rating": doc.metadata.get('rating'),
-                "url": doc.metadata.get('url', '')
-            }
-            self.metadata.append(meta)
+        if persist:
+            self.save()
+        return len(targets)
+    
+    def save(self, index_path: Optional[str] = None) -> None:
+        """인덱스와 메타데이터를 디스크에 저장"""
+        index_path = index_path or self.index_path
+        if not index_path:
+            raise ValueError("저장할 index_path가 지정되지 않았습니다.")
+        _save_index_files(self.index, self.metadata, index_path, bm25=self._get_bm25())
+        self.index_path = index_path
+        self.manifest_version = read_manifest(index_path).get("version", 0)
+        self._generation = 0
+
+def _parse_tokens(value) -> List[str]:
+    """전처리 CSV의 tokenized_content("['서울', '##이', ...]") -> 토큰 리스트"""
+    if not isinstance(value, str) or not value.startswith("["):
+        return []
+    try:
+        return [str(t) for t in ast.literal_eval(value)]
+    except (ValueError, SyntaxError):
+        return []
 
 def load_review_data() -> List[Dict[str, Any]]:
     """리뷰 데이터 로드"""
@@ -130,6 +525,7 @@ def load_review_data() -> List[Dict[str, Any]]:
                 for _, row in df.iterrows():
                     review = {
                         "content": str(row.get('content', '')),
+                        "tokens": _parse_tokens(row.get('tokenized_content')),
                         "rating": row.get('rating'),
                         "date": str(row.get('date', '')),
                         "platform": platform,
@@ -143,7 +539,11 @@ def load_review_data() -> List[Dict[str, Any]]:
     return reviews
 
 def create_documents_from_reviews(reviews: List[Dict[str, Any]]) -> List[Document]:
-    """리뷰 데이터를 LangChain Document로 변환"""
+    """
+    리뷰 데이터를 LangChain Document로 변환
+    근사 중복 리뷰는 MinHash LSH로 묶어 metadata["dup_cluster"]에 대표 리뷰 ID를 기록
+    (검색 시 같은 클러스터는 하나만 사용)
+    """
     documents = []
     
     for review in reviews:
@@ -157,111 +557,307 @@ def create_documents_from_reviews(reviews: List[Dict[str, Any]]) -> List[Documen
                     "place": review.get('place', ''),
                     "date": review.get('date', ''),
                     "rating": review.get('rating'),
-                    "url": review.get('url', '')
+                    "url": review.get('url', ''),
+                    "tokens": review.get('tokens') or []
                 }
             )
             documents.append(doc)
     
+    if dedup_enabled() and documents:
+        clusters = cluster_near_duplicates([d.page_content for d in documents], threshold_from_env())
+        rep_ids = {int(c): doc_id(documents[c]) for c in np.unique(clusters)}
+        for doc, cluster in zip(documents, clusters):
+            doc.metadata["dup_cluster"] = rep_ids[int(cluster)]
+        print(f"Near-duplicate clusters: {len(rep_ids)} (documents: {len(documents)})")
+    
     return documents
 
-def create_embeddings(texts: List[str]) -> np.ndarray:
-    """Upstage API를 사용한 임베딩 생성 -> np.ndarray(float32)로 반환"""
+def create_embeddings(
+    texts: List[str],
+    embedder=None,
+    batch_size: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> np.ndarray:
+    """
+    임베딩 생성 (기본: RAG_EMBED_BACKEND 백엔드) -> np.ndarray(float32)로 반환
+    - 디스크 임베딩 캐시(텍스트 해시 + 모델명)에 있는 텍스트는 API를 호출하지 않음
+      (RAG_EMBED_CACHE=0 또는 use_cache=False 로 비활성화)
+    - batch_size 단위로 나누어 최대 max_workers개의 요청을 동시에 보냄
+      (기본값: UPSTAGE_EMBED_BATCH_SIZE / UPSTAGE_EMBED_MAX_WORKERS 환경변수)
+    - 배치별로 재시도하므로 일부 요청 실패가 전체 작업을 날리지 않음
+    - embedder를 넘기면 해당 임베더 사용 (예: 오프라인 벤치마크용 FakeEmbeddings)
+    """
     try:
-        from langchain_upstage import UpstageEmbeddings
-        from dotenv import load_dotenv
-
-        load_dotenv()
-        api_key = os.getenv("UPSTAGE_API_KEY")
-        if not api_key:
-            raise ValueError("UPSTAGE_API_KEY가 설정되지 않았습니다.")
-
-        # ✅ 최신 모델명 (환경변수로 오버라이드 가능)
-        model_name = os.getenv("UPSTAGE_EMBED_MODEL", "solar-embedding-1-large")
-
-        emb = UpstageEmbeddings(model=model_name, api_key=api_key)
-
-        # 간단 헬스체크(첫 문장만 시도해봄; 실패 시 즉시 명확한 에러)
-        _ = emb.embed_documents([texts[0] if texts else "healthcheck"])
+        if embedder is None:
+            embedder = _get_embeddings()
 
-        # 실제 임베딩
-        vecs: List[List[float]] = emb.embed_documents(texts)
-        arr = np.array(vecs, dtype="float32")  # ✅ numpy 변환
-        return arr
+        # 로컬 CPU 임베더는 동시 요청 대신 모델 내부 배치/스레드로 처리
+        max_workers = max_workers or getattr(embedder, "max_concurrency", None)
+        engine = BatchEmbedder(embedder, batch_size=batch_size, max_workers=max_workers)
+        cache = get_embedding_cache() if use_cache else None
+        return embed_with_cache(texts, engine.embed, _embed_model_name(embedder), cache,
+                                dim=getattr(embedder, "dim", None))
 
     except Exception as e:
         print(f"[Upstage Embedding Error] {e}")
         print("임베딩 생성에 실패했습니다. (모델명 또는 입력 형식을 확인하세요)")
         raise
 
-def build_faiss_index(documents: List[Document], index_path: str = "st_app/db/faiss_index") -> None:
-    """FAISS 인덱스 생성 및 저장"""
+def _write_atomic(path: str, write_fn) -> None:
+    """임시 파일에 쓴 뒤 os.replace로 교체 (읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)"""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        write_fn(tmp_path)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_json(path: str, data, indent: Optional[int] = None) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+
+
+def read_manifest(index_path: str) -> Dict[str, Any]:
+    """manifest.json 읽기 (없으면 빈 dict)"""
+    manifest_file = os.path.join(index_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def index_data_path(index_path: str, manifest: Optional[Dict[str, Any]] = None) -> str:
+    """
+    인덱스/메타데이터/BM25 파일이 있는 디렉터리
+    manifest의 data_dir(버전별 디렉터리)을 따르고, 없으면 index_path 자체 (구버전 레이아웃)
+    """
+    if manifest is None:
+        manifest = read_manifest(index_path)
+    data_dir = manifest.get("data_dir")
+    return os.path.join(index_path, data_dir) if data_dir else index_path
+
+
+def _remove_stale_data(index_path: str, current_dir: str, previous_dir: Optional[str]) -> None:
+    """
+    이전 버전 데이터 정리 (방금 교체된 직전 버전은 로드 중인 reader를 위해 남김)
+    구버전 레이아웃(index_path 바로 아래 파일)은 버전 디렉터리로 두 번째 저장할 때 삭제
+    """
+    for name in os.listdir(index_path):
+        if name.startswith(DATA_DIR_PREFIX) and name not in (current_dir, previous_dir):
+            shutil.rmtree(os.path.join(index_path, name), ignore_errors=True)
+    if previous_dir:
+        for name in (META_DIR, BM25_DIR):
+            shutil.rmtree(os.path.join(index_path, name), ignore_errors=True)
+        for name in (INDEX_FILE, META_FILE):
+            if os.path.exists(os.path.join(index_path, name)):
+                os.remove(os.path.join(index_path, name))
+
+
+def _save_index_files(index: faiss.Index, metadata: ColumnarMetadata, index_path: str,
+                      index_config: Optional[Dict[str, Any]] = None, bm25: Optional[BM25Index] = None) -> None:
+    """
+    인덱스, 메타데이터, BM25 역색인을 새 버전 디렉터리(data-<version>)에 모두 쓴 뒤
+    manifest 한 번의 os.replace로 전환 -> reader는 항상 한 버전의 파일 묶음만 봄
+    manifest의 version은 1씩 증가함 (캐시 무효화 등에 사용)
+    """
+    os.makedirs(index_path, exist_ok=True)
+    if index.ntotal != len(metadata):
+        raise ValueError(f"인덱스({index.ntotal})와 메타데이터({len(metadata)}) 개수가 다릅니다.")
+
+    manifest = read_manifest(index_path)
+    previous_dir = manifest.get("data_dir")
+    version = int(manifest.get("version", 0)) + 1
+    data_dir = f"{DATA_DIR_PREFIX}{version}"
+    data_path = os.path.join(index_path, data_dir)
+    shutil.rmtree(data_path, ignore_errors=True)   # 이전에 실패한 저장의 잔재
+    os.makedirs(data_path)
+
+    _write_atomic(os.path.join(data_path, INDEX_FILE), lambda p: faiss.write_index(index, p))
+    metadata.save(data_path)
+    (bm25 or BM25Index.from_metadata(metadata)).save(data_path)
+
+    manifest.update({
+        "version": version,
+        "data_dir": data_dir,
+        "count": len(metadata),
+        "dimension": index.d,
+        **embedder_spec(),  # 인덱스를 만든 임베딩 백엔드/모델 (로드 시 검증)
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    if index_config is not None:
+        manifest["index"] = index_config
+    _write_atomic(os.path.join(index_path, MANIFEST_FILE), lambda p: _write_json(p, manifest, indent=2))
+    _remove_stale_data(index_path, data_dir, previous_dir)
+
+
+def _unique_documents(documents: List[Document]) -> Tuple[List[Document], List[int]]:
+    """같은 ID의 문서는 하나만 남김 (입력 순서 유지)"""
+    seen = set()
+    docs, ids = [], []
+    for doc in documents:
+        id_ = doc_id(doc)
+        if id_ in seen:
+            continue
+        seen.add(id_)
+        docs.append(doc)
+        ids.append(id_)
+    return docs, ids
+
+
+def build_faiss_index(documents: List[Document], index_path: str = "st_app/db/faiss_index",
+                      index_type: Optional[str] = None) -> None:
+    """
+    FAISS 인덱스 생성 및 저장 (전체 재구축)
+    index_type: flat | ivf_flat | hnsw | ivf_pq (기본: RAG_INDEX_TYPE 환경변수, 없으면 flat)
+    근사 인덱스 파라미터는 index_factory 참고
+    """
+    index_config = index_config_from_env(index_type)
     if not documents:
         print("No documents to index")
         return
     
-    # 디렉토리 생성
-    os.makedirs(index_path, exist_ok=True)
+    documents, ids = _unique_documents(documents)
     
     # 텍스트 추출
     texts = [doc.page_content for doc in documents]
     
     # 임베딩 생성
-    print("Creating embeddings using Upstage API...")
+    print(f"Creating embeddings using {embed_backend_from_env()} backend...")
     embeddings = create_embeddings(texts)
     
-    # FAISS 인덱스 생성
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dimension)  # Inner Product for cosine similarity
-    
     # 정규화 (cosine similarity를 위해)
     faiss.normalize_L2(embeddings)
     
+    # FAISS 인덱스 생성 (Inner Product, 리뷰 ID를 외부 ID로 사용해 증분 추가/삭제 가능)
+    dimension = embeddings.shape[1]
+    index = create_index(dimension, len(embeddings), index_config)
+    
+    # 근사 인덱스(IVF/PQ)는 샘플로 학습
+    train_index(index, embeddings, index_config["train_size"])
+    
     # 인덱스에 벡터 추가
-    index.add(embeddings.astype('float32'))
+    index.add_with_ids(embeddings.astype('float32'), np.array(ids, dtype='int64'))
     
-    # 인덱스 저장
-    faiss.write_index(index, os.path.join(index_path, "index.faiss"))
+    # 인덱스 + 메타데이터 저장 (리뷰 내용 포함)
+    metadata = ColumnarMetadata.from_records([_doc_to_meta(doc, id_) for doc, id_ in zip(documents, ids)])
+    _save_index_files(index, metadata, index_path, index_config)
     
-    # 메타데이터 저장 (리뷰 내용 포함)
-    metadata = []
-    for doc in documents:
-        metadata.append({
-            "content": doc.page_content,  # 리뷰 내용 포함
-            "platform": doc.metadata.get('platform', ''),
-            "subject": doc.metadata.get('subject', ''),
-            "place": doc.metadata.get('place', ''),
-            "date": doc.metadata.get('date', ''),
-            "rating": doc.metadata.get('rating'),
-            "url": doc.metadata.get('url', '')
-        })
-    
-    with open(os.path.join(index_path, "meta.json"), 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, ensure_ascii=False, indent=2)
-    
-    print(f"FAISS index saved to {index_path}")
+    print(f"FAISS index saved to {index_path}: {describe_index(index)}")
     print(f"Indexed {len(documents)} documents")
 
-def load_faiss_index(index_path: str = "st_app/db/faiss_index") -> FAISSVectorStore:
-    """FAISS 인덱스 로드 - FAISSVectorStore 객체 반환"""
+def migrate_index_metadata(index_path: str = "st_app/db/faiss_index") -> bool:
+    """구버전 meta.json을 컬럼형(meta/)으로 변환 (변환했으면 True) - 갱신/CLI 단계에서 한 프로세스가 실행"""
+    data_path = index_data_path(index_path)
+    if has_columnar_metadata(data_path) or not os.path.exists(os.path.join(data_path, META_FILE)):
+        return False
+    migrate_meta_json(data_path, META_FILE, mmap=False)
+    return True
+
+
+def update_faiss_index(documents: List[Document], index_path: str = "st_app/db/faiss_index") -> None:
+    """
+    FAISS 인덱스 증분 갱신
+    - 현재 리뷰 집합과 인덱싱된 ID를 비교해 새 리뷰만 임베딩/추가, 사라진 리뷰는 삭제
+    - 인덱스가 없거나 ID가 없는 구버전이면 전체 재구축
+    """
+    migrate_index_metadata(index_path)
+    vs = None
+    if os.path.exists(os.path.join(index_data_path(index_path), INDEX_FILE)):
+        try:
+            vs = load_faiss_index(index_path, create_if_missing=False)
+        except EmbedderMismatchError as e:
+            print(e)  # 임베더가 바뀌면 기존 벡터를 재사용할 수 없으므로 전체 재구축
+    index_type = read_manifest(index_path).get("index", {}).get("type")
+    if vs is None or not vs.has_ids:
+        print("No incremental-capable index found. Rebuilding from scratch...")
+        build_faiss_index(documents, index_path, index_type)
+        return
+    
+    documents, ids = _unique_documents(documents)
+    indexed = set(np.asarray(vs.metadata.ids).tolist())
+    current = set(ids)
+    removed = [id_ for id_ in indexed if id_ not in current]
+    added = [doc for doc, id_ in zip(documents, ids) if id_ not in indexed]
+    
+    if not removed and not added:
+        print("FAISS index is up to date")
+        return
+    
+    if removed and not supports_remove(vs.index):
+        # HNSW는 삭제를 지원하지 않으므로 전체 재구축 (임베딩은 캐시에서 재사용)
+        print(f"{describe_index(vs.index)} does not support removal. Rebuilding...")
+        build_faiss_index(documents, index_path, index_type)
+        return
+    
+    vs.remove_ids(removed)
+    vs.add_documents(added)
+    vs.save(index_path)
+    
+    print(f"FAISS index updated at {index_path}: +{len(added)} / -{len(removed)} (total {len(vs.metadata)})")
+
+def _read_index(index_file: str, mmap: bool) -> faiss.Index:
+    """
+    인덱스 파일 읽기
+    mmap=True면 벡터 저장소를 파일에 memory-map (복사 없음) -> 같은 호스트의 여러 워커가
+    OS 페이지 캐시의 한 사본을 공유하고, 콜드 스타트 시 파일 전체를 읽지 않음
+    """
+    if not mmap:
+        return faiss.read_index(index_file)
+    mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
     try:
-        index_file = os.path.join(index_path, "index.faiss")
-        meta_file = os.path.join(index_path, "meta.json")
+        return faiss.read_index(index_file, mmap_flag | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError as e:
+        print(f"mmap load not supported for this index, loading into memory: {e}")
+        return faiss.read_index(index_file)
+
+
+def load_faiss_index(index_path: str = "st_app/db/faiss_index", create_if_missing: bool = True,
+                     mmap: bool = False) -> FAISSVectorStore:
+    """
+    FAISS 인덱스 로드 - FAISSVectorStore 객체 반환
+    mmap=True: 인덱스/메타데이터를 읽기 전용 memory-map으로 열어 워커 프로세스 간 공유
+    (이 경우 add_documents/remove_ids 불가)
+    """
+    try:
+        # manifest를 한 번 읽고 그 버전의 디렉터리에서만 로드 (저장 중이어도 파일 묶음이 섞이지 않음)
+        manifest = read_manifest(index_path)
+        data_path = index_data_path(index_path, manifest)
+        index_file = os.path.join(data_path, INDEX_FILE)
+        meta_file = os.path.join(data_path, META_FILE)
         
-        if not os.path.exists(index_file) or not os.path.exists(meta_file):
+        if not os.path.exists(index_file) or not (has_columnar_metadata(data_path) or os.path.exists(meta_file)):
+            if not create_if_missing:
+                return None
             print("FAISS index not found. Creating new index...")
-            create_faiss_index()
+            create_faiss_index(index_path)
             # 재귀호출로 다시 로드
-            return load_faiss_index(index_path)
+            return load_faiss_index(index_path, create_if_missing=False, mmap=mmap)
+        
+        # 인덱스를 만든 임베더와 현재 설정 비교 (다르면 검색 결과가 무의미하므로 바로 실패)
+        check_embedder_spec(manifest, index_path)
         
-        # 인덱스 로드
-        index = faiss.read_index(index_file)
+        # 인덱스 로드 (근사 인덱스면 RAG_NPROBE / RAG_EF_SEARCH 적용)
+        index = _read_index(index_file, mmap)
+        apply_search_params_from_env(index)
+        print(f"Loaded FAISS index: {describe_index(index)}")
         
-        # 메타데이터 로드
-        with open(meta_file, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+        # 메타데이터 로드 (컬럼형, memory-map)
+        # 구버전 meta.json은 메모리에서만 변환 - 로드 경로는 디스크에 쓰지 않음 (워커 동시 로드 시 경합 방지)
+        if has_columnar_metadata(data_path):
+            metadata = ColumnarMetadata.load(data_path, mmap=mmap)
+        else:
+            print("Legacy meta.json found; run `python -m st_app.rag.embedder --migrate-meta` to convert it")
+            metadata = read_meta_json(data_path, META_FILE)
         
         # 메타데이터 검증
         print(f"Loaded {len(metadata)} metadata entries")
+        if index.ntotal != len(metadata):
+            print(f"Warning: index has {index.ntotal} vectors but metadata has {len(metadata)} entries")
         if metadata:
             sample_meta = metadata[0]
             print(f"Sample metadata keys: {list(sample_meta.keys())}")
@@ -275,26 +871,40 @@ def load_faiss_index(index_path: str = "st_app/db/faiss_index") -> FAISSVectorSt
                 print("Consider regenerating the FAISS index")
         
         # FAISSVectorStore 객체 반환
-        return FAISSVectorStore(index, metadata)
+        return FAISSVectorStore(index, metadata, index_path=index_path, read_only=mmap,
+                                bm25=BM25Index.load(data_path, mmap=mmap),
+                                version=manifest.get("version", 0))
         
+    except EmbedderMismatchError:
+        raise
     except Exception as e:
         print(f"Error loading FAISS index: {e}")
         print("You may need to regenerate the FAISS index")
         return None
 
-def create_faiss_index():
-    """FAISS 인덱스 생성 메인 함수"""
+def create_faiss_index(index_path: str = "st_app/db/faiss_index", incremental: bool = False):
+    """
+    FAISS 인덱스 생성 메인 함수
+    incremental=True 이면 기존 인덱스와의 차이만 반영 (RAG_INDEX_INCREMENTAL=1 로도 설정 가능)
+    """
     print("Loading review data...")
     reviews = load_review_data()
     
     print("Creating documents...")
     documents = create_documents_from_reviews(reviews)
     
-    print("Building FAISS index...")
-    build_faiss_index(documents)
+    if incremental or os.getenv("RAG_INDEX_INCREMENTAL", "0") == "1":
+        print("Updating FAISS index incrementally...")
+        update_faiss_index(documents, index_path)
+    else:
+        print("Building FAISS index...")
+        build_faiss_index(documents, index_path)
     
     print("FAISS index creation completed!")
 
 if __name__ == "__main__":
-    create_faiss_index()
-    create_faiss_index()
\ No newline at end of file
+    import sys
+    if "--migrate-meta" in sys.argv:
+        migrate_index_metadata()
+    else:
+        create_faiss_index(incremental="--incremental" in sys.argv)
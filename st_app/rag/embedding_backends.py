@@ -0,0 +1,147 @@
+"""
+임베딩 백엔드 선택
+- upstage: Upstage API (기본)
+- local:   sentence-transformers CPU 모델 (네트워크 없이 구축/검색, ONNX/양자화 선택 가능)
+- fake:    FakeEmbeddings (CI/벤치마크용)
+
+인덱스를 만든 백엔드/모델/차원은 manifest.json에 기록되고, 로드 시 현재 설정과 다르면 바로 실패함
+
+환경변수:
+  RAG_EMBED_BACKEND          upstage | local | fake (기본 upstage)
+  RAG_LOCAL_EMBED_MODEL      local 모델 (기본 jhgan/ko-sroberta-multitask)
+  RAG_LOCAL_EMBED_BATCH_SIZE local 인코딩 배치 크기 (기본 32)
+  RAG_LOCAL_EMBED_ONNX       1이면 ONNX Runtime으로 추론
+  RAG_LOCAL_EMBED_ONNX_FILE  사용할 ONNX 파일 (예: onnx/model_qint8_avx512_vnni.onnx - 양자화 모델)
+  RAG_EMBED_THREADS          CPU 추론 스레드 수 (torch.set_num_threads)
+  RAG_FAKE_EMBED_DIM         fake 백엔드 차원 (기본 4096)
+  RAG_FAKE_EMBED_LATENCY     fake 백엔드 호출당 지연(초) - 원격 API 흉내 (기본 0)
+"""
+from __future__ import annotations
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+EMBED_BACKENDS = ("upstage", "local", "fake")
+DEFAULT_LOCAL_MODEL = "jhgan/ko-sroberta-multitask"
+
+
+class EmbedderMismatchError(ValueError):
+    """인덱스를 만든 임베더와 현재 설정된 임베더가 다름"""
+
+
+def embed_backend_from_env() -> str:
+    backend = os.getenv("RAG_EMBED_BACKEND", "upstage").lower()
+    if backend not in EMBED_BACKENDS:
+        raise ValueError(f"지원하지 않는 임베딩 백엔드: {backend} (가능: {', '.join(EMBED_BACKENDS)})")
+    return backend
+
+
+def embedder_spec(backend: Optional[str] = None) -> Dict[str, Any]:
+    """설정된 임베더 정보 (모델을 로드하지 않고 환경변수로만 계산) -> manifest에 기록"""
+    backend = backend or embed_backend_from_env()
+    if backend == "local":
+        model = os.getenv("RAG_LOCAL_EMBED_MODEL", DEFAULT_LOCAL_MODEL)
+    elif backend == "fake":
+        model = f"fake-{int(os.getenv('RAG_FAKE_EMBED_DIM', 4096))}"
+    else:
+        model = os.getenv("UPSTAGE_EMBED_MODEL", "solar-embedding-1-large")
+    return {"embed_backend": backend, "embed_model": model}
+
+
+def check_embedder_spec(manifest: Dict[str, Any], index_path: str = "") -> None:
+    """manifest의 임베더 정보가 현재 설정과 다르면 EmbedderMismatchError (정보가 없는 예전 인덱스는 upstage로 간주)"""
+    if not manifest:
+        return
+    built = {
+        "embed_backend": manifest.get("embed_backend", "upstage"),
+        "embed_model": manifest.get("embed_model"),
+    }
+    current = embedder_spec()
+    if built["embed_model"] is None:
+        built["embed_model"] = current["embed_model"] if built["embed_backend"] == current["embed_backend"] else None
+    if built != current:
+        raise EmbedderMismatchError(
+            f"인덱스 {index_path}는 {built['embed_backend']}/{built['embed_model']}로 만들어졌지만 "
+            f"현재 설정은 {current['embed_backend']}/{current['embed_model']}입니다. "
+            f"RAG_EMBED_BACKEND를 맞추거나 인덱스를 다시 생성하세요."
+        )
+
+
+def check_embedder_dimension(embedder, dimension: int) -> None:
+    """차원을 알 수 있는 임베더(local/fake)는 인덱스 차원과 비교"""
+    dim = getattr(embedder, "dim", None)
+    if dim is not None and int(dim) != int(dimension):
+        raise EmbedderMismatchError(f"임베딩 차원({dim})이 인덱스 차원({dimension})과 다릅니다.")
+
+
+class LocalEmbeddings:
+    """
+    sentence-transformers 기반 로컬 CPU 임베더 (embed_documents / embed_query 제공)
+    모델은 첫 호출 시 로드, 인코딩은 내부 배치 단위로 수행
+    """
+    max_concurrency = 1  # CPU 추론은 프로세스 내 동시 요청 대신 스레드 수로 병렬화
+
+    def __init__(self, model: Optional[str] = None, batch_size: Optional[int] = None,
+                 onnx: Optional[bool] = None, onnx_file: Optional[str] = None,
+                 threads: Optional[int] = None):
+        self.model = model or os.getenv("RAG_LOCAL_EMBED_MODEL", DEFAULT_LOCAL_MODEL)
+        self.batch_size = batch_size or int(os.getenv("RAG_LOCAL_EMBED_BATCH_SIZE", 32))
+        self.onnx = onnx if onnx is not None else os.getenv("RAG_LOCAL_EMBED_ONNX", "0") == "1"
+        self.onnx_file = onnx_file or os.getenv("RAG_LOCAL_EMBED_ONNX_FILE")
+        threads = threads or os.getenv("RAG_EMBED_THREADS")
+        self.threads = int(threads) if threads else None
+        self._st = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        with self._lock:
+            if self._st is None:
+                from sentence_transformers import SentenceTransformer
+
+                if self.threads:
+                    import torch
+
+                    torch.set_num_threads(self.threads)
+                kwargs: Dict[str, Any] = {"device": "cpu"}
+                if self.onnx:
+                    kwargs["backend"] = "onnx"
+                    if self.onnx_file:
+                        kwargs["model_kwargs"] = {"file_name": self.onnx_file}
+                self._st = SentenceTransformer(self.model, **kwargs)
+            return self._st
+
+    @property
+    def dim(self) -> int:
+        return self._get_model().get_sentence_embedding_dimension()
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._get_model().encode(
+            texts, batch_size=self.batch_size, convert_to_numpy=True, show_progress_bar=False
+        )
+        return vectors.astype("float32").tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(texts) if texts else []
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0]
+
+
+# --------- 프로세스 전역 로컬 임베더 (모델 1회 로드) ---------
+_LOCAL: Optional[LocalEmbeddings] = None
+
+
+def get_local_embeddings() -> LocalEmbeddings:
+    global _LOCAL
+    if _LOCAL is None:
+        _LOCAL = LocalEmbeddings()
+    return _LOCAL
+
+
+def get_fake_embeddings():
+    from st_app.rag.fake_embedder import FakeEmbeddings
+
+    return FakeEmbeddings(
+        dim=int(os.getenv("RAG_FAKE_EMBED_DIM", 4096)),
+        latency=float(os.getenv("RAG_FAKE_EMBED_LATENCY", 0)),
+    )
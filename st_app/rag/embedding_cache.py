@@ -0,0 +1,206 @@
+"""
+내용 주소 기반(content-addressed) 임베딩 디스크 캐시
+(정규화된 텍스트 해시, 임베딩 모델명)을 키로 SQLite에 float32 벡터를 저장
+"""
+from __future__ import annotations
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_CACHE_PATH = "st_app/db/embedding_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 200_000
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (유니코드 NFC + 공백 정리)"""
+    text = unicodedata.normalize("NFC", text or "")
+    return _WS_RE.sub(" ", text).strip()
+
+
+def text_hash(text: str) -> str:
+    """정규화된 텍스트의 sha256 해시"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite 기반 임베딩 캐시
+    - 키: (text_hash, model)
+    - max_entries 초과 시 가장 오래 사용되지 않은 항목부터 제거 (LRU)
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.path = path or os.getenv("RAG_EMBED_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.max_entries = max_entries or int(os.getenv("RAG_EMBED_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " vec BLOB NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " PRIMARY KEY (key, model))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings(last_access)")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+        if "created_at" not in columns:
+            # 저장 시각 (TTL 확인용) - 이전 버전 캐시의 항목은 0(아주 오래됨)으로 취급
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, texts: Sequence[str], model: str) -> Dict[int, np.ndarray]:
+        """캐시에 있는 텍스트만 {입력 위치: 벡터}로 반환"""
+        return {i: vec for i, (_, vec) in self.get_entries(texts, model).items()}
+
+    def get_entries(self, texts: Sequence[str], model: str) -> Dict[int, Tuple[float, np.ndarray]]:
+        """캐시에 있는 텍스트만 {입력 위치: (저장 시각, 벡터)}로 반환"""
+        if not texts:
+            return {}
+        keys = [text_hash(t) for t in texts]
+        found: Dict[str, Tuple[float, np.ndarray]] = {}
+        unique = list(dict.fromkeys(keys))
+
+        with self._lock:
+            # SQLite 변수 개수 제한을 피하기 위해 나누어 조회
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vec, created_at FROM embeddings WHERE model = ? AND key IN ({marks})",
+                    [model, *chunk],
+                ).fetchall()
+                for key, blob, created_at in rows:
+                    found[key] = (created_at, np.frombuffer(blob, dtype="<f4"))
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ? AND model = ?",
+                    [(now, k, model) for k in found],
+                )
+                self._conn.commit()
+
+        result = {i: found[k] for i, k in enumerate(keys) if k in found}
+        self.hits += len(result)
+        self.misses += len(keys) - len(result)
+        return result
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray, model: str) -> None:
+        """텍스트별 임베딩 저장 후 필요하면 eviction"""
+        if len(texts) == 0:
+            return
+        vectors = np.asarray(vectors, dtype="<f4")
+        now = time.time()
+        rows = [
+            (text_hash(t), model, int(v.shape[0]), v.tobytes(), now, now)
+            for t, v in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vec, last_access, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """max_entries를 넘으면 90% 수준까지 오래된 항목 삭제"""
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        n_remove = count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN ("
+            " SELECT rowid FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+            (n_remove,),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# --------- 프로세스 전역 캐시 ---------
+_CACHES: Dict[str, EmbeddingCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_embedding_cache(path: Optional[str] = None) -> Optional[EmbeddingCache]:
+    """
+    공용 캐시 인스턴스 반환
+    RAG_EMBED_CACHE=0 이면 캐시를 사용하지 않음(None)
+    """
+    if os.getenv("RAG_EMBED_CACHE", "1") == "0":
+        return None
+    path = path or os.getenv("RAG_EMBED_CACHE_PATH", DEFAULT_CACHE_PATH)
+    with _CACHES_LOCK:
+        if path not in _CACHES:
+            _CACHES[path] = EmbeddingCache(path)
+        return _CACHES[path]
+
+
+def embed_with_cache(
+    texts: List[str],
+    embed_fn,
+    model: str,
+    cache: Optional[EmbeddingCache],
+    dim: Optional[int] = None,
+) -> np.ndarray:
+    """
+    캐시에 없는 텍스트만 embed_fn(texts) -> np.ndarray 로 임베딩하고 결과를 합쳐 반환
+    dim: 기대 차원 - 차원이 다른 캐시 벡터는 miss로 처리
+         (모르면 새로 임베딩한 벡터의 차원 기준, 전부 hit인데 차원이 섞여 있으면 전부 다시 임베딩)
+    """
+    if cache is None or not texts:
+        return embed_fn(texts)
+
+    cached = cache.get_many(texts, model)
+    if dim is not None:
+        cached = {i: vec for i, vec in cached.items() if vec.shape[0] == dim}
+    elif cached and len({vec.shape[0] for vec in cached.values()}) > 1:
+        cached = {}
+    missing_pos = [i for i in range(len(texts)) if i not in cached]
+    if missing_pos:
+        print(f"Embedding cache: {len(cached)} hit / {len(missing_pos)} miss")
+        new_vecs = embed_fn([texts[i] for i in missing_pos])
+        dim = new_vecs.shape[1]
+        stale = [i for i, vec in cached.items() if vec.shape[0] != dim]
+        if stale:
+            new_vecs = np.vstack([new_vecs, embed_fn([texts[i] for i in stale])])
+            missing_pos += stale
+            for i in stale:
+                del cached[i]
+        cache.put_many([texts[i] for i in missing_pos], new_vecs, model)
+    else:
+        new_vecs = None
+        dim = next(iter(cached.values())).shape[0]
+
+    out = np.empty((len(texts), dim), dtype="float32")
+    for i, vec in cached.items():
+        out[i] = vec
+    if missing_pos:
+        out[missing_pos] = new_vecs
+    return out
@@ -0,0 +1,80 @@
+"""
+오프라인용 가짜 임베딩 모델
+네트워크 없이 임베딩 파이프라인을 테스트/벤치마크하기 위한 결정적(deterministic) 임베더
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import threading
+import time
+from typing import List
+
+import numpy as np
+
+
+class FakeEmbeddings:
+    """
+    텍스트 해시로 시드를 만든 난수 벡터를 반환하는 임베더.
+    - 같은 텍스트는 항상 같은 벡터를 반환
+    - latency + per_text_latency * len(texts) 만큼 sleep 하여 원격 API 지연을 흉내냄
+    """
+
+    def __init__(
+        self,
+        dim: int = 4096,
+        latency: float = 0.0,
+        per_text_latency: float = 0.0,
+        fail_every: int = 0,
+    ):
+        self.dim = dim
+        self.model = f"fake-{dim}"   # 캐시 키 (embedding_backends.embedder_spec과 같은 이름)
+        self.latency = latency
+        self.per_text_latency = per_text_latency
+        self.fail_every = fail_every  # N번째 호출마다 실패 (재시도 테스트용, 0이면 비활성)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+        rng = np.random.default_rng(seed)
+        return rng.standard_normal(self.dim).astype("float32").tolist()
+
+    def _next_call(self) -> int:
+        with self._lock:
+            self.calls += 1
+            return self.calls
+
+    def _check_failure(self, call_no: int) -> None:
+        if self.fail_every and call_no % self.fail_every == 0:
+            raise RuntimeError(f"FakeEmbeddings: simulated failure on call {call_no}")
+
+    def _simulate_call(self, n_texts: int) -> None:
+        call_no = self._next_call()
+        delay = self.latency + self.per_text_latency * n_texts
+        if delay > 0:
+            time.sleep(delay)
+        self._check_failure(call_no)
+
+    async def _asimulate_call(self, n_texts: int) -> None:
+        """_simulate_call의 비동기 버전 (이벤트 루프를 막지 않고 대기)"""
+        call_no = self._next_call()
+        delay = self.latency + self.per_text_latency * n_texts
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._check_failure(call_no)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self._simulate_call(len(texts))
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self._simulate_call(1)
+        return self._vector(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await self._asimulate_call(len(texts))
+        return [self._vector(t) for t in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await self._asimulate_call(1)
+        return self._vector(text)
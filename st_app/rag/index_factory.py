@@ -0,0 +1,215 @@
+"""
+FAISS 인덱스 타입 설정/생성
+flat(정확 검색) 외에 IVF-Flat, HNSW, IVF-PQ 근사 검색 인덱스를 설정으로 선택
+
+환경변수:
+  RAG_INDEX_TYPE       flat | ivf_flat | hnsw | ivf_pq (기본 flat)
+  RAG_IVF_NLIST        IVF 클러스터 수 (기본: 4*sqrt(N), 학습 데이터 크기에 맞게 자동 축소)
+  RAG_PQ_M             PQ 서브벡터 수 (기본 64, 차원의 약수로 자동 조정)
+  RAG_PQ_NBITS         PQ 코드 비트 수 (기본 8, 학습 데이터가 2^nbits개보다 적으면 자동 축소)
+  RAG_HNSW_M           HNSW 이웃 수 (기본 32)
+  RAG_HNSW_EF_CONSTRUCTION  HNSW 구축 시 탐색 폭 (기본 200)
+  RAG_INDEX_TRAIN_SIZE 학습에 쓸 최대 샘플 수 (기본 50000)
+  RAG_NPROBE / RAG_EF_SEARCH  검색 시 IVF nprobe / HNSW efSearch
+                       (RAG_NPROBE가 없으면 IVF 기본 nprobe = max(8, nlist/8), nlist 이하)
+"""
+from __future__ import annotations
+import math
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+# IVF 클러스터당 최소 학습 벡터 수 (FAISS 권장치)
+_MIN_POINTS_PER_CENTROID = 39
+# IVF 기본 nprobe: 최소 _MIN_NPROBE개, 클러스터가 많으면 1/_NPROBE_FRACTION (FAISS 기본값 1은 재현율이 너무 낮음)
+_MIN_NPROBE = 8
+_NPROBE_FRACTION = 8
+# PQ 코드 최소 비트 수 - 학습 데이터가 2^4=16개보다 적으면 PQ 대신 IVF-Flat 사용
+_MIN_PQ_NBITS = 4
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def index_config_from_env(index_type: Optional[str] = None) -> Dict[str, Any]:
+    """환경변수 기반 인덱스 설정 (index_type 인자가 있으면 우선)"""
+    config = {
+        "type": (index_type or os.getenv("RAG_INDEX_TYPE", "flat")).lower(),
+        "nlist": _env_int("RAG_IVF_NLIST"),
+        "pq_m": _env_int("RAG_PQ_M") or 64,
+        "pq_nbits": _env_int("RAG_PQ_NBITS") or 8,
+        "hnsw_m": _env_int("RAG_HNSW_M") or 32,
+        "ef_construction": _env_int("RAG_HNSW_EF_CONSTRUCTION") or 200,
+        "train_size": _env_int("RAG_INDEX_TRAIN_SIZE") or 50_000,
+    }
+    if config["type"] not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 타입: {config['type']} (가능: {', '.join(INDEX_TYPES)})")
+    return config
+
+
+def _resolve_nlist(config: Dict[str, Any], n_train: int) -> int:
+    nlist = config.get("nlist") or int(4 * math.sqrt(max(n_train, 1)))
+    return max(1, min(nlist, n_train // _MIN_POINTS_PER_CENTROID or 1))
+
+
+def _resolve_pq_m(m: int, dimension: int) -> int:
+    """dimension의 약수 중 m 이하에서 가장 큰 값"""
+    m = max(1, min(m, dimension))
+    while dimension % m:
+        m -= 1
+    return m
+
+
+def _resolve_pq_nbits(nbits: int, n_train: int) -> int:
+    """PQ 코드북(2^nbits개 중심) 학습에 필요한 만큼 데이터가 있도록 축소"""
+    return min(nbits, int(math.log2(max(n_train, 1))))
+
+
+def default_nprobe(nlist: int) -> int:
+    """IVF 기본 nprobe (RAG_NPROBE로 덮어쓸 수 있음)"""
+    return max(1, min(nlist, max(_MIN_NPROBE, nlist // _NPROBE_FRACTION)))
+
+
+def create_index(dimension: int, n_train: int, config: Dict[str, Any]) -> faiss.Index:
+    """
+    설정에 맞는 (아직 학습/추가 전) 인덱스 생성
+    모든 인덱스는 내적(코사인) 기반이며 add_with_ids로 리뷰 ID를 저장함
+    """
+    index_type = config["type"]
+    metric = faiss.METRIC_INNER_PRODUCT
+    n_train = min(n_train, config.get("train_size") or n_train)   # 실제 학습에 쓰이는 샘플 수
+
+    if index_type == "flat":
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+
+    if index_type == "hnsw":
+        hnsw = faiss.IndexHNSWFlat(dimension, config["hnsw_m"], metric)
+        hnsw.hnsw.efConstruction = config["ef_construction"]
+        return faiss.IndexIDMap2(hnsw)
+
+    nlist = _resolve_nlist(config, n_train)
+    nbits = _resolve_pq_nbits(config["pq_nbits"], n_train)
+    if index_type == "ivf_pq" and nbits < _MIN_PQ_NBITS:
+        print(f"Too few vectors ({n_train}) to train PQ codes. Using IVF-Flat instead")
+        index_type = "ivf_flat"
+    if index_type == "ivf_flat":
+        index = faiss.index_factory(dimension, f"IVF{nlist},Flat", metric)
+    else:  # ivf_pq
+        m = _resolve_pq_m(config["pq_m"], dimension)
+        index = faiss.index_factory(dimension, f"IVF{nlist},PQ{m}x{nbits}", metric)
+    # IVF는 ID를 직접 저장하므로 IDMap 없이 사용, reconstruct/remove를 위해 해시 direct map 설정
+    ivf = faiss.extract_index_ivf(index)
+    ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+    ivf.nprobe = default_nprobe(nlist)   # 인덱스 파일에 함께 저장됨
+    return index
+
+
+def train_index(index: faiss.Index, vectors: np.ndarray, train_size: int, seed: int = 0) -> None:
+    """학습이 필요한 인덱스(IVF/PQ)를 샘플로 학습"""
+    if index.is_trained:
+        return
+    if len(vectors) > train_size:
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(len(vectors), train_size, replace=False)]
+    else:
+        sample = vectors
+    index.train(np.ascontiguousarray(sample, dtype="float32"))
+
+
+def base_index(index: faiss.Index) -> faiss.Index:
+    """IDMap 래퍼를 벗긴 실제 인덱스"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def supports_remove(index: faiss.Index) -> bool:
+    """remove_ids 지원 여부 (HNSW는 삭제 불가 -> 전체 재구축 필요)"""
+    return not isinstance(base_index(index), faiss.IndexHNSW)
+
+
+def apply_search_params(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+    """검색 시 파라미터 조정 (해당 없는 인덱스 타입이면 무시)"""
+    base = base_index(index)
+    if nprobe is not None:
+        try:
+            ivf = faiss.extract_index_ivf(base)
+            ivf.nprobe = max(1, min(int(nprobe), ivf.nlist))
+        except RuntimeError:
+            pass
+    if ef_search is not None and isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = int(ef_search)
+
+
+def apply_search_params_from_env(index: faiss.Index) -> None:
+    """RAG_NPROBE / RAG_EF_SEARCH 적용 (RAG_NPROBE가 없으면 IVF는 기본 nprobe - 예전에 저장된 nprobe=1 인덱스 포함)"""
+    nprobe = _env_int("RAG_NPROBE")
+    if nprobe is None:
+        try:
+            nprobe = default_nprobe(faiss.extract_index_ivf(base_index(index)).nlist)
+        except RuntimeError:
+            pass
+    apply_search_params(index, nprobe=nprobe, ef_search=_env_int("RAG_EF_SEARCH"))
+
+
+def search_params_with_selector(index: faiss.Index, ids: np.ndarray) -> faiss.SearchParameters:
+    """
+    ids(외부 ID)로 검색 범위를 제한하는 SearchParameters
+    인덱스 타입에 맞는 파라미터 클래스를 쓰고 현재 nprobe / efSearch 값을 유지함
+    """
+    selector = faiss.IDSelectorBatch(np.ascontiguousarray(ids, dtype="int64"))
+    base = base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=base.hnsw.efSearch)
+    else:
+        try:
+            ivf = faiss.extract_index_ivf(base)
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+        except RuntimeError:
+            params = faiss.SearchParameters(sel=selector)
+    params._selector_ref = selector  # 파이썬 GC로부터 selector 보호
+    return params
+
+
+def search_with_selector(index: faiss.Index, queries: np.ndarray, k: int,
+                         params: faiss.SearchParameters, n_allowed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    search_params_with_selector 파라미터로 검색
+    IVF는 조건을 만족하는 문서가 탐색한 클러스터에 없으면 결과가 k개보다 적게 나오므로,
+    min(k, n_allowed)개를 못 채운 쿼리만 nprobe를 두 배씩 늘려(최대 nlist) 다시 검색
+    """
+    scores, labels = index.search(queries, k, params=params)
+    if not isinstance(params, faiss.SearchParametersIVF):
+        return scores, labels
+    nlist = faiss.extract_index_ivf(base_index(index)).nlist
+    need = min(k, n_allowed)
+    nprobe = params.nprobe
+    short = np.nonzero((labels >= 0).sum(axis=1) < need)[0]
+    while len(short) and nprobe < nlist:
+        nprobe = min(nlist, nprobe * 2)
+        retry = faiss.SearchParametersIVF(sel=params.sel, nprobe=nprobe)
+        scores[short], labels[short] = index.search(np.ascontiguousarray(queries[short]), k, params=retry)
+        short = short[(labels[short] >= 0).sum(axis=1) < need]
+    return scores, labels
+
+
+def describe_index(index: faiss.Index) -> str:
+    """로그용 인덱스 요약"""
+    base = base_index(index)
+    desc = f"{type(base).__name__}(ntotal={index.ntotal}, d={index.d})"
+    if isinstance(base, faiss.IndexHNSW):
+        desc += f" efSearch={base.hnsw.efSearch}"
+    else:
+        try:
+            ivf = faiss.extract_index_ivf(base)
+            desc += f" nlist={ivf.nlist} nprobe={ivf.nprobe}"
+        except RuntimeError:
+            pass
+    return desc
@@ -2,10 +2,19 @@
 LLM 설정 및 호출 관련 함수들
 Upstage API를 활용한 LLM 인스턴스 생성 및 관리
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Union
+import asyncio
+import importlib.util
 import os
+import re
+import threading
+import time
+import weakref
+
+import httpx
 from langchain_upstage import ChatUpstage
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, AIMessageChunk, SystemMessage
+from langgraph.config import get_stream_writer
 
 # .env 파일 로드
 try:
@@ -15,23 +24,109 @@ except ImportError:
     pass
 
 
-def get_upstage_llm(
-    model: str = "solar-pro2",
-    temperature: float = 0.1,
-    max_tokens: Optional[int] = None
-) -> ChatUpstage:
-    """
-    Upstage LLM 인스턴스 생성
+# ── 클라이언트 레지스트리 ──────────────────────────────────────────────────────
+# (model, temperature, max_tokens) 별 ChatUpstage를 프로세스에서 1개만 만들고,
+# 모든 클라이언트가 keep-alive 커넥션 풀(httpx)을 공유해 매 턴 TLS 핸드셰이크를 피함
+# httpx.AsyncClient는 처음 사용한 이벤트 루프에 묶이므로, 실행 중인 루프 안에서 호출되면
+# 루프별 AsyncClient/ChatUpstage를 따로 만들고 루프가 닫히면 정리함 (asyncio.run 반복 호출 대응)
+#
+# 환경변수:
+#   LLM_HTTP_MAX_CONNECTIONS   커넥션 풀 최대 크기 (기본 20)
+#   LLM_HTTP_KEEPALIVE_EXPIRY  유휴 커넥션 유지 시간(초) (기본 60)
+#   LLM_MOCK                   1이면 API 대신 MockLLM 사용 (오프라인 실행/부하 테스트)
+#   LLM_MOCK_LATENCY           MockLLM 호출당 지연(초) (기본 0)
+UPSTAGE_API_BASE = "https://api.upstage.ai/v1"
+
+LLMKey = Tuple[str, float, Optional[int]]
+
+_LLM_CLIENTS: Dict[LLMKey, ChatUpstage] = {}
+_LOOP_LLM_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[LLMKey, ChatUpstage]]" = weakref.WeakKeyDictionary()
+_LLM_LOCK = threading.Lock()
+_API_KEY: Optional[str] = None
+_HTTP_CLIENT: Optional[httpx.Client] = None
+_HTTP_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_STATS = {"clients_created": 0, "client_reuses": 0, "requests": 0, "connections_opened": 0}
+_STATS_LOCK = threading.Lock()  # httpx 이벤트 훅/워커 스레드에서 동시에 갱신됨
+
+
+def _count(name: str) -> None:
+    with _STATS_LOCK:
+        _STATS[name] += 1
+
+
+def _http2_available() -> bool:
+    """h2 패키지가 있을 때만 HTTP/2 사용 (import하지 않고 설치 여부만 확인)"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _trace(event_name: str, info: Dict[str, Any]) -> None:
+    """httpcore trace: 새 TCP 연결이 만들어질 때만 카운트 (나머지 요청은 풀에서 재사용된 연결)"""
+    if event_name == "connection.connect_tcp.started":
+        _count("connections_opened")
+
+
+async def _atrace(event_name: str, info: Dict[str, Any]) -> None:
+    _trace(event_name, info)
+
+
+def _on_request(request: httpx.Request) -> None:
+    _count("requests")
+    request.extensions["trace"] = _trace
+
+
+async def _on_async_request(request: httpx.Request) -> None:
+    _count("requests")
+    request.extensions["trace"] = _atrace
+
+
+def _http_limits() -> httpx.Limits:
+    max_connections = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", 20))
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", 60)),
+    )
+
+
+def _get_http_client() -> httpx.Client:
+    """프로세스 공용 동기 httpx 클라이언트 (lock 안에서 호출)"""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.Client(http2=_http2_available(), limits=_http_limits(),
+                                    event_hooks={"request": [_on_request]})
+    return _HTTP_CLIENT
+
+
+def _get_async_http_client(loop: asyncio.AbstractEventLoop) -> httpx.AsyncClient:
+    """이벤트 루프별 httpx.AsyncClient (lock 안에서 호출)"""
+    client = _HTTP_ASYNC_CLIENTS.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(http2=_http2_available(), limits=_http_limits(),
+                                   event_hooks={"request": [_on_async_request]})
+        _HTTP_ASYNC_CLIENTS[loop] = client
+    return client
+
+
+def _drop_closed_loops() -> None:
+    """닫힌 루프의 클라이언트 정리 (커넥션이 루프를 참조해 weakref만으로는 안 풀릴 수 있음, lock 안에서 호출)"""
+    for loop in [loop for loop in list(_HTTP_ASYNC_CLIENTS) if loop.is_closed()]:
+        _HTTP_ASYNC_CLIENTS.pop(loop, None)
+        _LOOP_LLM_CLIENTS.pop(loop, None)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _get_api_key() -> str:
+    """API 키 조회 (Streamlit secrets -> 환경변수, 결과는 캐시)"""
+    global _API_KEY
+    if _API_KEY:
+        return _API_KEY
     
-    Args:
-        model: 사용할 모델명 (기본: solar-pro2)
-        temperature: 생성 온도 (기본: 0.1)
-        max_tokens: 최대 토큰 수
-        
-    Returns:
-        ChatUpstage: 설정된 LLM 인스턴스
-    """
-    # Streamlit secrets 또는 환경변수에서 API 키 가져오기
     api_key = None
     
     # Streamlit secrets 시도
@@ -50,17 +145,90 @@ def get_upstage_llm(
             "UPSTAGE_API_KEY가 설정되지 않았습니다. "
             "Streamlit secrets 또는 환경변수에 설정해주세요."
         )
+    _API_KEY = api_key
+    return api_key
+
+
+def get_upstage_llm(
+    model: str = "solar-pro2",
+    temperature: float = 0.1,
+    max_tokens: Optional[int] = None
+) -> "Union[ChatUpstage, MockLLM]":
+    """
+    Upstage LLM 인스턴스 반환 (같은 설정이면 프로세스 전역에서 재사용)
     
-    kwargs = {
-        "api_key": api_key,
-        "model": model,
-        "temperature": temperature,
-    }
+    Args:
+        model: 사용할 모델명 (기본: solar-pro2)
+        temperature: 생성 온도 (기본: 0.1)
+        max_tokens: 최대 토큰 수
+        
+    Returns:
+        ChatUpstage: 설정된 LLM 인스턴스 (LLM_MOCK=1이면 MockLLM)
+    """
+    if os.getenv("LLM_MOCK", "0") == "1":
+        return MockLLM(temperature=temperature, latency=float(os.getenv("LLM_MOCK_LATENCY", 0)))
     
-    if max_tokens:
-        kwargs["max_tokens"] = max_tokens
+    key = (model, float(temperature), max_tokens or None)
+    loop = _running_loop()
+    with _LLM_LOCK:
+        _drop_closed_loops()
+        # 루프 안(async 노드)에서는 그 루프 전용 인스턴스, 루프 밖(동기 노드)에서는 프로세스 공용 인스턴스
+        clients = _LLM_CLIENTS if loop is None else _LOOP_LLM_CLIENTS.setdefault(loop, {})
+        llm = clients.get(key)
+        if llm is not None:
+            _count("client_reuses")
+            return llm
+        
+        kwargs = {
+            "api_key": _get_api_key(),
+            "model": model,
+            "temperature": temperature,
+            "http_client": _get_http_client(),
+        }
+        if loop is not None:
+            kwargs["http_async_client"] = _get_async_http_client(loop)
+        
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
         
-    return ChatUpstage(**kwargs)
+        llm = ChatUpstage(**kwargs)
+        clients[key] = llm
+        _count("clients_created")
+        return llm
+
+
+# 노드들이 사용하는 설정 (router 0.1, chat 0.6, 정보/리뷰 노드 0.2)
+WARM_UP_CONFIGS = [("solar-pro2", 0.1, None), ("solar-pro2", 0.2, None), ("solar-pro2", 0.6, None)]
+
+
+def warm_up_llm(configs: Optional[List[Tuple[str, float, Optional[int]]]] = None, connect: bool = True) -> Dict[str, Any]:
+    """
+    앱 시작 시 호출: 클라이언트를 미리 만들고 (connect=True면) API 서버와 연결을 맺어 둠
+    첫 사용자 요청이 클라이언트 생성/TLS 핸드셰이크 비용을 내지 않도록 함
+    """
+    for model, temperature, max_tokens in configs or WARM_UP_CONFIGS:
+        get_upstage_llm(model=model, temperature=temperature, max_tokens=max_tokens)
+    if connect:
+        try:
+            with _LLM_LOCK:
+                client = _get_http_client()
+            client.head(UPSTAGE_API_BASE, timeout=5.0)
+        except httpx.HTTPError as e:
+            print(f"LLM warm-up connection failed: {e}")
+    return llm_client_stats()
+
+
+def llm_client_stats() -> Dict[str, Any]:
+    """클라이언트/커넥션 재사용 지표"""
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    requests = stats["requests"]
+    return {
+        **stats,
+        "cached_clients": len(_LLM_CLIENTS) + sum(len(c) for c in list(_LOOP_LLM_CLIENTS.values())),
+        "connection_reuse_rate": round(1 - stats["connections_opened"] / requests, 4) if requests else 0.0,
+        "http2": _http2_available(),
+    }
 
 
 def create_messages_from_history(
@@ -138,12 +306,94 @@ def get_llm_response_sync(
     except Exception as e:
         return f"LLM 응답 생성 중 오류가 발생했습니다: {str(e)}"
 
+# ── 토큰 스트리밍 ──────────────────────────────────────────────────────────────
+# 노드는 stream_llm_text / astream_llm_text로 LLM을 호출해 전체 응답을 받고,
+# 그래프 안에서 실행 중이면 토큰마다 {"token": ...}을 LangGraph custom 스트림으로 내보냄
+# (router.stream_graph가 받아 UI에 전달, invoke로 실행하면 그냥 무시됨)
+def _token_writer():
+    """그래프 실행 중이면 custom 스트림 writer, 아니면 None"""
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return None
+
+
+def emit_text(text: str) -> None:
+    """LLM 없이 만든 응답을 한 번에 토큰으로 내보냄 (그래프 밖이면 무시)"""
+    writer = _token_writer()
+    if writer is not None and text:
+        writer({"token": text})
+
+
+def _chunk_text(chunk: Any) -> str:
+    content = getattr(chunk, "content", chunk)
+    return content if isinstance(content, str) else ""
+
+
+def stream_llm_text(llm: Any, prompt: Any) -> str:
+    """llm.stream으로 응답을 받아 토큰을 내보내며 이어 붙인 전체 문자열 반환 (stream이 없으면 invoke)"""
+    writer = _token_writer()
+    if not hasattr(llm, "stream"):
+        text = _chunk_text(llm.invoke(prompt))
+        if writer is not None and text:
+            writer({"token": text})
+        return text
+    parts: List[str] = []
+    for chunk in llm.stream(prompt):
+        text = _chunk_text(chunk)
+        if not text:
+            continue
+        parts.append(text)
+        if writer is not None:
+            writer({"token": text})
+    return "".join(parts)
+
+
+async def astream_llm_text(llm: Any, prompt: Any) -> str:
+    """stream_llm_text의 비동기 버전 (llm.astream, 없으면 동기 버전 사용)"""
+    if not hasattr(llm, "astream"):
+        return stream_llm_text(llm, prompt)
+    writer = _token_writer()
+    parts: List[str] = []
+    async for chunk in llm.astream(prompt):
+        text = _chunk_text(chunk)
+        if not text:
+            continue
+        parts.append(text)
+        if writer is not None:
+            writer({"token": text})
+    return "".join(parts)
+
+
 class MockLLM:
-    """API 키가 없을 때 사용할 모의 LLM"""
-    def __init__(self, temperature=0.1):
+    """
+    API 키가 없을 때 사용할 모의 LLM
+    latency: 호출마다 기다릴 시간(초) - 원격 API 지연을 흉내냄 (부하 테스트용)
+    """
+    def __init__(self, temperature=0.1, latency: float = 0.0):
         self.temperature = temperature
+        self.latency = latency
     
     def invoke(self, messages):
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return AIMessage(content=self._respond(messages))
+    
+    async def ainvoke(self, messages):
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return AIMessage(content=self._respond(messages))
+    
+    def stream(self, messages):
+        """invoke 응답을 어절 단위 청크로 나눠 반환 (스트리밍 UI 확인용)"""
+        for piece in _split_words(self.invoke(messages).content):
+            yield AIMessageChunk(content=piece)
+    
+    async def astream(self, messages):
+        for piece in _split_words((await self.ainvoke(messages)).content):
+            yield AIMessageChunk(content=piece)
+    
+    def _respond(self, messages) -> str:
         if isinstance(messages, str):
             content = messages
         else:
@@ -191,11 +441,11 @@ class MockLLM:
         else:
             response = "롯데월드에 대해 더 구체적으로 질문해 주시면 도움을 드릴게요!"
         
-        class MockResponse:
-            def __init__(self, content):
-                self.content = content
-        
-        return MockResponse(response)
+        return response
+
+
+def _split_words(text: str) -> List[str]:
+    return re.findall(r"\S+\s*|\s+", text)
 
 def get_chat_llm(
     model_upstage: str = "solar-pro2",
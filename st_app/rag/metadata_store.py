@@ -0,0 +1,362 @@
+"""
+컬럼형(columnar) 메타데이터 저장소
+meta.json(dict 리스트) 대신 필드별 NumPy 배열 + 오프셋 인덱스 텍스트 blob으로 저장하고
+memory-map으로 열어 검색 결과에 필요한 행만 읽음
+
+디렉토리 구조 (index_path/meta/):
+  schema.json            필드 타입, 행 수, 범주형 필드의 vocab
+  {field}.npy            숫자형(int64/float32) 값 또는 범주형 코드(int32, 없음=-1)
+  {field}.bin            텍스트형 필드의 utf-8 blob
+  {field}_offsets.npy    텍스트형 필드의 행별 시작 오프셋 (길이 N+1)
+"""
+from __future__ import annotations
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+META_DIR = "meta"
+SCHEMA_FILE = "schema.json"
+
+# 기본 리뷰 메타데이터 필드 타입
+FIELD_TYPES: Dict[str, str] = {
+    "id": "int64",
+    "content": "text",
+    "platform": "category",
+    "subject": "category",
+    "place": "category",
+    "date": "category",
+    "rating": "float32",
+    "url": "text",
+}
+
+# 레코드에 있을 때만 포함되는 선택 필드
+OPTIONAL_FIELD_TYPES: Dict[str, str] = {
+    "dup_cluster": "int64",  # 근사 중복 클러스터 (대표 리뷰 ID)
+}
+
+
+def _to_python(value, kind: str):
+    """배열 값 -> dict에 넣을 파이썬 값"""
+    if kind == "float32":
+        value = float(value)
+        if value != value:  # NaN
+            return None
+        return int(value) if value.is_integer() else value
+    return int(value)
+
+
+class ColumnarMetadata:
+    """
+    필드별 배열로 보관되는 메타데이터
+    - len(), meta[row] (dict 반환), 반복을 지원해 기존 List[Dict] 사용처와 호환
+    - 텍스트는 요청된 행만 blob에서 디코딩
+    """
+
+    def __init__(self, count: int, field_types: Dict[str, str], arrays: Dict[str, np.ndarray],
+                 vocabs: Dict[str, List[Optional[str]]], texts: Dict[str, tuple]):
+        self.count = count
+        self.field_types = dict(field_types)
+        self.arrays = arrays    # 숫자형 값 / 범주형 코드
+        self.vocabs = vocabs    # 범주형 vocab
+        self.texts = texts      # 텍스트형: (offsets, blob)
+        self._bitmaps: Dict[tuple, np.ndarray] = {}  # (필드, 값) -> bool 마스크 캐시
+
+    # ── 생성 ────────────────────────────────────────────────────────────────
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]],
+                     field_types: Optional[Dict[str, str]] = None) -> "ColumnarMetadata":
+        """dict 리스트(meta.json 형식) -> 컬럼형"""
+        field_types = dict(field_types or FIELD_TYPES)
+        extra = [k for r in records[:1] for k in r if k not in field_types]
+        for key in extra:  # 스키마에 없는 필드는 텍스트로 보관
+            field_types[key] = OPTIONAL_FIELD_TYPES.get(key, "text")
+
+        arrays: Dict[str, np.ndarray] = {}
+        vocabs: Dict[str, List[Optional[str]]] = {}
+        texts: Dict[str, tuple] = {}
+        for name, kind in field_types.items():
+            values = [r.get(name) for r in records]
+            if kind == "int64":
+                arrays[name] = np.array([v if v is not None else -1 for v in values], dtype="int64")
+            elif kind == "float32":
+                arrays[name] = np.array([np.nan if v is None else float(v) for v in values], dtype="float32")
+            elif kind == "category":
+                vocab: List[Optional[str]] = []
+                lookup: Dict[str, int] = {}
+                codes = np.empty(len(values), dtype="int32")
+                for i, v in enumerate(values):
+                    if v is None:
+                        codes[i] = -1
+                        continue
+                    v = str(v)
+                    if v not in lookup:
+                        lookup[v] = len(vocab)
+                        vocab.append(v)
+                    codes[i] = lookup[v]
+                arrays[name] = codes
+                vocabs[name] = vocab
+            else:
+                texts[name] = _encode_texts(values)
+        return cls(len(records), field_types, arrays, vocabs, texts)
+
+    @classmethod
+    def load(cls, index_path: str, mmap: bool = True) -> "ColumnarMetadata":
+        """index_path/meta/ 로드 (mmap=True면 배열/blob을 memory-map으로 열어 필요할 때만 읽음)"""
+        meta_dir = os.path.join(index_path, META_DIR)
+        with open(os.path.join(meta_dir, SCHEMA_FILE), 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+        mode = "r" if mmap else None
+
+        arrays, texts = {}, {}
+        for name, kind in schema["fields"].items():
+            if kind == "text":
+                offsets = np.load(os.path.join(meta_dir, f"{name}_offsets.npy"), mmap_mode=mode)
+                blob_file = os.path.join(meta_dir, f"{name}.bin")
+                if offsets[-1] == 0:
+                    blob = np.zeros(0, dtype="uint8")
+                elif mmap:
+                    blob = np.memmap(blob_file, dtype="uint8", mode="r")
+                else:
+                    blob = np.fromfile(blob_file, dtype="uint8")
+                texts[name] = (offsets, blob)
+            else:
+                arrays[name] = np.load(os.path.join(meta_dir, f"{name}.npy"), mmap_mode=mode)
+        return cls(schema["count"], schema["fields"], arrays, schema.get("vocabs", {}), texts)
+
+    # ── 저장 ────────────────────────────────────────────────────────────────
+    def save(self, index_path: str) -> None:
+        """
+        index_path/meta/ 에 저장
+        임시 디렉토리에 모두 쓴 뒤 이름을 바꿔 교체 (읽는 쪽이 섞인 버전을 보지 않도록)
+        """
+        meta_dir = os.path.join(index_path, META_DIR)
+        tmp_dir = f"{meta_dir}.tmp-{os.getpid()}"
+        old_dir = f"{meta_dir}.old-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        for name, kind in self.field_types.items():
+            if kind == "text":
+                offsets, blob = self.texts[name]
+                np.save(os.path.join(tmp_dir, f"{name}_offsets.npy"), np.asarray(offsets))
+                np.asarray(blob, dtype="uint8").tofile(os.path.join(tmp_dir, f"{name}.bin"))
+            else:
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), np.asarray(self.arrays[name]))
+        schema = {"count": self.count, "fields": self.field_types, "vocabs": self.vocabs}
+        with open(os.path.join(tmp_dir, SCHEMA_FILE), 'w', encoding='utf-8') as f:
+            json.dump(schema, f, ensure_ascii=False)
+
+        if os.path.exists(meta_dir):
+            os.replace(meta_dir, old_dir)
+        os.replace(tmp_dir, meta_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    # ── 조회 ────────────────────────────────────────────────────────────────
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, row: int) -> Dict[str, Any]:
+        if row < 0:
+            row += self.count
+        if not 0 <= row < self.count:
+            raise IndexError(row)
+        return {name: self.value(name, row) for name in self.field_types}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(self.count):
+            yield self[row]
+
+    def value(self, name: str, row: int):
+        """한 행의 한 필드 값"""
+        kind = self.field_types[name]
+        if kind == "text":
+            offsets, blob = self.texts[name]
+            start, end = int(offsets[row]), int(offsets[row + 1])
+            return bytes(blob[start:end]).decode("utf-8")
+        if kind == "category":
+            code = int(self.arrays[name][row])
+            return self.vocabs[name][code] if code >= 0 else None
+        return _to_python(self.arrays[name][row], kind)
+
+    def values(self, name: str, rows: np.ndarray) -> List[Any]:
+        """여러 행의 한 필드 값 (숫자/범주형은 배열 연산으로 한 번에 읽음)"""
+        rows = np.asarray(rows, dtype="int64")
+        kind = self.field_types[name]
+        if kind == "text":
+            offsets, blob = self.texts[name]
+            starts, ends = np.asarray(offsets[rows]), np.asarray(offsets[rows + 1])
+            return [bytes(blob[s:e]).decode("utf-8") for s, e in zip(starts.tolist(), ends.tolist())]
+        if kind == "category":
+            vocab = self.vocabs[name]
+            return [vocab[c] if c >= 0 else None for c in np.asarray(self.arrays[name])[rows].tolist()]
+        return [_to_python(v, kind) for v in np.asarray(self.arrays[name])[rows]]
+
+    def column(self, name: str) -> np.ndarray:
+        """숫자형 값 또는 범주형 코드 배열"""
+        return self.arrays[name]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self.arrays["id"]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    # ── 필터 ────────────────────────────────────────────────────────────────
+    def filter_mask(self, spec: Dict[str, Any]) -> np.ndarray:
+        """
+        필터 조건 -> 행별 bool 마스크 (조건끼리는 AND)
+        - 값 하나 또는 리스트: 일치하는 값 중 하나 (예: {"platform": ["kakaomap", "tripdotcom"]})
+        - {"min": a, "max": b}: 범위 (양 끝 포함, 한쪽 생략 가능)
+          범주형 필드(date 등)는 문자열 비교 -> ISO 날짜 범위에 사용
+        """
+        mask = np.ones(self.count, dtype=bool)
+        for name, cond in spec.items():
+            if cond is None:
+                continue
+            if name not in self.field_types or self.field_types[name] == "text":
+                raise ValueError(f"필터를 지원하지 않는 필드: {name}")
+            mask &= self._field_mask(name, cond)
+        return mask
+
+    def _field_mask(self, name: str, cond) -> np.ndarray:
+        kind = self.field_types[name]
+        values = np.asarray(self.arrays[name])
+        if isinstance(cond, dict):
+            lo, hi = cond.get("min"), cond.get("max")
+            if kind == "category":
+                vocab = self.vocabs[name]
+                allowed = [i for i, v in enumerate(vocab)
+                           if v is not None and (lo is None or v >= str(lo)) and (hi is None or v <= str(hi))]
+                return np.isin(values, allowed)
+            mask = np.ones(self.count, dtype=bool)
+            if lo is not None:
+                mask &= values >= lo
+            if hi is not None:
+                mask &= values <= hi
+            return mask
+
+        conds = cond if isinstance(cond, (list, tuple, set)) else [cond]
+        mask = np.zeros(self.count, dtype=bool)
+        for value in conds:
+            mask |= self._value_bitmap(name, value)
+        return mask
+
+    def _value_bitmap(self, name: str, value) -> np.ndarray:
+        """(필드, 값) 단위 bool 마스크 - 한 번 만들면 캐시해 재사용"""
+        key = (name, value)
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            values = np.asarray(self.arrays[name])
+            if self.field_types[name] == "category":
+                vocab = self.vocabs[name]
+                code = vocab.index(str(value)) if str(value) in vocab else -2
+                bitmap = values == code
+            else:
+                bitmap = values == value
+            self._bitmaps[key] = bitmap
+        return bitmap
+
+    # ── 변경 (새 객체 반환) ────────────────────────────────────────────────
+    def take(self, rows: np.ndarray) -> "ColumnarMetadata":
+        """지정한 행만 남긴 새 메타데이터"""
+        rows = np.asarray(rows, dtype="int64")
+        arrays = {name: np.asarray(arr)[rows] for name, arr in self.arrays.items()}
+        texts = {}
+        for name, (offsets, blob) in self.texts.items():
+            offsets = np.asarray(offsets)
+            starts, ends = offsets[rows], offsets[rows + 1]
+            blob = np.asarray(blob)
+            parts = [blob[s:e] for s, e in zip(starts, ends)]
+            new_blob = np.concatenate(parts) if parts else np.zeros(0, dtype="uint8")
+            new_offsets = np.zeros(len(rows) + 1, dtype="int64")
+            np.cumsum(ends - starts, out=new_offsets[1:])
+            texts[name] = (new_offsets, new_blob)
+        return ColumnarMetadata(len(rows), self.field_types, arrays,
+                                {k: list(v) for k, v in self.vocabs.items()}, texts)
+
+    def extend(self, records: Sequence[Dict[str, Any]]) -> "ColumnarMetadata":
+        """행을 뒤에 추가한 새 메타데이터 (범주형 vocab은 이어서 확장)"""
+        if not records:
+            return self
+        other = ColumnarMetadata.from_records(records, self.field_types)
+        arrays, vocabs, texts = {}, {}, {}
+        for name, kind in self.field_types.items():
+            if kind == "text":
+                offsets, blob = self.texts[name]
+                o_offsets, o_blob = other.texts[name]
+                base = int(offsets[-1])
+                texts[name] = (
+                    np.concatenate([np.asarray(offsets), np.asarray(o_offsets[1:]) + base]),
+                    np.concatenate([np.asarray(blob, dtype="uint8"), o_blob]),
+                )
+            elif kind == "category":
+                vocab = list(self.vocabs[name])
+                lookup = {v: i for i, v in enumerate(vocab)}
+                remap = np.empty(len(other.vocabs[name]), dtype="int32")
+                for i, v in enumerate(other.vocabs[name]):
+                    if v not in lookup:
+                        lookup[v] = len(vocab)
+                        vocab.append(v)
+                    remap[i] = lookup[v]
+                codes = other.arrays[name]
+                new_codes = np.where(codes >= 0, remap[np.maximum(codes, 0)] if len(remap) else -1, -1)
+                arrays[name] = np.concatenate([np.asarray(self.arrays[name]), new_codes.astype("int32")])
+                vocabs[name] = vocab
+            else:
+                arrays[name] = np.concatenate([np.asarray(self.arrays[name]), other.arrays[name]])
+        return ColumnarMetadata(self.count + other.count, self.field_types, arrays, vocabs, texts)
+
+
+def _encode_texts(values: Iterable[Optional[str]]) -> tuple:
+    """문자열 리스트 -> (offsets, utf-8 blob)"""
+    encoded = [("" if v is None else str(v)).encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype="int64")
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype="uint8").copy()
+    return offsets, blob
+
+
+def has_columnar_metadata(index_path: str) -> bool:
+    return os.path.exists(os.path.join(index_path, META_DIR, SCHEMA_FILE))
+
+
+def read_meta_json(index_path: str, meta_file: str = "meta.json") -> ColumnarMetadata:
+    """기존 meta.json을 메모리에서 컬럼형으로 변환 (디스크에 쓰지 않음 - 읽기 전용 로드용)"""
+    with open(os.path.join(index_path, meta_file), 'r', encoding='utf-8') as f:
+        return ColumnarMetadata.from_records(json.load(f))
+
+
+def migrate_meta_json(index_path: str, meta_file: str = "meta.json", mmap: bool = True) -> ColumnarMetadata:
+    """
+    기존 meta.json -> meta/ 일회성 변환
+    변환 후 원본은 meta.json.migrated 로 이름을 바꿔 보관
+    여러 프로세스가 동시에 변환해도 안전: 프로세스별 임시 디렉토리에 쓴 뒤 rename으로 한 번에 게시하고,
+    먼저 게시한 쪽이 있으면 그 결과를 그대로 사용
+    """
+    json_path = os.path.join(index_path, meta_file)
+    if not has_columnar_metadata(index_path):
+        staging = os.path.join(index_path, f".{META_DIR}.migrate-{os.getpid()}")
+        shutil.rmtree(staging, ignore_errors=True)
+        try:
+            metadata = read_meta_json(index_path, meta_file)
+            metadata.save(staging)
+            try:
+                os.rename(os.path.join(staging, META_DIR), os.path.join(index_path, META_DIR))
+                print(f"Migrated {len(metadata)} metadata entries from {meta_file} to columnar format")
+            except OSError:
+                if not has_columnar_metadata(index_path):   # 다른 프로세스가 먼저 게시한 경우가 아니면 실패
+                    raise
+        except FileNotFoundError:
+            if not has_columnar_metadata(index_path):       # meta.json이 사라진 것도 먼저 끝낸 쪽이 있을 때만 허용
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    try:
+        os.replace(json_path, json_path + ".migrated")
+    except FileNotFoundError:
+        pass  # 다른 프로세스가 이미 이름을 바꿈
+    return ColumnarMetadata.load(index_path, mmap=mmap)
@@ -0,0 +1,89 @@
+"""
+근사 중복 리뷰 클러스터링 (MinHash LSH)
+카카오맵/마이리얼트립에 거의 같은 리뷰가 반복되어 top-k를 차지하는 것을 막기 위해
+인덱스 구축 시 글자 shingle 집합의 MinHash로 묶고 클러스터 ID를 메타데이터에 저장
+
+환경변수:
+  RAG_DEDUP             0이면 클러스터링 생략 (기본 1)
+  RAG_DEDUP_THRESHOLD   같은 클러스터로 볼 최소 (추정) Jaccard 유사도 (기본 0.8)
+"""
+from __future__ import annotations
+import hashlib
+import os
+import re
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+NUM_BANDS = 16          # band당 4개 -> Jaccard 0.5 부근부터 후보가 됨
+DEFAULT_THRESHOLD = 0.8
+
+_STRIP_RE = re.compile(r"[^0-9a-z가-힣]+")
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, 2 ** 32, NUM_PERM, dtype="uint64")
+_PERM_B = _rng.integers(0, 2 ** 32, NUM_PERM, dtype="uint64")
+
+
+def _shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """공백/기호를 제거한 글자 n-gram 집합 (짧은 글은 글 전체)"""
+    text = _STRIP_RE.sub("", (text or "").lower())
+    if len(text) <= size:
+        return [text]
+    return list({text[i:i + size] for i in range(len(text) - size + 1)})
+
+
+def minhash(text: str) -> np.ndarray:
+    """NUM_PERM개 해시 함수의 shingle 최솟값 서명"""
+    hashes = np.frombuffer(
+        b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest() for s in _shingles(text)),
+        dtype="<u4",
+    ).astype("uint64")
+    return ((hashes[:, None] * _PERM_A + _PERM_B) & 0xFFFFFFFF).min(axis=0)
+
+
+def cluster_near_duplicates(texts: Sequence[str], threshold: float = DEFAULT_THRESHOLD) -> np.ndarray:
+    """
+    텍스트별 클러스터 번호 (클러스터의 첫 텍스트 위치)
+    서명을 band로 나눠 band가 하나라도 같은 후보끼리만 추정 Jaccard를 비교
+    """
+    n = len(texts)
+    parent = np.arange(n)
+    if n == 0:
+        return parent.astype("int64")
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    signatures = np.vstack([minhash(t) for t in texts])
+    first_of: Dict[bytes, int] = {}  # 서명이 완전히 같은 텍스트는 바로 묶고 대표만 band 비교
+    for i in range(n):
+        parent[i] = first_of.setdefault(signatures[i].tobytes(), i)
+    unique = list(first_of.values())
+
+    rows_per_band = NUM_PERM // NUM_BANDS
+    for band in range(NUM_BANDS):
+        cols = slice(band * rows_per_band, (band + 1) * rows_per_band)
+        buckets: Dict[bytes, List[int]] = {}
+        for i in unique:
+            buckets.setdefault(signatures[i, cols].tobytes(), []).append(i)
+        for members in buckets.values():
+            for a_pos, a in enumerate(members):
+                for b in members[a_pos + 1:]:
+                    ra, rb = find(a), find(b)
+                    if ra != rb and np.mean(signatures[a] == signatures[b]) >= threshold:
+                        parent[max(ra, rb)] = min(ra, rb)  # 앞선 텍스트가 대표
+
+    return np.array([find(i) for i in range(n)], dtype="int64")
+
+
+def dedup_enabled() -> bool:
+    return os.getenv("RAG_DEDUP", "1") == "1"
+
+
+def threshold_from_env() -> float:
+    return float(os.getenv("RAG_DEDUP_THRESHOLD", DEFAULT_THRESHOLD))
@@ -0,0 +1,140 @@
+"""
+쿼리 임베딩 캐시
+자주 반복되는 질문("주말 혼잡해요?", "후기 요약")의 임베딩을 재사용해 원격 호출을 생략
+
+환경변수:
+  RAG_QUERY_CACHE_SIZE   메모리 LRU 최대 항목 수 (기본 1024, 0이면 비활성)
+  RAG_QUERY_CACHE_TTL    항목 유효시간(초) (기본 86400)
+  RAG_QUERY_CACHE_DISK   1이면 SQLite 디스크 캐시를 2차 저장소로 사용 (프로세스 간 공유)
+  RAG_QUERY_CACHE_PATH   디스크 캐시 경로 (기본 st_app/db/query_cache.sqlite)
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from st_app.rag.embedding_cache import EmbeddingCache, normalize_text
+
+DEFAULT_QUERY_CACHE_PATH = "st_app/db/query_cache.sqlite"
+
+
+def _query_key(query: str, model: str) -> Tuple[str, str]:
+    return normalize_text(query).lower(), model
+
+
+def _disk_model(model: str, dim: int) -> str:
+    """디스크 캐시 모델 키 (같은 이름의 모델이라도 차원이 다르면 다른 키)"""
+    return f"{model}:{dim}:query"
+
+
+class QueryEmbeddingCache:
+    """
+    (정규화된 쿼리, 모델명) -> 정규화된 쿼리 임베딩
+    - 메모리: LRU + TTL
+    - 디스크(선택): EmbeddingCache(SQLite)를 통해 여러 프로세스가 공유
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 86400.0,
+                 disk_cache: Optional[EmbeddingCache] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.disk_cache = disk_cache
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, query: str, model: str, dim: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        캐시된 임베딩 (없거나 만료되면 None)
+        dim: 기대 차원 - 다른 차원의 벡터는 miss, 디스크 캐시는 (모델명, 차원)을 키로 하므로 dim을 알 때만 조회
+        """
+        key = _query_key(query, model)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, vec = entry
+                if now - stored_at <= self.ttl and (dim is None or vec.shape[0] == dim):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vec
+                del self._entries[key]
+
+        if self.disk_cache is not None and dim is not None:
+            found = self.disk_cache.get_entries([key[0]], _disk_model(model, dim))
+            if found and now - found[0][0] <= self.ttl:
+                stored_at, vec = found[0]
+                vec = vec.copy()
+                vec.setflags(write=False)
+                self._store(key, vec, stored_at)   # 디스크에 저장된 시각 기준으로 만료
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return vec
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, query: str, model: str, vec: np.ndarray) -> np.ndarray:
+        """임베딩 저장 후 (읽기 전용) 저장된 벡터 반환"""
+        key = _query_key(query, model)
+        vec = np.array(vec, dtype="float32").reshape(-1)
+        vec.setflags(write=False)
+        self._store(key, vec, time.time())
+        if self.disk_cache is not None:
+            self.disk_cache.put_many([key[0]], vec[None, :], _disk_model(model, vec.shape[0]))
+        return vec
+
+    def _store(self, key: Tuple[str, str], vec: np.ndarray, now: float) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (now, vec)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "size": len(self._entries),
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# --------- 프로세스 전역 캐시 ---------
+_QUERY_CACHE: Optional[QueryEmbeddingCache] = None
+_QUERY_CACHE_LOCK = threading.Lock()
+
+
+def get_query_cache() -> QueryEmbeddingCache:
+    """환경변수 설정으로 만든 공용 쿼리 임베딩 캐시"""
+    global _QUERY_CACHE
+    with _QUERY_CACHE_LOCK:
+        if _QUERY_CACHE is None:
+            disk = None
+            if os.getenv("RAG_QUERY_CACHE_DISK", "0") == "1":
+                disk = EmbeddingCache(os.getenv("RAG_QUERY_CACHE_PATH", DEFAULT_QUERY_CACHE_PATH))
+            _QUERY_CACHE = QueryEmbeddingCache(
+                max_size=int(os.getenv("RAG_QUERY_CACHE_SIZE", 1024)),
+                ttl=float(os.getenv("RAG_QUERY_CACHE_TTL", 86400)),
+                disk_cache=disk,
+            )
+        return _QUERY_CACHE
@@ -0,0 +1,102 @@
+"""
+Cross-encoder 재정렬 (선택)
+벡터 검색 후보를 로컬 cross-encoder(sentence-transformers, CPU)로 (질문, 리뷰) 쌍 단위 점수화해 재정렬
+모든 후보 쌍을 한 번의 forward로 처리하고, (질문, 리뷰 ID) 점수는 LRU로 캐시
+
+환경변수:
+  RAG_RERANK              1이면 사용 (기본 0)
+  RAG_RERANK_MODEL        cross-encoder 모델 (기본 다국어 MiniLM)
+  RAG_RERANK_CACHE_SIZE   점수 캐시 최대 항목 수 (기본 4096)
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from st_app.rag.embedding_cache import normalize_text
+from st_app.rag.search_hits import SearchHits
+
+DEFAULT_RERANK_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+
+
+class CrossEncoderReranker:
+    """
+    model: predict(pairs, batch_size=...)를 제공하는 객체 (없으면 model_name으로 CrossEncoder lazy 로딩)
+    """
+
+    def __init__(self, model=None, model_name: Optional[str] = None, cache_size: int = 4096):
+        self.model = model
+        self.model_name = model_name or os.getenv("RAG_RERANK_MODEL", DEFAULT_RERANK_MODEL)
+        self.cache_size = cache_size
+        self._scores: "OrderedDict[Tuple[str, int], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        """CrossEncoder lazy loading (sentence-transformers는 사용할 때만 import)"""
+        if self.model is None:
+            from sentence_transformers import CrossEncoder
+
+            self.model = CrossEncoder(self.model_name, device="cpu")
+        return self.model
+
+    def score(self, query: str, hits: SearchHits) -> Tuple[np.ndarray, int]:
+        """후보별 점수와 새로 계산한 쌍 수 (캐시에 없는 쌍만 한 번에 모델 호출)"""
+        key_query = normalize_text(query).lower()
+        ids = hits.ids.tolist()
+        scores = np.empty(len(ids), dtype="float32")
+        missing = []
+        with self._lock:
+            for i, id_ in enumerate(ids):
+                cached = self._scores.get((key_query, id_))
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._scores.move_to_end((key_query, id_))
+                    scores[i] = cached
+
+        if missing:
+            contents = hits.column("content")
+            pairs = [(query, contents[i]) for i in missing]
+            predicted = np.asarray(self._get_model().predict(pairs, batch_size=len(pairs)), dtype="float32")
+            scores[missing] = predicted.reshape(-1)
+            with self._lock:
+                for i, value in zip(missing, predicted.reshape(-1).tolist()):
+                    self._scores[(key_query, ids[i])] = value
+                while len(self._scores) > self.cache_size:
+                    self._scores.popitem(last=False)
+        return scores, len(missing)
+
+    def rerank(self, query: str, hits: SearchHits) -> Tuple[SearchHits, Dict[str, Any]]:
+        """cross-encoder 점수 내림차순으로 재정렬한 결과와 통계(지연시간 등)"""
+        t0 = time.perf_counter()
+        if not hits:
+            return hits, {"model": self.model_name, "latency_ms": 0.0, "scored": 0, "cached": 0}
+        scores, n_scored = self.score(query, hits)
+        order = np.argsort(-scores, kind="stable")
+        stats = {
+            "model": self.model_name,
+            "latency_ms": round((time.perf_counter() - t0) * 1000, 2),
+            "scored": n_scored,
+            "cached": len(hits) - n_scored,
+        }
+        return hits.take(order), stats
+
+
+# --------- 프로세스 전역 재정렬기 ---------
+_RERANKER: Optional[CrossEncoderReranker] = None
+_RERANKER_LOCK = threading.Lock()
+
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """RAG_RERANK=1이면 공용 재정렬기, 아니면 None"""
+    global _RERANKER
+    if os.getenv("RAG_RERANK", "0") != "1":
+        return None
+    with _RERANKER_LOCK:
+        if _RERANKER is None:
+            _RERANKER = CrossEncoderReranker(cache_size=int(os.getenv("RAG_RERANK_CACHE_SIZE", 4096)))
+        return _RERANKER
@@ -6,6 +6,8 @@ import hashlib
 from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
 
+from st_app.rag.context_packer import pack_context
+
 
 # ── 내부 유틸 ──────────────────────────────────────────────────────────────────
 META_KEYS = ("platform", "subject", "place", "date", "rating", "url")
@@ -27,10 +29,17 @@ def _short_src(md: Dict[str, Any]) -> str:
     return f"{platform}|{subj}|{date}{rate_s}"
 
 def _dedup_by_text(docs: List[Document]) -> List[Document]:
-    """동일/거의 동일한 청크가 많을 때 간단히 중복 제거(문자열 해시 기반)."""
+    """
+    동일/거의 동일한 청크가 많을 때 간단히 중복 제거.
+    인덱스 구축 시 기록된 근사 중복 클러스터(dup_cluster)가 있으면 그것을, 없으면 문자열 해시를 사용.
+    """
     seen, out = set(), []
     for d in docs:
-        key = hashlib.md5(d.page_content.strip().encode("utf-8")).hexdigest()
+        cluster = (d.metadata or {}).get("dup_cluster")
+        if cluster is not None and cluster >= 0:
+            key = f"cluster:{cluster}"
+        else:
+            key = hashlib.md5(d.page_content.strip().encode("utf-8")).hexdigest()
         if key in seen:
             continue
         seen.add(key)
@@ -61,10 +70,11 @@ def make_retriever(
     )
 
 
-def format_docs(docs: List[Document]) -> str:
+def format_docs(docs: List[Document], token_budget: Optional[int] = None) -> str:
     """
     프롬프트에 넣을 컨텍스트 문자열 생성.
     rag_review_node의 응답 가이드에 맞춰 한 청크당 메타 포함.
+    token_budget이 있으면 순서대로 예산 안에서만 채움 (긴 청크는 문장 단위로 자름).
     """
     if not docs:
         return ""
@@ -74,14 +84,8 @@ def format_docs(docs: List[Document]) -> str:
         _ensure_meta_fields(d)
     docs = _dedup_by_text(docs)
 
-    parts = []
-    for d in docs:
-        parts.append(
-            "[Chunk]\n"
-            f"{d.page_content}\n"
-            f"(meta: source={_short_src(d.metadata)})"
-        )
-    return "\n\n".join(parts)
+    blocks = [(f"[Chunk]\n{d.page_content}", f"(meta: source={_short_src(d.metadata)})") for d in docs]
+    return pack_context(blocks, token_budget)[1]
 
 
 def docs_to_hits(docs: List[Document]) -> List[Dict[str, Any]]:
@@ -0,0 +1,131 @@
+"""
+검색 결과 배열 컨테이너
+FAISS 출력(행 번호, 점수)을 그대로 들고 다니다가 필요한 필드만 컬럼 단위로 읽음
+LangChain Document는 to_documents() / to_pairs()를 호출할 때만 생성
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain.schema import Document
+
+from st_app.rag.metadata_store import ColumnarMetadata
+
+# Document.metadata에 들어가는 메타데이터 필드
+DOC_FIELDS = ("platform", "subject", "place", "date", "rating", "url")
+
+
+class SearchHit:
+    """결과 한 건 (SearchHits 반복 시 생성되는 가벼운 레코드)"""
+    __slots__ = ("row", "score", "similarity", "content", "platform", "date", "rating", "place")
+
+    def __init__(self, row: int, score: float, similarity: Optional[float], content: str,
+                 platform: Optional[str], date: Optional[str], rating, place: Optional[str]):
+        self.row = row
+        self.score = score
+        self.similarity = similarity
+        self.content = content
+        self.platform = platform
+        self.date = date
+        self.rating = rating
+        self.place = place
+
+
+class SearchHits:
+    """
+    struct-of-arrays 검색 결과
+    - rows: 메타데이터 행 번호, scores: 검색 점수 (dense는 코사인 유사도, hybrid는 RRF 점수)
+    - similarity: 코사인 유사도 (dense면 scores와 같음, 계산 못한 칸은 NaN)
+    - bm25: BM25 점수 (hybrid 검색일 때만, 해당 없는 칸은 NaN)
+    """
+
+    def __init__(self, metadata: ColumnarMetadata, rows: np.ndarray, scores: np.ndarray,
+                 similarity: Optional[np.ndarray] = None, bm25: Optional[np.ndarray] = None):
+        self.metadata = metadata
+        self.rows = np.asarray(rows, dtype="int64")
+        self.scores = np.asarray(scores, dtype="float32")
+        self.similarity = self.scores if similarity is None else np.asarray(similarity, dtype="float32")
+        self.bm25 = None if bm25 is None else np.asarray(bm25, dtype="float32")
+        self._columns: Dict[str, List[Any]] = {}
+
+    @classmethod
+    def empty(cls, metadata: ColumnarMetadata) -> "SearchHits":
+        return cls(metadata, np.zeros(0, dtype="int64"), np.zeros(0, dtype="float32"))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __bool__(self) -> bool:
+        return len(self.rows) > 0
+
+    @property
+    def ids(self) -> np.ndarray:
+        """결과 리뷰 ID (ID가 없는 예전 인덱스는 행 번호)"""
+        ids = np.asarray(self.metadata.ids)[self.rows]
+        return np.where(ids >= 0, ids, self.rows)
+
+    def take(self, positions) -> "SearchHits":
+        """일부 결과만 남긴 SearchHits (positions: 인덱스 배열, bool 마스크 또는 slice)"""
+        return SearchHits(
+            self.metadata, self.rows[positions], self.scores[positions], self.similarity[positions],
+            None if self.bm25 is None else self.bm25[positions],
+        )
+
+    def collapse_duplicates(self) -> "SearchHits":
+        """
+        근사 중복 클러스터마다 첫(최상위) 결과만 남김 - 결과 수에 비례하는 O(k)
+        클러스터 정보가 없는 인덱스(-1)는 그대로 유지
+        """
+        if "dup_cluster" not in self.metadata.field_types or len(self.rows) < 2:
+            return self
+        clusters = np.asarray(self.metadata.column("dup_cluster"))[self.rows]
+        seen = set()
+        keep = np.ones(len(clusters), dtype=bool)
+        for i, cluster in enumerate(clusters.tolist()):
+            if cluster < 0:
+                continue
+            if cluster in seen:
+                keep[i] = False
+            seen.add(cluster)
+        return self if keep.all() else self.take(keep)
+
+    def column(self, name: str) -> List[Any]:
+        """결과 행들의 필드 값 (한 번 읽으면 캐시)"""
+        values = self._columns.get(name)
+        if values is None:
+            if name in self.metadata.field_types:
+                values = self.metadata.values(name, self.rows)
+            else:
+                values = [None] * len(self.rows)
+            self._columns[name] = values
+        return values
+
+    def __iter__(self) -> Iterator[SearchHit]:
+        columns = [self.column(name) for name in ("content", "platform", "date", "rating", "place")]
+        similarity = [None if s != s else s for s in self.similarity.tolist()]  # NaN -> None
+        for i, (row, score) in enumerate(zip(self.rows.tolist(), self.scores.tolist())):
+            yield SearchHit(row, score, similarity[i], *(col[i] for col in columns))
+
+    # ── LangChain 호환 ──────────────────────────────────────────────────────
+    def to_documents(self) -> List[Document]:
+        columns = {name: self.column(name) for name in DOC_FIELDS}
+        contents = self.column("content")
+        similarity = self.similarity.tolist()
+        bm25 = None if self.bm25 is None else self.bm25.tolist()
+        clusters = self.column("dup_cluster") if "dup_cluster" in self.metadata.field_types else None
+        docs = []
+        for i, row in enumerate(self.rows.tolist()):
+            metadata = {name: columns[name][i] for name in DOC_FIELDS}
+            metadata["source_row"] = row  # 원본 인덱스
+            metadata["chunk_index"] = row
+            if clusters is not None:
+                metadata["dup_cluster"] = clusters[i]
+            if bm25 is not None:
+                metadata["similarity"] = None if similarity[i] != similarity[i] else similarity[i]
+                metadata["bm25_score"] = None if bm25[i] != bm25[i] else bm25[i]
+            docs.append(Document(page_content=contents[i], metadata=metadata))
+        return docs
+
+    def to_pairs(self) -> List[Tuple[Document, float]]:
+        """[(Document, 점수)] - 기존 similarity_search_with_score 반환 형식"""
+        return list(zip(self.to_documents(), self.scores.tolist()))
@@ -0,0 +1,180 @@
+"""
+BM25 희소(sparse) 역색인
+전처리 결과의 tokenized_content(klue/bert-base WordPiece 토큰)로 만든 역색인을
+FAISS 인덱스 옆(index_path/bm25/)에 저장해 "아트란티스", "자이로드롭" 같은 정확한 용어 질의를 보완
+
+쿼리는 같은 토크나이저를 불러오지 않고, 색인된 토큰 vocab으로 WordPiece 최장 일치 분할을 수행함
+"""
+from __future__ import annotations
+import json
+import math
+import os
+import re
+import shutil
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BM25_DIR = "bm25"
+
+_WORD_RE = re.compile(r"[0-9A-Za-z가-힣]+|[^\s0-9A-Za-z가-힣]")
+_MAX_PIECE_CHARS = 20
+
+
+def simple_tokenize(text: str) -> List[str]:
+    """토큰 정보가 없는 문서용 간단 분할 (단어/기호 단위)"""
+    return _WORD_RE.findall((text or "").lower())
+
+
+class BM25Index:
+    """
+    CSR 형태 역색인
+    - vocab: 토큰 -> term 번호
+    - indptr[t]:indptr[t+1] 구간의 rows/tfs 가 term t의 posting
+    - 검색 결과는 메타데이터 행 번호 (FAISSVectorStore 메타데이터와 같은 순서)
+    """
+
+    def __init__(self, vocab: Dict[str, int], indptr: np.ndarray, rows: np.ndarray, tfs: np.ndarray,
+                 doc_len: np.ndarray, k1: float = 1.2, b: float = 0.75):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.rows = rows
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(doc_len)
+        self.avgdl = float(np.mean(doc_len)) if self.n_docs else 0.0
+        self._max_piece = min(_MAX_PIECE_CHARS, max((len(t.lstrip("#")) for t in vocab), default=1))
+
+    # ── 생성/저장 ────────────────────────────────────────────────────────────
+    @classmethod
+    def build(cls, token_lists: Sequence[Sequence[str]], k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        vocab: Dict[str, int] = {}
+        term_rows: List[List[int]] = []
+        term_tfs: List[List[int]] = []
+        doc_len = np.zeros(len(token_lists), dtype="float32")
+
+        for row, tokens in enumerate(token_lists):
+            doc_len[row] = len(tokens)
+            counts: Dict[int, int] = {}
+            for tok in tokens:
+                t = vocab.get(tok)
+                if t is None:
+                    t = vocab[tok] = len(vocab)
+                    term_rows.append([])
+                    term_tfs.append([])
+                counts[t] = counts.get(t, 0) + 1
+            for t, c in counts.items():
+                term_rows[t].append(row)
+                term_tfs[t].append(c)
+
+        indptr = np.zeros(len(vocab) + 1, dtype="int64")
+        np.cumsum([len(r) for r in term_rows], out=indptr[1:])
+        rows = np.fromiter((r for rs in term_rows for r in rs), dtype="int32", count=int(indptr[-1]))
+        tfs = np.fromiter((c for cs in term_tfs for c in cs), dtype="float32", count=int(indptr[-1]))
+        return cls(vocab, indptr, rows, tfs, doc_len, k1, b)
+
+    @classmethod
+    def from_metadata(cls, metadata) -> "BM25Index":
+        """ColumnarMetadata의 tokens(공백 구분) 컬럼으로 생성, 없으면 본문을 간단 분할"""
+        has_tokens = "tokens" in metadata.field_types
+        token_lists = []
+        for row in range(len(metadata)):
+            tokens = metadata.value("tokens", row).split() if has_tokens else []
+            if not tokens:
+                tokens = simple_tokenize(metadata.value("content", row))
+            token_lists.append(tokens)
+        return cls.build(token_lists)
+
+    def save(self, index_path: str) -> None:
+        out_dir = os.path.join(index_path, BM25_DIR)
+        tmp_dir = f"{out_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        np.save(os.path.join(tmp_dir, "indptr.npy"), self.indptr)
+        np.save(os.path.join(tmp_dir, "rows.npy"), self.rows)
+        np.save(os.path.join(tmp_dir, "tfs.npy"), self.tfs)
+        np.save(os.path.join(tmp_dir, "doc_len.npy"), self.doc_len)
+        with open(os.path.join(tmp_dir, "vocab.json"), 'w', encoding='utf-8') as f:
+            json.dump({"k1": self.k1, "b": self.b, "vocab": self.vocab}, f, ensure_ascii=False)
+        shutil.rmtree(out_dir, ignore_errors=True)
+        os.replace(tmp_dir, out_dir)
+
+    @classmethod
+    def load(cls, index_path: str, mmap: bool = True) -> Optional["BM25Index"]:
+        in_dir = os.path.join(index_path, BM25_DIR)
+        if not os.path.exists(os.path.join(in_dir, "vocab.json")):
+            return None
+        mode = "r" if mmap else None
+        with open(os.path.join(in_dir, "vocab.json"), 'r', encoding='utf-8') as f:
+            params = json.load(f)
+        return cls(
+            params["vocab"],
+            np.load(os.path.join(in_dir, "indptr.npy"), mmap_mode=mode),
+            np.load(os.path.join(in_dir, "rows.npy"), mmap_mode=mode),
+            np.load(os.path.join(in_dir, "tfs.npy"), mmap_mode=mode),
+            np.load(os.path.join(in_dir, "doc_len.npy")),
+            params.get("k1", 1.2),
+            params.get("b", 0.75),
+        )
+
+    # ── 검색 ────────────────────────────────────────────────────────────────
+    def tokenize_query(self, text: str) -> List[str]:
+        """색인 vocab 기준 WordPiece 최장 일치 분할 (vocab에 없는 글자는 건너뜀)"""
+        tokens: List[str] = []
+        for word in simple_tokenize(text):
+            start = 0
+            while start < len(word):
+                end = min(len(word), start + self._max_piece)
+                piece = None
+                while end > start:
+                    cand = word[start:end] if start == 0 else "##" + word[start:end]
+                    if cand in self.vocab:
+                        piece = cand
+                        break
+                    end -= 1
+                if piece is None:
+                    start += 1
+                    continue
+                tokens.append(piece)
+                start = end
+        return tokens
+
+    def search(self, query: str, k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 상위 k개 (scores, rows) - 점수가 0인 문서는 제외
+        mask가 있으면 True인 행만 대상
+        """
+        terms = [self.vocab[t] for t in set(self.tokenize_query(query)) if t in self.vocab]
+        if not terms or self.n_docs == 0:
+            return np.zeros(0, dtype="float32"), np.zeros(0, dtype="int64")
+
+        scores = np.zeros(self.n_docs, dtype="float32")
+        norm = self.k1 * (1 - self.b + self.b * self.doc_len / max(self.avgdl, 1e-6))
+        for t in terms:
+            start, end = int(self.indptr[t]), int(self.indptr[t + 1])
+            rows = np.asarray(self.rows[start:end])
+            tfs = np.asarray(self.tfs[start:end])
+            df = end - start
+            idf = math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+            scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + norm[rows])
+
+        if mask is not None:
+            scores[~mask] = 0
+        candidates = np.nonzero(scores > 0)[0]
+        if len(candidates) > k:
+            top = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[top]
+        order = np.argsort(-scores[candidates], kind="stable")
+        rows = candidates[order]
+        return scores[rows], rows.astype("int64")
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], rrf_k: int = 60) -> List[Tuple[int, float]]:
+    """여러 순위 리스트를 RRF로 합침 -> [(항목, 점수)] 점수 내림차순"""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (rrf_k + rank + 1)
+    return sorted(fused.items(), key=lambda kv: kv[1], reverse=True)
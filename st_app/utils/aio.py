@@ -0,0 +1,36 @@
+"""
+비동기 실행 보조 함수
+이벤트 루프를 막는 작업(FAISS 검색, 재정렬, 인덱스/파일 로드)을 공용 스레드 풀에서 실행
+(FAISS/numpy는 연산 중 GIL을 놓으므로 여러 세션의 검색이 스레드에서 겹쳐 실행됨)
+
+환경변수:
+  RAG_WORKER_THREADS  스레드 풀 크기 (기본 4)
+"""
+from __future__ import annotations
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_worker_pool() -> ThreadPoolExecutor:
+    """프로세스 전역 스레드 풀 (첫 사용 시 생성)"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(
+                max_workers=int(os.getenv("RAG_WORKER_THREADS", 4)),
+                thread_name_prefix="rag-worker",
+            )
+        return _POOL
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """동기 함수를 공용 스레드 풀에서 실행하고 결과를 기다림"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_worker_pool(), functools.partial(fn, *args, **kwargs))
@@ -0,0 +1,87 @@
+"""
+Aho–Corasick 다중 키워드 매처
+키워드 목록을 한 번 컴파일해 두고, 입력을 한 번만 훑어 모든 (겹치는 것 포함) 일치를 반환
+(입력 길이 + 일치 수에 비례 -> 키워드가 수천 개로 늘어도 지연시간이 거의 일정)
+대소문자는 구분하지 않음
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+
+class KeywordMatch(NamedTuple):
+    start: int
+    end: int          # 입력에서 text[start:end]가 일치한 부분
+    keyword: str      # 등록한 원래 키워드
+    value: Any        # 키워드와 함께 등록한 값
+
+
+class KeywordMatcher:
+    """
+    keywords: (키워드, 값) 목록 - 같은 키워드를 다른 값으로 여러 번 등록할 수 있음
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str, Any]]] = [[]]   # (키워드 길이, 키워드, 값)
+        self._size = 0
+        for keyword, value in keywords:
+            self._add(keyword, value)
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _add(self, keyword: str, value: Any) -> None:
+        key = keyword.lower()
+        if not key:
+            return
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(key), keyword, value))
+        self._size += 1
+
+    def _build_failure_links(self) -> None:
+        """BFS로 실패 링크 계산, 실패 상태의 출력을 합쳐 두어 검색 시 링크를 따라갈 필요 없음"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                if state == 0:
+                    continue   # 루트 자식의 실패 링크는 루트
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """모든 일치 (끝 위치 순)"""
+        goto, fail, out = self._goto, self._fail, self._out
+        matches: List[KeywordMatch] = []
+        state = 0
+        for i, ch in enumerate(text.lower()):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, keyword, value in out[state]:
+                matches.append(KeywordMatch(i + 1 - length, i + 1, keyword, value))
+        return matches
+
+    def values(self, text: str) -> List[Any]:
+        """일치한 키워드의 값 (중복 제거, 처음 나온 순서)"""
+        seen: List[Any] = []
+        for match in self.find_all(text):
+            if match.value not in seen:
+                seen.append(match.value)
+        return seen
@@ -34,6 +34,10 @@ class State(TypedDict):
     
     # === 라우팅 관련 ===
     routing_decision: Optional[str]    # router의 결정 (chat/subject_info/rag_review)
+    routing_source: Optional[str]      # 결정 주체 (classifier/llm/keyword)
+    routing_confidence: Optional[float]  # 로컬 분류기 확률
+    routing_latency_ms: Optional[float]  # 라우팅 소요시간 (ms)
+    llm_calls: Optional[int]           # 이번 턴의 LLM 호출 수 (라우팅 포함)
     current_node: Optional[str]        # 현재 처리 중인 노드
     
     # === 대화 히스토리 ===
@@ -44,7 +48,7 @@ class State(TypedDict):
     extracted_subject: Optional[str]   # 추출된 주제명
     found_subject_name: Optional[str]  # 발견된 주제명 
     info_type: Optional[str]           # 정보 유형 (subject_information/general_information)
-    data_source: Optional[str]         # 데이터 소스 (json_database/llm_general)
+    data_source: Optional[str]         # 데이터 소스 (template/json_database/llm_general)
     
     # === rag_review_node 관련 ===
     review_query: Optional[str]        # 리뷰 검색 쿼리
@@ -52,6 +56,9 @@ class State(TypedDict):
     review_summary: Optional[str]      # 리뷰 요약
     sentiment_analysis: Optional[Dict] # 감정 분석 결과
     rag_context: Optional[str]         # RAG 컨텍스트
+    context_tokens: Optional[int]      # RAG 컨텍스트 토큰 수 (추정치일 수 있음)
+    context_token_budget: Optional[int]  # 컨텍스트 토큰 예산
+    speculative_retrieval: Optional[Dict[str, Any]]  # 라우팅과 병렬로 미리 수행한 검색 결과 (router -> rag_review)
     
     # === 오류 처리 ===
     error: Optional[str]               # 일반 에러 메시지
@@ -70,6 +77,10 @@ def create_initial_state() -> State:
         user_input="",
         result="",
         routing_decision=None,
+        routing_source=None,
+        routing_confidence=None,
+        routing_latency_ms=None,
+        llm_calls=0,
         current_node="chat",
         conversation_history=[],
         detected_category=None,
@@ -82,6 +93,9 @@ def create_initial_state() -> State:
         review_summary=None,
         sentiment_analysis=None,
         rag_context=None,
+        context_tokens=None,
+        context_token_budget=None,
+        speculative_retrieval=None,
         error=None,
         router_error=None,
         timestamp=None,
@@ -118,6 +132,10 @@ def get_conversation_history(state: State, last_n: int = 5) -> List[Dict[str, An
     conversation_history = state.get("conversation_history", [])
     return conversation_history[-last_n:] if len(conversation_history) > last_n else conversation_history
 
+def count_llm_call(state: State) -> None:
+    """이번 턴의 LLM 호출 수 증가 (router가 턴 시작 시 초기화)"""
+    state["llm_calls"] = (state.get("llm_calls") or 0) + 1
+
 # --- add to state.py ---
 from time import time
 
@@ -0,0 +1,141 @@
+"""
+리뷰 대상(subjects.json) 카탈로그
+프로세스에서 1번 읽어 이름/카테고리 색인과 키워드 매처를 만들어 두고, 요청마다 디스크를 읽지 않음
+파일이 바뀌면(mtime) 다시 로드 (확인은 SUBJECT_CATALOG_CHECK_SEC 초에 한 번)
+
+환경변수:
+  SUBJECTS_PATH              subjects.json 경로 (기본 st_app/db/subject_information/subjects.json)
+  SUBJECT_CATALOG_CHECK_SEC  파일 변경 확인 주기(초) (기본 5)
+"""
+from __future__ import annotations
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from st_app.utils.keyword_matcher import KeywordMatcher
+
+DEFAULT_SUBJECTS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "db", "subject_information", "subjects.json"
+)
+
+# 카테고리별 키워드
+CATEGORY_KEYWORDS = {
+    "테마파크": ["테마파크", "놀이공원", "롯데월드", "어트랙션", "놀이기구", "어드벤처", "매직아일랜드"],
+    "관광지": ["관광지", "여행지", "명소"],
+    "레스토랑": ["레스토랑", "맛집", "음식점"],
+    "호텔": ["호텔", "숙박", "리조트"]
+}
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_name(name: str) -> str:
+    """이름 색인 키 (공백 제거 + 소문자)"""
+    return _SPACE_RE.sub("", name).lower()
+
+
+def build_subject_matcher(subjects: List[Dict]) -> KeywordMatcher:
+    """
+    주제 이름/별칭(aliases), 이름을 이루는 단어, 카테고리 키워드로 매처 생성
+    값: ("name" | "word", 주제) 또는 ("category", 카테고리)
+    """
+    entries = []
+    for subject in subjects:
+        name = subject['name']
+        entries.append((name, ("name", subject)))
+        for alias in subject.get('aliases', []):
+            entries.append((alias, ("name", subject)))
+        for word in name.split():
+            if word != name and len(word) >= 2:
+                entries.append((word, ("word", subject)))
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        entries.extend((keyword, ("category", category)) for keyword in keywords)
+    return KeywordMatcher(entries)
+
+
+def load_subjects(path: str) -> List[Dict]:
+    """subjects.json 로드 (단일 객체면 리스트로 변환)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [data] if isinstance(data, dict) else data
+
+
+class SubjectCatalog:
+    """
+    subjects: 원본 목록
+    by_name: 정규화한 이름/별칭 -> 주제
+    by_category: 카테고리 -> 주제 목록
+    matcher: 이름/별칭/카테고리 키워드 매처
+    """
+
+    def __init__(self, subjects: List[Dict], mtime: Optional[float] = None):
+        self.subjects = subjects
+        self.mtime = mtime
+        self.by_name: Dict[str, Dict] = {}
+        self.by_category: Dict[str, List[Dict]] = {}
+        for subject in subjects:
+            for name in [subject['name'], *subject.get('aliases', [])]:
+                self.by_name.setdefault(normalize_name(name), subject)
+            self.by_category.setdefault(subject.get('category'), []).append(subject)
+        self.matcher = build_subject_matcher(subjects)
+        self._memo: Dict[Tuple[str, str], Any] = {}
+        self._memo_lock = threading.Lock()
+
+    def find(self, name: str) -> Optional[Dict]:
+        return self.by_name.get(normalize_name(name))
+
+    def memo(self, kind: str, subject: Dict, compute: Callable[[], Any]) -> Any:
+        """주제별 파생 결과 캐시 (format_subject_info 출력 등) - 카탈로그가 다시 로드되면 함께 버려짐"""
+        key = (kind, subject['name'])
+        with self._memo_lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = compute()
+        with self._memo_lock:
+            self._memo[key] = value
+        return value
+
+
+# --------- 프로세스 전역 카탈로그 ---------
+_CATALOG: Optional[SubjectCatalog] = None
+_CHECKED_AT = 0.0
+_CATALOG_LOCK = threading.Lock()
+
+
+def subjects_path() -> str:
+    return os.getenv("SUBJECTS_PATH", DEFAULT_SUBJECTS_PATH)
+
+
+def get_subject_catalog() -> SubjectCatalog:
+    """
+    공용 카탈로그 (첫 호출 시 로드)
+    SUBJECT_CATALOG_CHECK_SEC마다 mtime을 확인해 바뀌었으면 다시 로드, 실패하면 기존 카탈로그 유지
+    """
+    global _CATALOG, _CHECKED_AT
+    now = time.time()
+    with _CATALOG_LOCK:
+        if _CATALOG is not None and now - _CHECKED_AT < float(os.getenv("SUBJECT_CATALOG_CHECK_SEC", 5)):
+            return _CATALOG
+        _CHECKED_AT = now
+        path = subjects_path()
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            if _CATALOG is None:
+                print(f"Warning: {path} 파일을 찾을 수 없습니다.")
+                _CATALOG = SubjectCatalog([])
+            return _CATALOG
+        if _CATALOG is None or mtime != _CATALOG.mtime:
+            try:
+                catalog = SubjectCatalog(load_subjects(path), mtime)
+                if _CATALOG is not None:
+                    print(f"Subject catalog changed on disk. Reloaded {len(catalog.subjects)} subjects")
+                _CATALOG = catalog
+            except Exception as e:
+                print(f"Error loading subject data: {e}")
+                if _CATALOG is None:
+                    _CATALOG = SubjectCatalog([])
+        return _CATALOG
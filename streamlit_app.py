@@ -1,17 +1,24 @@
 import streamlit as st
 import os
 from dotenv import load_dotenv
-from st_app.graph.router import compiled
-from st_app.rag.llm import get_upstage_llm
+from st_app.graph.router import stream_graph
+from st_app.rag.context_packer import warm_up_tokenizer
+from st_app.rag.llm import warm_up_llm
 from st_app.utils.state import State, create_initial_state
 from datetime import datetime
 
 # 환경변수 로드
 load_dotenv()
 
-# LLM 초기화
+# LLM 초기화 (클라이언트 생성 + API 연결을 프로세스당 1회만 미리 수행)
+# 컨텍스트 토큰 예산용 토크나이저도 여기서 받아 둠 (요청 경로에서는 다운로드하지 않음)
+@st.cache_resource
+def _warm_up_llm():
+    warm_up_tokenizer()
+    return warm_up_llm()
+
 try:
-    llm = get_upstage_llm(model="solar-pro2", temperature=0.2)
+    _warm_up_llm()
 except Exception as e:
     st.error(f"LLM 초기화 실패: {e}")
     st.stop()
@@ -70,14 +77,32 @@ if "chat_history" not in st.session_state:
         {"user": None, "assistant": "안녕하세요! 🎡 롯데월드 챗봇이에요.\n무엇이든 물어보세요!", "node": "chat"}
     ]
 
+# 채팅 출력
+for msg in st.session_state.chat_history:
+    if msg["user"]:  # 사용자 메시지
+        st.markdown(f'<div class="user-bubble">{msg["user"]}</div>', unsafe_allow_html=True)
+    # 챗봇 메시지
+    st.markdown(f'<div class="bot-bubble">{msg["assistant"]}</div>', unsafe_allow_html=True)
+
 # 채팅 입력
 user_input = st.chat_input("질문을 입력하세요...")
 
 if user_input:
     current_state = st.session_state.state.copy()
     current_state["user_input"] = user_input
-    with st.spinner("🤔 생각 중..."):
-        result_state = compiled.invoke(current_state)
+    st.markdown(f'<div class="user-bubble">{user_input}</div>', unsafe_allow_html=True)
+
+    # 토큰이 도착하는 대로 말풍선을 갱신하고, 실행이 끝나면 최종 상태를 저장
+    bubble = st.empty()
+    bubble.markdown('<div class="bot-bubble">🤔 생각 중...</div>', unsafe_allow_html=True)
+    result_state = current_state
+    streamed = ""
+    for kind, payload in stream_graph(current_state):
+        if kind == "token":
+            streamed += payload
+            bubble.markdown(f'<div class="bot-bubble">{streamed}▌</div>', unsafe_allow_html=True)
+        else:
+            result_state = payload
     st.session_state.state = result_state
     assistant_response = result_state.get("result", "죄송합니다. 응답을 생성할 수 없습니다.")
     st.session_state.chat_history.append({
@@ -87,10 +112,3 @@ if user_input:
         "time": datetime.now().strftime("%H:%M")
     })
     st.rerun()
-
-# 채팅 출력
-for msg in st.session_state.chat_history:
-    if msg["user"]:  # 사용자 메시지
-        st.markdown(f'<div class="user-bubble">{msg["user"]}</div>', unsafe_allow_html=True)
-    # 챗봇 메시지
-    st.markdown(f'<div class="bot-bubble">{msg["assistant"]}</div>', unsafe_allow_html=True)
\ No newline at end of file
@@ -0,0 +1,45 @@
+import numpy as np
+
+from st_app.rag.answer_cache import SemanticAnswerCache
+
+
+def unit(*values):
+    v = np.array(values, dtype="float32")
+    return v / np.linalg.norm(v)
+
+
+def test_close_query_hits_and_distant_query_misses():
+    """Only queries above the similarity threshold reuse the stored answer."""
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.put(unit(1, 0, 0), {"answer": "혼잡해요"}, version="1")
+
+    hit = cache.get(unit(1, 0.1, 0), version="1")
+    assert hit is not None and hit[0]["answer"] == "혼잡해요"
+    assert cache.get(unit(0, 1, 0), version="1") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_version_change_and_key_mismatch_invalidate():
+    """A new index version drops all entries; filter keys must match exactly."""
+    cache = SemanticAnswerCache()
+    cache.put(unit(1, 0), {"answer": "a"}, version="1", key='{"platform": ["kakaomap"]}')
+
+    assert cache.get(unit(1, 0), version="1", key="{}") is None
+    assert cache.get(unit(1, 0), version="1", key='{"platform": ["kakaomap"]}') is not None
+    assert cache.get(unit(1, 0), version="2", key='{"platform": ["kakaomap"]}') is None
+    assert len(cache) == 0
+
+
+def test_size_and_ttl_eviction():
+    """The least recently used entry is replaced when full; expired entries are ignored."""
+    cache = SemanticAnswerCache(max_size=2)
+    cache.put(unit(1, 0, 0), {"answer": "a"}, version="1")
+    cache.put(unit(0, 1, 0), {"answer": "b"}, version="1")
+    cache.get(unit(1, 0, 0), version="1")
+    cache.put(unit(0, 0, 1), {"answer": "c"}, version="1")
+
+    assert cache.get(unit(0, 1, 0), version="1") is None
+    assert cache.get(unit(1, 0, 0), version="1")[0]["answer"] == "a"
+
+    cache.ttl = -1
+    assert cache.get(unit(1, 0, 0), version="1") is None
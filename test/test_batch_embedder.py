@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from st_app.rag.batch_embedder import BatchEmbedder
+from st_app.rag.fake_embedder import FakeEmbeddings
+
+
+@pytest.fixture
+def texts():
+    return [f"review {i}" for i in range(25)]
+
+
+def test_batched_matches_single_call(texts):
+    """Batched concurrent embedding returns the same matrix as one call."""
+    fake = FakeEmbeddings(dim=16)
+    expected = np.array(fake.embed_documents(texts), dtype="float32")
+
+    result = BatchEmbedder(fake, batch_size=4, max_workers=3).embed(texts)
+
+    assert result.dtype == np.float32
+    assert np.array_equal(result, expected)
+
+
+def test_batch_retry_on_failure(texts):
+    """A failing batch is retried instead of aborting the whole run."""
+    fake = FakeEmbeddings(dim=8, fail_every=3)
+    engine = BatchEmbedder(fake, batch_size=10, max_workers=1, max_retries=2, backoff=0)
+
+    result = engine.embed(texts)
+
+    assert result.shape == (25, 8)
+    assert fake.calls == 4  # 3 batches + 1 retry
+
+
+def test_batch_gives_up_after_max_retries():
+    """Errors surface once retries are exhausted."""
+    embedder = MagicMock()
+    embedder.embed_documents.side_effect = RuntimeError("boom")
+    engine = BatchEmbedder(embedder, batch_size=2, max_workers=1, max_retries=1, backoff=0)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        engine.embed(["a", "b"])
+    assert embedder.embed_documents.call_count == 2
+
+
+def test_empty_input():
+    """Empty input yields an empty float32 matrix without calling the API."""
+    embedder = MagicMock()
+    result = BatchEmbedder(embedder).embed([])
+
+    assert result.shape[0] == 0
+    embedder.embed_documents.assert_not_called()
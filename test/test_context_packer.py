@@ -0,0 +1,59 @@
+import pytest
+
+from st_app.rag import context_packer
+from st_app.rag.context_packer import count_tokens, fit_text, pack_context
+
+
+@pytest.fixture(autouse=True)
+def estimate_only(monkeypatch):
+    """Use the character-based estimate so tests never download a tokenizer."""
+    monkeypatch.setattr(context_packer, "_TOKENIZER_LOADED", True)
+    monkeypatch.setattr(context_packer, "_TOKENIZER", None)
+    count_tokens.cache_clear()
+    yield
+    count_tokens.cache_clear()
+
+
+def test_fit_text_keeps_leading_sentences():
+    """Long reviews are cut at sentence boundaries within the budget."""
+    text = "주말에 사람이 많아요. 대기가 길어요. 그래도 재밌어요."
+
+    fitted = fit_text(text, 12)
+
+    assert fitted == "주말에 사람이 많아요. …"
+    assert count_tokens(fitted) <= 12
+    assert fit_text(text, 100) == text
+
+
+def test_pack_context_fills_budget_in_score_order():
+    """Blocks are added in order until the budget is used; totals never exceed it."""
+    blocks = [("가" * 30, "(s1)"), ("나" * 200, "(s2)"), ("다" * 10, "(s3)")]
+
+    positions, context, tokens = pack_context(blocks, budget=80)
+
+    assert positions == [0, 1]  # 두 번째 리뷰가 잘려서 남은 예산을 채움
+    assert 70 <= tokens <= 80
+    assert context.startswith("가" * 30 + "\n(s1)\n\n나")
+    assert "…" in context and "다" not in context
+
+
+def test_pack_context_without_budget_keeps_everything():
+    """No budget means the old unbounded concatenation."""
+    positions, context, _ = pack_context([("a b", "(s1)"), ("c", "(s2)")], budget=0)
+
+    assert positions == [0, 1]
+    assert context == "a b\n(s1)\n\nc\n(s2)"
+
+
+def test_request_path_never_downloads_the_tokenizer(monkeypatch):
+    """get_tokenizer only reads the local cache; warm_up_tokenizer may download and drops cached estimates."""
+    calls = []
+    monkeypatch.setattr(context_packer, "_TOKENIZER_LOADED", False)
+    monkeypatch.setattr(context_packer, "_load_tokenizer",
+                        lambda local_files_only: calls.append(local_files_only) or (None if local_files_only else "tok"))
+
+    assert context_packer.get_tokenizer() is None
+    assert count_tokens("가나다") == 3
+    assert context_packer.warm_up_tokenizer()
+    assert calls == [True, False]
+    assert context_packer.get_tokenizer() == "tok" and count_tokens.cache_info().currsize == 0
@@ -0,0 +1,321 @@
+import asyncio
+
+import pytest
+from langchain.schema import Document
+
+from st_app.rag import embedder as embedder_module
+from st_app.rag.embedder import (
+    build_faiss_index, embed_query_texts, load_faiss_index, migrate_index_metadata, read_manifest,
+    update_faiss_index,
+)
+from st_app.rag.embedding_backends import EmbedderMismatchError
+from st_app.rag.fake_embedder import FakeEmbeddings
+
+
+@pytest.fixture
+def fake_embedder(monkeypatch):
+    fake = FakeEmbeddings(dim=16)
+    monkeypatch.setenv("RAG_EMBED_CACHE", "0")
+    monkeypatch.setattr(embedder_module, "_get_upstage_embeddings", lambda: fake)
+    return fake
+
+
+def make_docs(texts, platform="kakaomap"):
+    return [
+        Document(page_content=t, metadata={"platform": platform, "date": "2025-07-01", "rating": 5})
+        for t in texts
+    ]
+
+
+def test_build_and_search(tmp_path, fake_embedder):
+    """A built index returns the exact document for its own text."""
+    docs = make_docs([f"롯데월드 리뷰 number {i}" for i in range(20)])
+    build_faiss_index(docs, str(tmp_path))
+
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+    results = vs.similarity_search_with_score("롯데월드 리뷰 number 7", k=3)
+
+    assert results[0][0].page_content == "롯데월드 리뷰 number 7"
+    assert results[0][1] == pytest.approx(1.0, abs=1e-4)
+
+
+def test_incremental_update_embeds_only_changes(tmp_path, fake_embedder):
+    """update_faiss_index embeds new reviews only and drops removed ones."""
+    old_docs = make_docs([f"review text number {i}" for i in range(10)])
+    build_faiss_index(old_docs, str(tmp_path))
+    calls_before = fake_embedder.calls
+
+    new_docs = old_docs[2:] + make_docs(["brand new review text"])
+    update_faiss_index(new_docs, str(tmp_path))
+
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+    contents = {m["content"] for m in vs.metadata}
+    assert vs.index.ntotal == len(vs.metadata) == 9
+    assert "review text number 0" not in contents
+    assert "brand new review text" in contents
+    assert fake_embedder.calls - calls_before == 1
+    assert read_manifest(str(tmp_path))["version"] == 2
+
+
+def test_update_is_noop_when_unchanged(tmp_path, fake_embedder):
+    """An unchanged review set does not rewrite the index."""
+    docs = make_docs([f"review text number {i}" for i in range(5)])
+    build_faiss_index(docs, str(tmp_path))
+
+    update_faiss_index(docs, str(tmp_path))
+
+    assert read_manifest(str(tmp_path))["version"] == 1
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "hnsw", "ivf_pq"])
+def test_ann_index_types_support_search_and_update(tmp_path, monkeypatch, fake_embedder, index_type):
+    """Every configured index type searches and updates through the same API."""
+    monkeypatch.setenv("RAG_PQ_M", "4")
+    monkeypatch.setenv("RAG_PQ_NBITS", "4")
+    docs = make_docs([f"review text number {i}" for i in range(400)])
+    build_faiss_index(docs, str(tmp_path), index_type=index_type)
+
+    update_faiss_index(docs[1:] + make_docs(["brand new review text"]), str(tmp_path))
+
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+    vs.set_search_params(nprobe=64, ef_search=128)
+    results = vs.similarity_search_with_score("brand new review text", k=5)
+    assert read_manifest(str(tmp_path))["index"]["type"] == index_type
+    assert vs.index.ntotal == len(vs.metadata) == 400
+    assert results
+    if index_type != "ivf_pq":
+        assert results[0][0].page_content == "brand new review text"
+
+
+def test_mmap_load_is_read_only(tmp_path, fake_embedder):
+    """A memory-mapped store searches normally but refuses modification."""
+    docs = make_docs([f"review text number {i}" for i in range(10)])
+    build_faiss_index(docs, str(tmp_path))
+
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False, mmap=True)
+
+    assert vs.similarity_search("review text number 3", k=1)[0].page_content == "review text number 3"
+    with pytest.raises(ValueError):
+        vs.add_documents(make_docs(["another review text"]))
+
+
+def test_repeated_query_skips_embedding_call(tmp_path, fake_embedder):
+    """The second identical question is served from the query cache."""
+    build_faiss_index(make_docs([f"review text number {i}" for i in range(5)]), str(tmp_path))
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+    vs.query_cache.clear()
+
+    vs.similarity_search("후기 요약 부탁해요", k=1)
+    calls = fake_embedder.calls
+    vs.similarity_search("후기 요약 부탁해요", k=1)
+
+    assert fake_embedder.calls == calls
+    assert vs.query_cache_stats()["hits"] >= 1
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_filtered_search_returns_k_matching_hits(tmp_path, fake_embedder, index_type):
+    """Filters are applied inside FAISS, so k hits all satisfy the filter."""
+    docs = make_docs([f"kakao review text {i}" for i in range(50)])
+    docs += make_docs([f"trip review text {i}" for i in range(5)], platform="tripdotcom")
+    build_faiss_index(docs, str(tmp_path), index_type=index_type)
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+
+    results = vs.similarity_search_with_score("kakao review text 1", k=5, filter={"platform": "tripdotcom"})
+
+    assert len(results) == 5
+    assert all(doc.metadata["platform"] == "tripdotcom" for doc, _ in results)
+    assert vs.similarity_search_with_score("x", k=5, filter={"rating": 1}) == []
+
+
+def test_hybrid_search_finds_exact_term(tmp_path, fake_embedder):
+    """BM25 side of hybrid search surfaces the review containing a rare exact term."""
+    docs = make_docs([f"review text number {i}" for i in range(30)] + ["아트란티스 대기 너무 길어요"])
+    build_faiss_index(docs, str(tmp_path))
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False, mmap=True)
+
+    assert vs.bm25 is not None
+    results = vs.hybrid_search_with_score("아트란티스 줄 어때요", k=3, fetch_k=5)
+
+    hit = next(doc for doc, _ in results if doc.page_content == "아트란티스 대기 너무 길어요")
+    assert hit.metadata["bm25_score"] > 0
+    assert hit.metadata["similarity"] is not None
+
+
+def test_batch_search_matches_single_queries(tmp_path, fake_embedder):
+    """Batched search returns the same per-query hits as one-at-a-time search."""
+    build_faiss_index(make_docs([f"review text number {i}" for i in range(20)]), str(tmp_path))
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+    queries = ["review text number 3", "review text number 7", "review text number 3"]
+
+    batched = vs.batch_similarity_search_with_score(queries, k=3)
+
+    assert len(batched) == 3
+    for query, hits in zip(queries, batched):
+        single = vs.similarity_search_with_score(query, k=3)
+        assert [d.page_content for d, _ in hits] == [d.page_content for d, _ in single]
+    assert batched[0][0][0].page_content == "review text number 3"
+    assert vs.batch_similarity_search_with_score([], k=3) == []
+
+
+def test_embed_query_texts_uses_public_embed_query_concurrently():
+    """Each query goes through the embedder's public embed_query; results keep input order."""
+    import threading
+    import time
+
+    threads = set()
+
+    class Embedder:
+        def embed_query(self, text):
+            threads.add(threading.get_ident())
+            time.sleep(0.01)
+            return [float(len(text))]
+
+        async def aembed_query(self, text):
+            return [float(len(text))]
+
+    texts = ["a", "bb", "ccc", "dddd"]
+
+    assert embed_query_texts(texts, Embedder()) == [[1.0], [2.0], [3.0], [4.0]]
+    assert len(threads) > 1
+    assert asyncio.run(embedder_module.aembed_query_texts(texts, Embedder())) == [[1.0], [2.0], [3.0], [4.0]]
+
+
+def test_near_duplicates_collapse_at_query_time(tmp_path, fake_embedder):
+    """Reviews clustered at build time collapse to one hit per cluster."""
+    reviews = [{"content": "주말에는 사람이 너무 많아서 놀이기구 대기가 길어요", "platform": "kakaomap"},
+               {"content": "주말에는 사람이 너무 많아서 놀이기구 대기가 길어요!!", "platform": "myrealtrip"},
+               {"content": "야간 퍼레이드가 정말 예쁘고 아이들이 좋아했습니다", "platform": "kakaomap"}]
+    docs = embedder_module.create_documents_from_reviews(reviews)
+    assert docs[0].metadata["dup_cluster"] == docs[1].metadata["dup_cluster"] != docs[2].metadata["dup_cluster"]
+
+    build_faiss_index(docs, str(tmp_path))
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+    hits = vs.search_hits("주말 대기", k=3)
+
+    assert len(hits) == 3
+    assert len(hits.collapse_duplicates()) == 2
+
+
+def test_max_marginal_relevance_search(tmp_path, fake_embedder):
+    """MMR search returns k distinct documents starting with the best match."""
+    build_faiss_index(make_docs([f"review text number {i}" for i in range(20)]), str(tmp_path))
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False, mmap=True)
+
+    docs = vs.max_marginal_relevance_search("review text number 4", k=4, fetch_k=10, lambda_mult=0.5)
+
+    assert len(docs) == 4
+    assert docs[0].page_content == "review text number 4"
+    assert len({d.page_content for d in docs}) == 4
+
+
+def test_fake_backend_builds_offline_and_mismatch_fails_fast(tmp_path, monkeypatch):
+    """The manifest records the embedding backend; loading under another backend raises."""
+    monkeypatch.setenv("RAG_EMBED_CACHE", "0")
+    monkeypatch.setenv("RAG_EMBED_BACKEND", "fake")
+    monkeypatch.setenv("RAG_FAKE_EMBED_DIM", "8")
+    build_faiss_index(make_docs([f"review text number {i}" for i in range(5)]), str(tmp_path))
+
+    manifest = read_manifest(str(tmp_path))
+    assert (manifest["embed_backend"], manifest["embed_model"], manifest["dimension"]) == ("fake", "fake-8", 8)
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+    assert vs.similarity_search("review text number 2", k=1)[0].page_content == "review text number 2"
+
+    monkeypatch.setenv("RAG_EMBED_BACKEND", "local")
+    with pytest.raises(EmbedderMismatchError):
+        load_faiss_index(str(tmp_path), create_if_missing=False)
+
+
+def test_store_version_tracks_saves_and_changes(tmp_path, fake_embedder):
+    """The store version follows the manifest and changes after in-memory edits."""
+    build_faiss_index(make_docs([f"review text number {i}" for i in range(5)]), str(tmp_path))
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+    loaded = vs.version
+
+    assert loaded == str(read_manifest(str(tmp_path))["version"])
+    vs.add_documents(make_docs(["brand new review text"]))
+    assert vs.version != loaded
+    vs.save()
+    assert vs.version == str(read_manifest(str(tmp_path))["version"]) != loaded
+
+
+def test_saves_switch_versioned_data_dirs_via_manifest(tmp_path, fake_embedder):
+    """Each save writes a new data dir; readers follow the manifest, never a half-written dir."""
+    docs = make_docs([f"review text number {i}" for i in range(6)])
+    build_faiss_index(docs, str(tmp_path))
+    update_faiss_index(docs[1:], str(tmp_path))
+
+    assert read_manifest(str(tmp_path))["data_dir"] == "data-2"
+    assert (tmp_path / "data-1").exists() and not (tmp_path / "index.faiss").exists()
+
+    (tmp_path / "data-3").mkdir()   # an unfinished save that never switched the manifest
+    (tmp_path / "data-3" / "index.faiss").write_bytes(b"partial")
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+    assert vs.index.ntotal == len(vs.metadata) == 5
+
+    update_faiss_index(docs[2:], str(tmp_path))
+    assert sorted(p.name for p in tmp_path.glob("data-*")) == ["data-2", "data-3"]
+    assert load_faiss_index(str(tmp_path), create_if_missing=False).index.ntotal == 4
+
+
+def test_legacy_meta_json_loads_without_writing(tmp_path, fake_embedder):
+    """Loading a legacy meta.json layout never writes; the migration step converts it once."""
+    import json
+    import shutil
+
+    build_faiss_index(make_docs([f"review text number {i}" for i in range(5)]), str(tmp_path))
+    records = load_faiss_index(str(tmp_path), create_if_missing=False).metadata.to_records()
+    shutil.move(str(tmp_path / "data-1" / "index.faiss"), str(tmp_path / "index.faiss"))
+    shutil.rmtree(tmp_path / "data-1")
+    (tmp_path / "meta.json").write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    manifest = read_manifest(str(tmp_path))
+    del manifest["data_dir"]
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False, mmap=True)
+    assert len(vs.metadata) == 5 and not (tmp_path / "meta").exists()
+
+    assert migrate_index_metadata(str(tmp_path)) and not migrate_index_metadata(str(tmp_path))
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False, mmap=True)
+    assert (tmp_path / "meta").exists() and vs.metadata.to_records() == records
+
+
+@pytest.mark.parametrize("num_docs", [10, 100])
+def test_ivf_pq_builds_on_small_corpora(tmp_path, monkeypatch, fake_embedder, num_docs):
+    """PQ bits shrink (or IVF-Flat is used) when there are fewer than 2^nbits training vectors."""
+    monkeypatch.setenv("RAG_PQ_M", "4")
+    docs = make_docs([f"review text number {i}" for i in range(num_docs)])
+    build_faiss_index(docs, str(tmp_path), index_type="ivf_pq")
+
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+    assert vs.index.ntotal == num_docs
+    assert vs.similarity_search_with_score("review text number 3", k=3)
+
+
+def test_ivf_indexes_get_default_nprobe_overridable_by_env(tmp_path, monkeypatch, fake_embedder):
+    """IVF search scans more than one list by default; RAG_NPROBE overrides the default."""
+    import faiss
+    from st_app.rag.index_factory import default_nprobe
+
+    build_faiss_index(make_docs([f"review text number {i}" for i in range(800)]), str(tmp_path), index_type="ivf_flat")
+    ivf = faiss.extract_index_ivf(load_faiss_index(str(tmp_path), create_if_missing=False).index)
+    assert ivf.nprobe == default_nprobe(ivf.nlist) > 1
+
+    monkeypatch.setenv("RAG_NPROBE", "3")
+    assert faiss.extract_index_ivf(load_faiss_index(str(tmp_path), create_if_missing=False).index).nprobe == 3
+
+
+def test_selective_filter_on_ivf_returns_enough_hits(tmp_path, monkeypatch, fake_embedder):
+    """Filtered IVF search widens nprobe until min(k, n_matching) hits are found."""
+    monkeypatch.setenv("RAG_NPROBE", "1")
+    docs = make_docs([f"review text number {i}" for i in range(800)])
+    for doc in docs[::130]:
+        doc.metadata["rating"] = 1
+    build_faiss_index(docs, str(tmp_path), index_type="ivf_flat")
+    vs = load_faiss_index(str(tmp_path), create_if_missing=False)
+
+    n_matching = len(docs[::130])
+    for k in (5, 10):
+        results = vs.similarity_search_with_score("review text number 3", k=k, filter={"rating": 1})
+        assert len(results) == min(k, n_matching)
+        assert all(doc.metadata["rating"] == 1 for doc, _ in results)
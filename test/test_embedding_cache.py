@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from st_app.rag.embedding_cache import EmbeddingCache, embed_with_cache, text_hash
+from st_app.rag.fake_embedder import FakeEmbeddings
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = EmbeddingCache(str(tmp_path / "cache.sqlite"), max_entries=10)
+    yield c
+    c.close()
+
+
+def test_text_hash_normalizes_whitespace():
+    """Whitespace-only differences map to the same key."""
+    assert text_hash("  주말  혼잡\n해요 ") == text_hash("주말 혼잡 해요")
+
+
+def test_roundtrip_is_keyed_by_model(cache):
+    """Vectors are stored per (text, model) pair."""
+    vecs = np.arange(6, dtype="float32").reshape(2, 3)
+    cache.put_many(["a", "b"], vecs, model="m1")
+
+    hits = cache.get_many(["b", "c", "a"], model="m1")
+
+    assert sorted(hits) == [0, 2]
+    assert np.array_equal(hits[0], vecs[1])
+    assert cache.get_many(["a"], model="m2") == {}
+
+
+def test_eviction_keeps_size_bounded(cache):
+    """Oldest entries are evicted once max_entries is exceeded."""
+    texts = [f"t{i}" for i in range(15)]
+    cache.put_many(texts, np.ones((15, 2), dtype="float32"), model="m")
+
+    assert len(cache) <= 10
+
+
+def test_embed_with_cache_only_embeds_misses(cache):
+    """Only uncached texts are sent to the embedder."""
+    fake = FakeEmbeddings(dim=4)
+    embed_fn = lambda ts: np.array(fake.embed_documents(ts), dtype="float32")
+    first = embed_with_cache(["a", "b"], embed_fn, "fake", cache)
+
+    calls = []
+    def tracking_fn(ts):
+        calls.append(list(ts))
+        return embed_fn(ts)
+    second = embed_with_cache(["b", "c", "a"], tracking_fn, "fake", cache)
+
+    assert calls == [["c"]]
+    assert np.array_equal(second[0], first[1])
+    assert np.array_equal(second[2], first[0])
+
+
+def test_fake_embedders_of_different_dims_do_not_share_cache(tmp_path, monkeypatch):
+    """The cache key includes the fake dimension, and wrong-sized cached vectors are misses."""
+    from st_app.rag import embedding_cache
+    from st_app.rag.embedder import create_embeddings
+
+    monkeypatch.setenv("RAG_EMBED_CACHE_PATH", str(tmp_path / "dims.sqlite"))
+    monkeypatch.setattr(embedding_cache, "_CACHES", {})
+
+    assert create_embeddings(["롯데월드"], embedder=FakeEmbeddings(dim=8)).shape == (1, 8)
+    assert create_embeddings(["롯데월드"], embedder=FakeEmbeddings(dim=16)).shape == (1, 16)
+
+
+def test_cached_vectors_with_wrong_dim_are_reembedded(cache):
+    """A stale vector stored under the same model name is treated as a miss."""
+    cache.put_many(["a"], np.ones((1, 3), dtype="float32"), model="m")
+    embed_fn = lambda ts: np.zeros((len(ts), 5), dtype="float32")
+
+    assert embed_with_cache(["a"], embed_fn, "m", cache, dim=5).shape == (1, 5)
+    assert embed_with_cache(["b"], embed_fn, "m", cache).shape == (1, 5)
+    cache.put_many(["c"], np.ones((1, 3), dtype="float32"), model="m")
+    assert embed_with_cache(["a", "c"], embed_fn, "m", cache).shape == (2, 5)
@@ -0,0 +1,65 @@
+import json
+import time
+
+import numpy as np
+
+from st_app.graph.intent_classifier import IntentClassifier, load_routing_log, log_routing_decision, seed_examples
+
+
+def test_seed_classifier_routes_clear_questions():
+    """The keyword-seeded model separates the three intents with high confidence."""
+    clf = IntentClassifier().fit(seed_examples())
+
+    assert clf.predict("롯데월드 후기 어때?")[0] == "rag_review"
+    assert clf.predict("티켓 가격 알려줘")[0] == "subject_info"
+    intent, confidence = clf.predict("안녕하세요")
+    assert intent == "chat" and confidence > 0.7
+
+
+def test_logged_decisions_become_training_data(tmp_path, monkeypatch):
+    """LLM routing decisions appended to the log teach the classifier new phrasings."""
+    path = str(tmp_path / "routing_log.jsonl")
+    monkeypatch.setenv("ROUTER_LOG_PATH", path)
+    for _ in range(5):
+        log_routing_decision("자이로드롭 무서워요?", "rag_review")
+    log_routing_decision("ignored", "unknown_label")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+
+    examples = load_routing_log()
+    assert examples == [("자이로드롭 무서워요?", "rag_review")] * 5
+    clf = IntentClassifier().fit(seed_examples() + examples)
+    assert clf.predict("자이로드롭 무서워요?")[0] == "rag_review"
+    assert json.loads(open(path, encoding="utf-8").readline())["intent"] == "rag_review"
+
+
+def test_routing_log_is_opt_in_and_capped_per_intent(tmp_path, monkeypatch):
+    """Nothing is written without ROUTER_LOG_PATH; training keeps only the newest entries per intent."""
+    monkeypatch.delenv("ROUTER_LOG_PATH", raising=False)
+    monkeypatch.chdir(tmp_path)
+    log_routing_decision("주말 후기 알려줘", "rag_review")
+    assert list(tmp_path.iterdir()) == [] and load_routing_log() == []
+
+    path = str(tmp_path / "routing_log.jsonl")
+    monkeypatch.setenv("ROUTER_LOG_PATH", path)
+    for i in range(5):
+        log_routing_decision(f"후기 {i}", "rag_review")
+        log_routing_decision(f"안녕 {i}", "chat")
+
+    assert load_routing_log(max_per_intent=2) == [("후기 3", "rag_review"), ("안녕 3", "chat"),
+                                                  ("후기 4", "rag_review"), ("안녕 4", "chat")]
+
+
+def test_numpy_prediction_matches_sklearn_and_meets_latency_budget():
+    """The cached-weight prediction equals sklearn's predict_proba and stays under 1 ms."""
+    clf = IntentClassifier().fit(seed_examples())
+    for text in ["롯데월드 후기 어때?", "티켓 가격 알려줘", "안녕하세요", "xyz", ""]:
+        expected = clf.model.predict_proba(clf.vectorizer.transform([text]))[0][clf._columns]
+        assert np.allclose(clf.predict_proba(text), expected)
+
+    timings = []
+    for _ in range(200):
+        t0 = time.perf_counter()
+        clf.predict("롯데월드 주말 후기 어때요?")
+        timings.append(time.perf_counter() - t0)
+    assert np.median(timings) < 1e-3
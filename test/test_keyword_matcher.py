@@ -0,0 +1,59 @@
+import re
+
+from st_app.graph.nodes.subject_info_node import SubjectInfoProcessor, build_subject_matcher
+from st_app.graph.router import _keyword_route
+from st_app.utils.keyword_matcher import KeywordMatcher
+
+
+def test_matcher_returns_overlapping_matches_in_one_pass():
+    """All keywords are found, including overlapping ones, case-insensitively."""
+    matcher = KeywordMatcher([(k, k.upper()) for k in ["he", "she", "his", "hers", "롯데", "롯데월드"]])
+
+    found = [(m.start, m.keyword, m.value) for m in matcher.find_all("uSHErs 롯데월드")]
+
+    assert found == [(1, "she", "SHE"), (2, "he", "HE"), (2, "hers", "HERS"), (7, "롯데", "롯데"),
+                     (7, "롯데월드", "롯데월드")]
+    assert matcher.values("hishers") == ["HIS", "SHE", "HE", "HERS"]
+
+
+def test_subject_detection_prefers_names_over_category_keywords():
+    """Names and aliases beat category keywords; the longest name wins."""
+    processor = SubjectInfoProcessor()
+    processor.subject_data = [
+        {"name": "롯데월드", "category": "테마파크"},
+        {"name": "롯데월드 아쿠아리움", "category": "관광지", "aliases": ["아쿠아리움"]},
+        {"name": "시그니엘", "category": "호텔"},
+    ]
+
+    assert processor.detect_category_and_subject("롯데월드 아쿠아리움 가격")[1]["name"] == "롯데월드 아쿠아리움"
+    assert processor.detect_category_and_subject("아쿠아리움 몇 시에 열어?")[0] == "관광지"
+    assert processor.detect_category_and_subject("롯데월드 운영시간")[1]["name"] == "롯데월드"
+    assert processor.detect_category_and_subject("근처 숙박 알려줘") == ("호텔", processor.subject_data[2])
+    assert processor.detect_category_and_subject("오늘 뭐 먹지") == ("general", None)
+    assert len(build_subject_matcher(processor.subject_data)) > len(processor.subject_data)
+
+
+def test_extract_subject_name_matches_sequential_patterns():
+    """The combined regex gives the same result as trying the 8 patterns in order."""
+    patterns = [r'(.+?)에 대해', r'(.+?)에 대한', r'(.+?) 정보', r'(.+?) 알려', r'(.+?)는', r'(.+?)이',
+                r'(.+?) 설명', r'(.+?) 소개']
+
+    def sequential(text):
+        for pattern in patterns:
+            match = re.search(pattern, text)
+            if match:
+                return match.group(1).strip()
+        return None
+
+    processor = SubjectInfoProcessor()
+    for text in ["롯데월드에 대해 알려줘", "롯데월드는 티켓 정보 알려줘", "자이로드롭이 뭐야", "아쿠아리움 소개",
+                 "매직아일랜드 설명해줘", "롯데월드 티켓 가격이 얼마인가요"]:
+        assert processor.extract_subject_name(text) == sequential(text)
+    assert processor.extract_subject_name("롯데월드 줘") == "롯데월드"
+
+
+def test_keyword_route_prefers_reviews():
+    """Fallback routing checks review keywords before info keywords."""
+    assert _keyword_route("티켓 가격 후기") == "rag_review"
+    assert _keyword_route("티켓 가격") == "subject_info"
+    assert _keyword_route("안녕") == "chat"
@@ -0,0 +1,95 @@
+import asyncio
+import http.server
+import threading
+
+import pytest
+
+from st_app.rag import llm
+
+
+@pytest.fixture
+def fresh_registry(monkeypatch):
+    monkeypatch.setenv("UPSTAGE_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "_LLM_CLIENTS", {})
+    monkeypatch.setattr(llm, "_LOOP_LLM_CLIENTS", llm.weakref.WeakKeyDictionary())
+    monkeypatch.setattr(llm, "_HTTP_ASYNC_CLIENTS", llm.weakref.WeakKeyDictionary())
+    monkeypatch.setattr(llm, "_API_KEY", None)
+    monkeypatch.setattr(llm, "_STATS", dict.fromkeys(llm._STATS, 0))
+
+
+@pytest.fixture
+def local_server():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+
+
+def test_same_config_returns_cached_client(fresh_registry):
+    """Clients are keyed by (model, temperature, max_tokens) and share one HTTP pool."""
+    a = llm.get_upstage_llm(temperature=0.2)
+    b = llm.get_upstage_llm(temperature=0.2)
+    c = llm.get_upstage_llm(temperature=0.6)
+
+    assert a is b and a is not c
+    assert a.http_client is c.http_client
+    stats = llm.llm_client_stats()
+    assert stats["clients_created"] == 2 and stats["client_reuses"] == 1
+
+
+def test_pooled_connections_are_reused(fresh_registry, local_server):
+    """Repeated requests through the shared client open a single TCP connection."""
+    client = llm._get_http_client()
+    for _ in range(3):
+        client.get(local_server)
+
+    stats = llm.llm_client_stats()
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+
+
+def test_async_client_is_scoped_to_event_loop(fresh_registry, local_server):
+    """Each asyncio.run gets its own AsyncClient; a closed loop's pooled connections are not reused."""
+    async def fetch():
+        a = llm.get_upstage_llm(temperature=0.2)
+        b = llm.get_upstage_llm(temperature=0.2)
+        response = await a.http_async_client.get(local_server)
+        return a, b, response.status_code
+
+    first, first_again, status1 = asyncio.run(fetch())
+    second, _, status2 = asyncio.run(fetch())
+
+    assert status1 == status2 == 200
+    assert first is first_again and first is not second
+    assert first.http_async_client is not second.http_async_client
+    assert first.http_client is second.http_client is llm.get_upstage_llm(temperature=0.2).http_client
+    assert llm.llm_client_stats()["cached_clients"] == 1
+
+
+def test_stats_counters_do_not_lose_concurrent_updates(fresh_registry):
+    """Request counters updated from many threads add up exactly."""
+    import httpx
+
+    def hit():
+        for _ in range(2000):
+            llm._on_request(httpx.Request("GET", "http://localhost"))
+
+    threads = [threading.Thread(target=hit) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert llm.llm_client_stats()["requests"] == 16000
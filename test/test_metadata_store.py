@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pytest
+
+from st_app.rag.metadata_store import ColumnarMetadata, has_columnar_metadata, migrate_meta_json
+
+
+@pytest.fixture
+def records():
+    return [
+        {"id": 10, "content": "주말엔 혼잡해요", "platform": "kakaomap", "subject": "롯데월드",
+         "place": "롯데월드", "date": "2025-07-11", "rating": 5, "url": ""},
+        {"id": 20, "content": "직원 불친절", "platform": "myrealtrip", "subject": "롯데월드",
+         "place": "롯데월드", "date": "2025-07-10", "rating": None, "url": "http://x"},
+        {"id": 30, "content": "", "platform": "kakaomap", "subject": "롯데월드",
+         "place": "롯데월드", "date": None, "rating": 3.5, "url": ""},
+    ]
+
+
+def test_roundtrip_through_disk(tmp_path, records):
+    """Saved columns load back (memory-mapped) as the original records."""
+    ColumnarMetadata.from_records(records).save(str(tmp_path))
+
+    loaded = ColumnarMetadata.load(str(tmp_path), mmap=True)
+
+    assert len(loaded) == 3
+    assert loaded.to_records() == records
+    assert loaded[-1]["rating"] == 3.5
+
+
+def test_take_and_extend(records):
+    """take drops rows and extend appends while keeping vocabularies consistent."""
+    meta = ColumnarMetadata.from_records(records[:2])
+
+    meta = meta.take(np.array([1])).extend([records[2], {**records[0], "platform": "tripdotcom"}])
+
+    assert [m["id"] for m in meta] == [20, 30, 10]
+    assert [m["platform"] for m in meta] == ["myrealtrip", "kakaomap", "tripdotcom"]
+    assert meta[1]["content"] == ""
+
+
+def test_migrate_meta_json(tmp_path, records):
+    """A legacy meta.json is converted once and kept as a backup."""
+    (tmp_path / "meta.json").write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+
+    meta = migrate_meta_json(str(tmp_path))
+
+    assert has_columnar_metadata(str(tmp_path))
+    assert (tmp_path / "meta.json.migrated").exists()
+    assert meta.to_records() == records
+
+
+def test_migrate_meta_json_tolerates_a_concurrent_winner(tmp_path, records, monkeypatch):
+    """A process that loses the publish race loads the winner's meta/ instead of failing."""
+    (tmp_path / "meta.json").write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    original_save = ColumnarMetadata.save
+
+    def save_then_lose_race(self, path):
+        original_save(self, path)
+        original_save(ColumnarMetadata.from_records(records), str(tmp_path))   # another worker publishes first
+        (tmp_path / "meta.json").rename(tmp_path / "meta.json.migrated")
+
+    monkeypatch.setattr(ColumnarMetadata, "save", save_then_lose_race)
+    meta = migrate_meta_json(str(tmp_path), mmap=False)
+
+    assert meta.to_records() == records
+    assert not isinstance(meta.arrays["id"], np.memmap)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["meta", "meta.json.migrated"]
+
+
+def test_filter_mask(records):
+    """Value, list and range conditions are ANDed across fields."""
+    meta = ColumnarMetadata.from_records(records)
+
+    assert meta.filter_mask({"platform": "kakaomap"}).tolist() == [True, False, True]
+    assert meta.filter_mask({"rating": {"min": 3, "max": 4}}).tolist() == [False, False, True]
+    assert meta.filter_mask({"date": {"min": "2025-07-11"}}).tolist() == [True, False, False]
+    assert meta.filter_mask({"platform": ["kakaomap", "myrealtrip"], "rating": 5}).tolist() == [True, False, False]
@@ -0,0 +1,29 @@
+import numpy as np
+from langchain_community.vectorstores.utils import maximal_marginal_relevance as lc_mmr
+
+from st_app.rag.mmr import maximal_marginal_relevance
+
+
+def normalized(x):
+    return x / np.linalg.norm(x, axis=-1, keepdims=True)
+
+
+def test_mmr_skips_near_duplicate_candidate():
+    """With diversity weight, a near copy of the top hit loses to a different relevant one."""
+    query = normalized(np.array([1.0, 0.0, 0.0]))
+    candidates = normalized(np.array([[1.0, 0.1, 0.0], [1.0, 0.11, 0.0], [0.7, 0.0, 0.7]]))
+
+    assert maximal_marginal_relevance(query, candidates, k=2, lambda_mult=1.0).tolist() == [0, 1]
+    assert maximal_marginal_relevance(query, candidates, k=2, lambda_mult=0.5).tolist() == [0, 2]
+
+
+def test_mmr_matches_langchain_order():
+    """Selection order agrees with LangChain's reference implementation."""
+    rng = np.random.default_rng(0)
+    query = normalized(rng.standard_normal(32))
+    candidates = normalized(rng.standard_normal((50, 32)))
+
+    ours = maximal_marginal_relevance(query, candidates, k=5, lambda_mult=0.5)
+
+    assert ours.tolist() == list(lc_mmr(query, candidates, lambda_mult=0.5, k=5))
+    assert len(maximal_marginal_relevance(query, candidates[:0], k=5)) == 0
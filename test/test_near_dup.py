@@ -0,0 +1,26 @@
+import numpy as np
+
+from st_app.rag.near_dup import cluster_near_duplicates, minhash
+
+
+def test_minhash_agreement_tracks_similarity():
+    """Signatures of near-identical texts agree far more than unrelated ones."""
+    a = minhash("롯데월드 주말에는 사람이 너무 많아서 놀이기구 대기가 길어요")
+    b = minhash("롯데월드 주말에는 사람이 너무 많아서 놀이기구 대기가 길어요!")
+    c = minhash("야간 퍼레이드가 정말 예쁘고 아이들이 좋아했습니다")
+
+    assert np.mean(a == b) == 1.0  # 기호는 shingle에서 제외
+    assert np.mean(a == c) < 0.2
+
+
+def test_cluster_near_duplicates_groups_copies():
+    """Near copies share the first occurrence as cluster id; distinct texts stay alone."""
+    texts = [
+        "롯데월드 주말에는 사람이 너무 많아서 놀이기구 대기가 길어요",
+        "야간 퍼레이드가 정말 예쁘고 아이들이 좋아했습니다",
+        "롯데월드 주말에는 사람이 너무 많아서  놀이기구 대기가 길어요 진짜",
+        "야간 퍼레이드가 정말 예쁘고 아이들이 좋아했습니다",
+    ]
+
+    assert cluster_near_duplicates(texts).tolist() == [0, 1, 0, 1]
+    assert cluster_near_duplicates([]).tolist() == []
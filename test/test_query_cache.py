@@ -0,0 +1,57 @@
+import numpy as np
+
+from st_app.rag.embedding_cache import EmbeddingCache
+from st_app.rag.query_cache import QueryEmbeddingCache
+
+
+def test_hit_after_put_with_normalized_key():
+    """Queries differing only in whitespace/case share one entry."""
+    cache = QueryEmbeddingCache(max_size=4)
+    cache.put("주말  혼잡해요?", "m", np.ones(3))
+
+    assert cache.get(" 주말 혼잡해요? ", "m") is not None
+    assert cache.get("주말 혼잡해요?", "other-model") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    """The least recently used query is evicted first."""
+    cache = QueryEmbeddingCache(max_size=2)
+    cache.put("a", "m", np.ones(2))
+    cache.put("b", "m", np.ones(2))
+    cache.get("a", "m")
+    cache.put("c", "m", np.ones(2))
+
+    assert cache.get("b", "m") is None
+    assert cache.get("a", "m") is not None
+
+
+def test_ttl_expiry():
+    """Entries older than the TTL are treated as misses."""
+    cache = QueryEmbeddingCache(max_size=2, ttl=-1)
+    cache.put("a", "m", np.ones(2))
+
+    assert cache.get("a", "m") is None
+
+
+def test_disk_cache_shared_between_instances(tmp_path):
+    """A second process-local cache is warmed from the shared disk store."""
+    disk = EmbeddingCache(str(tmp_path / "q.sqlite"))
+    QueryEmbeddingCache(disk_cache=disk).put("후기 요약", "m", np.arange(3))
+
+    other = QueryEmbeddingCache(disk_cache=disk)
+    vec = other.get("후기 요약", "m", dim=3)
+
+    assert np.array_equal(vec, np.arange(3, dtype="float32"))
+    assert other.stats()["disk_hits"] == 1
+
+
+def test_disk_cache_respects_ttl_and_dimension(tmp_path):
+    """Old disk entries expire, and vectors of another dimension are not returned."""
+    disk = EmbeddingCache(str(tmp_path / "q.sqlite"))
+    QueryEmbeddingCache(disk_cache=disk).put("후기 요약", "m", np.ones(3))
+
+    assert QueryEmbeddingCache(disk_cache=disk).get("후기 요약", "m", dim=4) is None
+    assert QueryEmbeddingCache(disk_cache=disk, ttl=-1).get("후기 요약", "m", dim=3) is None
+    assert QueryEmbeddingCache(disk_cache=disk).get("후기 요약", "m", dim=3) is not None
@@ -0,0 +1,90 @@
+import threading
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+
+from st_app.graph.nodes import rag_review_node
+from st_app.graph.nodes.rag_review_node import _detect_filters, _filter_by_threshold, _format_context, _to_document_hits
+from st_app.rag.metadata_store import ColumnarMetadata
+from st_app.rag.search_hits import SearchHits
+
+
+def test_detect_filters_platform():
+    """Platform names in the question become a platform filter."""
+    assert _detect_filters("카카오맵 후기만 보여줘") == {"platform": ["kakaomap"]}
+
+
+def test_detect_filters_rating_and_recent_period():
+    """Star ratings and 'recent N years' map to rating/date filters."""
+    filters = _detect_filters("최근 1년 1점 리뷰", today=date(2025, 7, 1))
+
+    assert filters == {"rating": [1], "date": {"min": "2024-07-01"}}
+
+
+def test_detect_filters_plain_question():
+    """Questions without conditions produce no filter."""
+    assert _detect_filters("주말에 혼잡한가요?") == {}
+
+
+def make_hits():
+    metadata = ColumnarMetadata.from_records([
+        {"id": 1, "content": "주말엔 혼잡해요", "platform": "kakaomap", "date": "2025-07-01", "rating": 5},
+        {"id": 2, "content": "아트란티스 최고", "platform": "tripdotcom", "date": "2025-06-01", "rating": 4},
+        {"id": 3, "content": "별로였어요", "platform": "myrealtrip", "date": "2025-05-01", "rating": 1},
+    ])
+    return SearchHits(metadata, np.array([1, 0, 2]), np.array([0.9, 0.5, 0.2]))
+
+
+def test_hits_flow_to_context_and_state():
+    """SearchHits feed the prompt context and state records without Documents."""
+    hits = _filter_by_threshold(make_hits(), threshold=0.4)
+
+    assert hits.rows.tolist() == [1, 0]
+    assert _format_context(hits).startswith("아트란티스 최고\n(source: review|2025-06-01|rating=4|tripdotcom")
+    records = _to_document_hits(hits)
+    assert records[0]["platform"] == "tripdotcom"
+    assert records[1]["source_row"] == 0
+    assert records[0]["score"] == np.float32(0.9)
+
+
+def test_hits_convert_to_documents_lazily():
+    """to_pairs keeps the legacy (Document, score) shape and metadata."""
+    doc, score = make_hits().to_pairs()[0]
+
+    assert doc.page_content == "아트란티스 최고"
+    assert doc.metadata["rating"] == 4 and doc.metadata["source_row"] == 1
+    assert score == np.float32(0.9)
+
+
+def test_ensure_vs_loads_once_under_concurrency(monkeypatch):
+    """Concurrent callers share one load, and a version change swaps the store once."""
+    loads = []
+    disk = {"version": 1}
+
+    def slow_load(path, mmap=False):
+        loads.append(disk["version"])
+        time.sleep(0.05)
+        return SimpleNamespace(manifest_version=disk["version"])
+
+    monkeypatch.setattr(rag_review_node, "_VS", None)
+    monkeypatch.setattr(rag_review_node, "load_faiss_index", slow_load)
+    monkeypatch.setattr(rag_review_node, "read_manifest", lambda path: dict(disk))
+    monkeypatch.setenv("RAG_INDEX_VERSION_CHECK_SEC", "0")
+
+    def call_many():
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(rag_review_node._ensure_vs())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    first = call_many()
+    disk["version"] = 2
+    second = call_many()
+
+    assert loads == [1, 2]
+    assert all(vs is first[0] for vs in first) and {vs.manifest_version for vs in second} == {2}
@@ -0,0 +1,46 @@
+import numpy as np
+
+from st_app.rag.metadata_store import ColumnarMetadata
+from st_app.rag.reranker import CrossEncoderReranker
+from st_app.rag.search_hits import SearchHits
+
+
+class CountingModel:
+    """Scores a pair by how many query characters appear in the review."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, pairs, batch_size=32):
+        self.batches.append(len(pairs))
+        return np.array([sum(ch in text for ch in set(query)) for query, text in pairs], dtype="float32")
+
+
+def make_hits():
+    metadata = ColumnarMetadata.from_records([
+        {"id": 11, "content": "퍼레이드 예뻐요"},
+        {"id": 12, "content": "아트란티스 대기 길어요"},
+        {"id": 13, "content": "주차 불편"},
+    ])
+    return SearchHits(metadata, np.array([0, 1, 2]), np.array([0.9, 0.8, 0.7]))
+
+
+def test_rerank_orders_by_cross_encoder_in_one_batch():
+    """All candidate pairs are scored in a single predict call and reordered."""
+    model = CountingModel()
+    reranked, stats = CrossEncoderReranker(model=model).rerank("아트란티스 대기", make_hits())
+
+    assert reranked.ids.tolist()[0] == 12
+    assert model.batches == [3]
+    assert stats["scored"] == 3 and stats["latency_ms"] >= 0
+
+
+def test_rerank_scores_are_cached_per_query_and_doc():
+    """Repeating a query reuses cached pair scores without calling the model."""
+    model = CountingModel()
+    reranker = CrossEncoderReranker(model=model)
+    reranker.rerank("아트란티스 대기", make_hits())
+    _, stats = reranker.rerank("아트란티스  대기", make_hits())
+
+    assert model.batches == [3]
+    assert stats["cached"] == 3
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from langchain.schema import Document
+from langchain_core.messages import AIMessage
+
+from st_app.graph import router
+from st_app.graph.intent_classifier import load_routing_log
+from st_app.graph.nodes import chat_node, rag_review_node
+from st_app.rag.llm import MockLLM, stream_llm_text
+from st_app.rag.embedder import build_faiss_index
+from st_app.utils.state import create_initial_state
+
+
+def make_state(text):
+    state = create_initial_state()
+    state["user_input"] = text
+    return state
+
+
+@pytest.fixture
+def offline_index(tmp_path, monkeypatch):
+    for key, value in {
+        "LLM_MOCK": "1", "RAG_EMBED_BACKEND": "fake", "RAG_FAKE_EMBED_DIM": "16", "RAG_EMBED_CACHE": "0",
+        "RAG_ANSWER_CACHE": "0", "RAG_FAISS_DIR": str(tmp_path / "index"),
+        "ROUTER_LOG_PATH": str(tmp_path / "routing_log.jsonl"),
+    }.items():
+        monkeypatch.setenv(key, value)
+    monkeypatch.setattr(rag_review_node, "_VS", None)
+    build_faiss_index([
+        Document(page_content=f"롯데월드 후기 {i} 주말엔 혼잡해요", metadata={"platform": "kakaomap", "rating": 5})
+        for i in range(10)
+    ], str(tmp_path / "index"))
+
+
+class JsonIntentLLM:
+    def __init__(self, intent="rag_review"):
+        self.intent = intent
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content=f'{{"intent": "{self.intent}"}}')
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+def test_ainvoke_serves_concurrent_sessions_offline(offline_index):
+    """compiled.ainvoke runs the async router and nodes for several sessions at once."""
+    async def run():
+        return await asyncio.gather(
+            router.compiled.ainvoke(make_state("롯데월드 후기 어때?")),
+            router.compiled.ainvoke(make_state("안녕")),
+        )
+
+    review, chat = asyncio.run(run())
+
+    assert review["current_node"] == "rag_review" and review["error"] is None
+    assert len(review["retrieved_reviews"]) > 0 and review["result"]
+    assert chat["current_node"] == "chat"
+    assert (chat["routing_source"], chat["llm_calls"]) == ("classifier", 1)  # no LLM round trip for routing
+    assert chat["result"] == "안녕하세요! 롯데월드에 대해 궁금한 게 있으신가요?"
+
+
+def test_router_uses_classifier_and_falls_back_to_llm(offline_index, monkeypatch):
+    """Confident local predictions skip the LLM; low confidence calls it and logs the decision."""
+    llm = JsonIntentLLM()
+    monkeypatch.setattr(router, "get_upstage_llm", lambda **kwargs: llm)
+
+    state = router.route_node(make_state("티켓 가격 알려줘"))
+    assert (state["routing_decision"], state["routing_source"], state["llm_calls"]) == ("subject_info", "classifier", 0)
+    assert state["routing_latency_ms"] < 50 and llm.calls == 0
+
+    monkeypatch.setenv("ROUTER_CONFIDENCE", "1.01")
+    state = router.route_node(make_state("티켓 가격 알려줘"))
+    assert (state["routing_decision"], state["routing_source"], state["llm_calls"]) == ("rag_review", "llm", 1)
+    assert llm.calls == 1 and load_routing_log() == [("티켓 가격 알려줘", "rag_review")]
+
+
+def test_speculative_retrieval_is_used_or_counted_as_wasted(offline_index, monkeypatch):
+    """Retrieval started during the LLM routing call feeds rag_review, or is discarded and counted."""
+    monkeypatch.setenv("ROUTER_CONFIDENCE", "1.01")  # always ask the LLM
+    monkeypatch.setattr(router, "_SPEC_STATS", dict.fromkeys(router._SPEC_STATS, 0))
+    llm = JsonIntentLLM("rag_review")
+    monkeypatch.setattr(router, "get_upstage_llm", lambda **kwargs: llm)
+
+    state = router.route_node(make_state("주말 후기 알려줘"))
+    assert state["speculative_retrieval"]["question"] == "주말 후기 알려줘"
+    state = rag_review_node.rag_review_node(state)
+    assert state["search_quality"]["speculative"] is True and state["speculative_retrieval"] is None
+    assert len(state["retrieved_reviews"]) > 0
+
+    llm.intent = "chat"
+    state = asyncio.run(router.aroute_node(make_state("주말 후기 알려줘")))
+    assert state["routing_decision"] == "chat" and state["speculative_retrieval"] is None
+    stats = router.speculation_stats()
+    assert (stats["started"], stats["used"], stats["wasted"]) == (2, 1, 1)
+
+
+def test_stream_graph_yields_tokens_then_final_state(monkeypatch):
+    """Node LLM tokens are streamed before the final state and add up to the result."""
+    def no_llm(**kwargs):
+        raise RuntimeError("offline")
+
+    monkeypatch.setattr(router, "get_upstage_llm", no_llm)  # keyword fallback -> chat
+    monkeypatch.setattr(chat_node, "get_upstage_llm", lambda **kwargs: MockLLM())
+
+    events = list(router.stream_graph(make_state("안녕")))
+
+    tokens = [payload for kind, payload in events if kind == "token"]
+    kind, final = events[-1]
+    assert kind == "state" and len(tokens) > 1
+    assert final["current_node"] == "chat"
+    assert "".join(tokens).strip() == final["result"]
+    assert stream_llm_text(MockLLM(), "안녕") == final["result"]  # outside a graph: no writer
+
+
+def test_direct_router_does_not_speculate(offline_index, monkeypatch):
+    """The label-only compatibility router never starts a speculative retrieval."""
+    monkeypatch.setenv("ROUTER_CONFIDENCE", "1.01")  # always ask the LLM
+    monkeypatch.setattr(router, "_SPEC_STATS", dict.fromkeys(router._SPEC_STATS, 0))
+    llm = JsonIntentLLM("rag_review")
+    monkeypatch.setattr(router, "get_upstage_llm", lambda **kwargs: llm)
+
+    assert router.direct_router(make_state("주말 후기 알려줘")) == "rag_review"
+    assert llm.calls == 1 and router.speculation_stats()["started"] == 0
@@ -0,0 +1,40 @@
+import numpy as np
+
+from st_app.rag.sparse_index import BM25Index, reciprocal_rank_fusion
+
+
+def test_tokenize_query_uses_wordpiece_vocab():
+    """Query words are split into the longest pieces present in the indexed vocab."""
+    bm25 = BM25Index.build([["아트", "##란", "##티스", "재밌", "##어요"], ["사람", "많", "##아요"]])
+
+    assert bm25.tokenize_query("아트란티스 재밌어요!") == ["아트", "##란", "##티스", "재밌", "##어요"]
+
+
+def test_search_ranks_term_matches_and_respects_mask():
+    """Documents with more query-term matches score higher; masked rows are excluded."""
+    bm25 = BM25Index.build([["롯데", "월드"], ["롯데", "월드", "월드"], ["사람", "많"]])
+
+    scores, rows = bm25.search("월드", k=5)
+    assert rows.tolist() == [1, 0]
+    assert scores[0] > scores[1] > 0
+
+    _, rows = bm25.search("월드", k=5, mask=np.array([True, False, True]))
+    assert rows.tolist() == [0]
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    """A saved index loads memory-mapped and returns identical results."""
+    bm25 = BM25Index.build([["롯데", "월드"], ["사람", "많"]])
+    bm25.save(str(tmp_path))
+    loaded = BM25Index.load(str(tmp_path))
+
+    assert loaded.search("사람", k=2)[1].tolist() == bm25.search("사람", k=2)[1].tolist()
+    assert BM25Index.load(str(tmp_path / "missing")) is None
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    """Items ranked by both lists come first."""
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 4]], rrf_k=60)
+
+    assert fused[0][0] == 3
+    assert {item for item, _ in fused} == {1, 2, 3, 4}
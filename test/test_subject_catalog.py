@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+from st_app.graph.nodes import subject_info_node
+from st_app.graph.nodes.subject_info_node import SubjectInfoProcessor, formatted_subject_info
+from st_app.utils import subject_catalog
+from st_app.utils.subject_catalog import get_subject_catalog
+
+SUBJECTS = [
+    {"name": "롯데월드", "category": "테마파크", "location": "서울 송파구"},
+    {"name": "롯데월드 아쿠아리움", "category": "관광지", "aliases": ["아쿠아리움"]},
+]
+
+
+@pytest.fixture
+def subjects_file(tmp_path, monkeypatch):
+    path = tmp_path / "subjects.json"
+    path.write_text(json.dumps(SUBJECTS, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setenv("SUBJECTS_PATH", str(path))
+    monkeypatch.setattr(subject_catalog, "_CATALOG", None)
+    return path
+
+
+def test_catalog_is_loaded_once_and_indexed(subjects_file, monkeypatch):
+    """Processors share one catalog; names, aliases and categories are indexed."""
+    catalog = get_subject_catalog()
+    monkeypatch.setattr(subject_catalog, "load_subjects", lambda path: pytest.fail("reloaded from disk"))
+
+    processor = SubjectInfoProcessor()
+
+    assert processor.catalog is catalog and processor.subject_data is catalog.subjects
+    assert processor.find_subject_by_name("아쿠아 리움")["name"] == "롯데월드 아쿠아리움"
+    assert processor.find_subject_by_name("롯데월드 ")["name"] == "롯데월드"
+    assert processor.find_subject_by_category("관광지") == [SUBJECTS[1]]
+    assert processor.detect_category_and_subject("아쿠아리움 가격")[1]["name"] == "롯데월드 아쿠아리움"
+
+
+def test_catalog_reloads_when_file_changes(subjects_file, monkeypatch):
+    """A changed mtime triggers a reload; an unreadable file keeps the old catalog."""
+    monkeypatch.setenv("SUBJECT_CATALOG_CHECK_SEC", "0")
+    old = get_subject_catalog()
+    assert get_subject_catalog() is old
+
+    subjects_file.write_text(json.dumps(SUBJECTS[:1], ensure_ascii=False), encoding="utf-8")
+    os.utime(subjects_file, (old.mtime + 10, old.mtime + 10))
+    new = get_subject_catalog()
+    assert new is not old and [s["name"] for s in new.subjects] == ["롯데월드"]
+
+    subjects_file.write_text("{broken", encoding="utf-8")
+    os.utime(subjects_file, (old.mtime + 20, old.mtime + 20))
+    assert get_subject_catalog() is new
+
+
+def test_formatted_info_is_cached_per_subject(subjects_file, monkeypatch):
+    """format_subject_info runs once per subject per catalog."""
+    calls = []
+    original = subject_info_node.format_subject_info
+    monkeypatch.setattr(subject_info_node, "format_subject_info", lambda s: calls.append(s["name"]) or original(s))
+    catalog = get_subject_catalog()
+
+    first = formatted_subject_info(catalog, catalog.subjects[0])
+    assert formatted_subject_info(catalog, catalog.subjects[0]) == first
+    formatted_subject_info(catalog, catalog.subjects[1])
+
+    assert "서울 송파구" in first
+    assert calls == ["롯데월드", "롯데월드 아쿠아리움"]
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from st_app.graph.nodes import subject_info_node as node_module
+from st_app.graph.nodes.subject_info_node import asubject_info_node, detect_slots, subject_info_node
+from st_app.rag.llm import MockLLM
+from st_app.utils.state import create_initial_state
+
+
+def make_state(text):
+    state = create_initial_state()
+    state["user_input"] = text
+    return state
+
+
+def no_llm(**kwargs):
+    pytest.fail("LLM should not be called for a factual question")
+
+
+def test_detect_slots_skips_open_ended_questions():
+    """Factual keywords map to record sections; open-ended markers fall back to the LLM."""
+    assert detect_slots("롯데월드 티켓 가격 알려줘") == ["ticket"]
+    assert detect_slots("주차랑 운영시간 알려줘") == ["hours", "transport"]
+    assert detect_slots("롯데월드 어디야") == ["location"]
+    assert detect_slots("티켓 싸게 사려면 어떤 게 좋을까 추천해줘") == []
+    assert detect_slots("롯데월드에 대해 알려줘") == []
+
+
+def test_detect_slots_ignores_generic_words_about_other_things():
+    """Generic words like "얼마"/"몇 시"/"할인" do not turn a question into a park-wide ticket/hours answer."""
+    assert detect_slots("퍼레이드 몇 시에 해?") == []
+    assert detect_slots("퍼레이드 몇시야") == []
+    assert detect_slots("카드 할인 돼?") == []
+    assert detect_slots("주차 얼마야?") == ["transport"]
+
+
+def test_factual_question_is_answered_from_template(monkeypatch):
+    """Price questions are answered from ticket_info with zero LLM calls."""
+    monkeypatch.setattr(node_module, "get_upstage_llm", no_llm)
+
+    result = subject_info_node(make_state("롯데월드 티켓 가격 알려줘"))
+    async_result = asyncio.run(asubject_info_node(make_state("롯데월드 티켓 가격 알려줘")))
+
+    assert result["data_source"] == "template" and result["llm_calls"] == 0
+    assert result["found_subject_name"] == "롯데월드"
+    assert "61,000원" in result["result"] and "운영시간" not in result["result"]
+    assert async_result["result"] == result["result"]
+
+
+def test_open_ended_question_uses_llm(monkeypatch):
+    """Questions without a slot, or with an open-ended marker, still go to the LLM."""
+    monkeypatch.setattr(node_module, "get_upstage_llm", lambda **kwargs: MockLLM())
+    monkeypatch.setenv("SUBJECT_INFO_TEMPLATE", "1")
+
+    result = subject_info_node(make_state("롯데월드 데이트 코스 추천해줘"))
+    assert result["data_source"] == "json_database" and result["llm_calls"] == 1
+    assert subject_info_node(make_state("롯데월드 퍼레이드 몇 시에 해?"))["data_source"] == "json_database"
+
+    monkeypatch.setenv("SUBJECT_INFO_TEMPLATE", "0")
+    assert subject_info_node(make_state("롯데월드 티켓 가격 알려줘"))["data_source"] == "json_database"